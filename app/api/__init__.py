@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from . import auth, contact_groups, triggers, contacts, call_logs, email_events, system_stats
+from . import auth, contact_groups, triggers, contacts, call_logs, email_events, system_stats, feed, admin, dispatch
 
 api_router = APIRouter()
 
@@ -9,4 +9,7 @@ api_router.include_router(triggers.router)
 api_router.include_router(contacts.router)
 api_router.include_router(call_logs.router)
 api_router.include_router(email_events.router)
-api_router.include_router(system_stats.router)
\ No newline at end of file
+api_router.include_router(system_stats.router)
+api_router.include_router(feed.router)
+api_router.include_router(admin.router)
+api_router.include_router(dispatch.router)
\ No newline at end of file
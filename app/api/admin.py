@@ -0,0 +1,72 @@
+from enum import Enum
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from app.core.auth import get_current_admin
+from app.core.coalescing import storm_coalescer
+from app.core.config import settings
+from app.core.profiling import profile_allocations, profile_cpu, profile_lock
+from app.core.slow_queries import slow_query_log
+from app.core.timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute, prefix="/admin", tags=["admin"])
+
+
+class ProfileMode(str, Enum):
+    cpu = "cpu"
+    memory = "memory"
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(current_user=Depends(get_current_admin)):
+    """Recent slow statements and sampled plans in this worker, newest first"""
+    return {
+        **slow_query_log.status(),
+        "queries": slow_query_log.recent(),
+        "plans": slow_query_log.recent_plans(),
+    }
+
+
+@router.post("/slow-queries/sampling")
+async def start_slow_query_sampling(
+    rate: float = Query(..., ge=0, le=1, description="Fraction of slow read-only statements to EXPLAIN ANALYZE"),
+    seconds: Optional[float] = Query(300, gt=0, description="Revert to SLOW_QUERY_EXPLAIN_SAMPLE_RATE after this long"),
+    current_user=Depends(get_current_admin)
+):
+    slow_query_log.start_sampling(rate, seconds)
+    return slow_query_log.status()
+
+
+@router.delete("/slow-queries")
+async def clear_slow_queries(current_user=Depends(get_current_admin)):
+    slow_query_log.clear()
+    return slow_query_log.status()
+
+
+@router.get("/storms")
+async def get_storm_coalescing(current_user=Depends(get_current_admin)):
+    """Open incidents and coalesced alerts in this worker"""
+    return storm_coalescer.stats()
+
+
+@router.post("/profile")
+async def profile_worker(
+    mode: ProfileMode = ProfileMode.cpu,
+    seconds: float = Query(10, gt=0, description="How long to profile the worker serving this request"),
+    limit: int = Query(25, ge=1, le=500, description="Allocation sites to return in memory mode"),
+    current_user=Depends(get_current_admin)
+):
+    """Profile this worker while it keeps serving traffic.
+
+    ``cpu`` returns folded stacks for flamegraph.pl or speedscope; ``memory``
+    returns the top allocation sites traced by tracemalloc during the window.
+    """
+    if seconds > settings.profile_max_seconds:
+        raise HTTPException(status_code=400, detail=f"seconds must be at most {settings.profile_max_seconds}")
+    if profile_lock.locked():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running in this worker")
+    async with profile_lock:
+        if mode == ProfileMode.cpu:
+            sampler = await profile_cpu(seconds, settings.profile_sample_interval_ms / 1000)
+            return PlainTextResponse(sampler.folded(), headers={"X-Profile-Samples": str(sampler.samples)})
+        return await profile_allocations(seconds, limit, settings.profile_traceback_frames)
@@ -1,26 +1,92 @@
+import math
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from app.core.auth import create_access_token, verify_password
+from app.core.auth import create_access_token, get_current_admin, get_current_user, get_password_hash_async, verify_password_async
 from app.core.config import settings
-from app.schemas.auth import Token
+from app.core.rate_limit import KeyedRateLimiter
+from app.crud.users import UserCRUD
+from app.database.connection import get_db_connection
+from app.schemas.auth import Token, UserCreate, UserResponse
+from app.core.timing import TimedRoute
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
+router = APIRouter(route_class=TimedRoute, prefix="/auth", tags=["authentication"])
+
+# Failed login attempts per (client address, username)
+login_rate_limiter = KeyedRateLimiter(
+    capacity=settings.login_rate_limit_attempts,
+    refill_rate=settings.login_rate_limit_attempts / settings.login_rate_limit_window_seconds,
+)
+# Failed login attempts per client address, whatever the username: the bucket
+# above alone lets a client spray a password across every username
+login_host_rate_limiter = KeyedRateLimiter(
+    capacity=settings.login_rate_limit_host_attempts,
+    refill_rate=settings.login_rate_limit_host_attempts / settings.login_rate_limit_window_seconds,
+)
+
+
+def _too_many_attempts(limiter: KeyedRateLimiter, key) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many failed login attempts",
+        headers={"Retry-After": str(math.ceil(limiter.retry_after(key)))},
+    )
 
 
 @router.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    # For demo purposes, using hardcoded credentials
-    # In production, you should validate against your users table
-    if form_data.username != "admin" or form_data.password != "admin123":
+async def login_for_access_token(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db=Depends(get_db_connection)
+):
+    client_host = request.client.host if request.client else None
+    rate_limit_key = (client_host, form_data.username)
+    # Spend the token before verifying, so parallel guesses can't all pass a
+    # check made while the first ones are still being verified; refunded on success
+    if not login_host_rate_limiter.consume(client_host):
+        raise _too_many_attempts(login_host_rate_limiter, client_host)
+    if not login_rate_limiter.consume(rate_limit_key):
+        login_host_rate_limiter.refund(client_host)
+        raise _too_many_attempts(login_rate_limiter, rate_limit_key)
+
+    user = await UserCRUD.get_credentials(db, form_data.username)
+    await db.release()
+
+    if not user or not user["is_active"] or not await verify_password_async(form_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
+    login_rate_limiter.refund(rate_limit_key)
+    login_host_rate_limiter.refund(client_host)
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": form_data.username}, expires_delta=access_token_expires
+        data={"sub": user["username"]}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
+
+
+@router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def create_user(
+    user: UserCreate,
+    db=Depends(get_db_connection),
+    current_user=Depends(get_current_admin)
+):
+    hashed_password = await get_password_hash_async(user.password)
+    try:
+        return await UserCRUD.create(db, user, hashed_password)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/me", response_model=UserResponse)
+async def read_current_user(
+    db=Depends(get_db_connection),
+    current_user=Depends(get_current_user)
+):
+    user = await UserCRUD.get_by_username(db, current_user.username)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
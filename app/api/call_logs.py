@@ -1,16 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from typing import List, Optional
 import math
-import pandas as pd
-from io import BytesIO, StringIO
 from datetime import datetime
-from app.database.connection import get_db_connection
+from starlette.concurrency import run_in_threadpool
+from app.database.connection import get_db_connection, stream_rows
 from app.crud.call_logs import CallLogCRUD
 from app.schemas.call_logs import CallLogCreate, CallLogUpdate, CallLogResponse, PaginatedResponse
+from app.core import export
 from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.etag import etag_matches, make_etag, not_modified_response
+from app.core.pagination import decode_cursor, set_next_cursor
+from app.core.responses import ndjson_response, paginated_records_response
+from app.core.timing import TimedRoute
 
-router = APIRouter(prefix="/call-logs", tags=["call-logs"])
+router = APIRouter(route_class=TimedRoute, prefix="/call-logs", tags=["call-logs"])
 
 
 @router.post("/", response_model=CallLogResponse, status_code=status.HTTP_201_CREATED)
@@ -48,6 +52,9 @@ async def get_call_logs(
     
     # Get total count and items in parallel
     total = await CallLogCRUD.get_total_count(db)
+    if settings.fast_json_responses:
+        rows = await CallLogCRUD.get_all_records(db, skip, per_page)
+        return paginated_records_response(rows, total, page, per_page)
     items = await CallLogCRUD.get_all(db, skip, per_page)
     
     total_pages = math.ceil(total / per_page)
@@ -64,19 +71,52 @@ async def get_call_logs(
 @router.get("/by-email-event/{email_event_id}", response_model=List[CallLogResponse])
 async def get_call_logs_by_email_event(
     email_event_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.cursor_page_max_limit, description="Items per page (defaults to CURSOR_PAGE_DEFAULT_LIMIT)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    stream: bool = Query(False, description="Stream every remaining item as NDJSON instead of a page"),
     db=Depends(get_db_connection),
     current_user=Depends(get_current_user)
 ):
-    return await CallLogCRUD.get_by_email_event_id(db, email_event_id)
+    position = decode_cursor(cursor, (int, datetime.fromisoformat, int))
+    if stream:
+        return ndjson_response(stream_rows(
+            lambda connection: CallLogCRUD.iter_by_email_event_id(connection, email_event_id, position)
+        ))
+    limit = limit or settings.cursor_page_default_limit
+    
+    items = await CallLogCRUD.get_by_email_event_id(db, email_event_id, limit, position)
+    set_next_cursor(response, items, limit, lambda item: (item.attempt_number or 1, item.created_at, item.id))
+    return items
 
 
 @router.get("/by-contact/{contact_id}", response_model=List[CallLogResponse])
 async def get_call_logs_by_contact(
     contact_id: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.cursor_page_max_limit, description="Items per page (defaults to CURSOR_PAGE_DEFAULT_LIMIT)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    stream: bool = Query(False, description="Stream every remaining item as NDJSON instead of a page"),
     db=Depends(get_db_connection),
     current_user=Depends(get_current_user)
 ):
-    return await CallLogCRUD.get_by_contact_id(db, contact_id)
+    position = decode_cursor(cursor, (datetime.fromisoformat, int))
+    if stream:
+        return ndjson_response(stream_rows(
+            lambda connection: CallLogCRUD.iter_by_contact_id(connection, contact_id, position)
+        ))
+    limit = limit or settings.cursor_page_default_limit
+    
+    version = await CallLogCRUD.get_contact_version(db, contact_id)
+    etag = make_etag("call-logs-by-contact", contact_id, limit, cursor, *version)
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+    
+    items = await CallLogCRUD.get_by_contact_id(db, contact_id, limit, position)
+    set_next_cursor(response, items, limit, lambda item: (item.created_at, item.id))
+    return items
 
 
 @router.put("/{call_log_id}", response_model=CallLogResponse)
@@ -103,69 +143,45 @@ async def delete_call_log(
         raise HTTPException(status_code=404, detail="Call log not found")
 
 
-@router.get("/export/csv")
-async def export_call_logs_csv(
-    start_date: Optional[str] = Query(None, description="Start date filter (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date filter (YYYY-MM-DD)"),
-    db=Depends(get_db_connection),
-    current_user=Depends(get_current_user)
-):
-    """Export call logs to CSV format"""
+async def _export(start_date: Optional[str], end_date: Optional[str], db, build, media_type: str, extension: str):
     try:
         # Get all call logs for export
         call_logs = await CallLogCRUD.get_all_for_export(db, start_date, end_date)
-        
+        await db.release()
+
         if not call_logs:
             raise HTTPException(status_code=404, detail="No call logs found for export")
-        
-        # Create DataFrame
-        df = pd.DataFrame(call_logs)
-        
-        # Rename columns for better readability
-        column_mapping = {
-            'id': 'ID',
-            'email_event_id': 'Email Event ID',
-            'contact_id': 'Contact ID',
-            'contact_name': 'Contact Name',
-            'phone_number': 'Phone Number',
-            'call_sid': 'Call SID',
-            'status': 'Status',
-            'duration': 'Duration (seconds)',
-            'attempt_number': 'Attempt Number',
-            'error_message': 'Error Message',
-            'created_at': 'Created At',
-            'updated_at': 'Updated At',
-            'from_email': 'From Email',
-            'email_subject': 'Email Subject'
-        }
-        
-        df = df.rename(columns=column_mapping)
-        
-        # Format datetime columns
-        for col in ['Created At', 'Updated At']:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col]).dt.strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Create CSV string
-        csv_buffer = StringIO()
-        df.to_csv(csv_buffer, index=False)
-        csv_content = csv_buffer.getvalue()
-        
+
+        # Build the file off the event loop; pandas is imported on first export
+        content = await run_in_threadpool(build, call_logs)
+
         # Generate filename with current timestamp
         current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"call_logs_export_{current_time}.csv"
-        
-        # Return as streaming response
-        return StreamingResponse(
-            BytesIO(csv_content.encode('utf-8')),
-            media_type='text/csv',
+        filename = f"call_logs_export_{current_time}.{extension}"
+
+        return Response(
+            content,
+            media_type=media_type,
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
 
+@router.get("/export/csv")
+async def export_call_logs_csv(
+    start_date: Optional[str] = Query(None, description="Start date filter (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date filter (YYYY-MM-DD)"),
+    db=Depends(get_db_connection),
+    current_user=Depends(get_current_user)
+):
+    """Export call logs to CSV format"""
+    return await _export(start_date, end_date, db, export.call_logs_csv, 'text/csv', 'csv')
+
+
 @router.get("/export/excel")
 async def export_call_logs_excel(
     start_date: Optional[str] = Query(None, description="Start date filter (YYYY-MM-DD)"),
@@ -174,75 +190,7 @@ async def export_call_logs_excel(
     current_user=Depends(get_current_user)
 ):
     """Export call logs to Excel format"""
-    try:
-        # Get all call logs for export
-        call_logs = await CallLogCRUD.get_all_for_export(db, start_date, end_date)
-        
-        if not call_logs:
-            raise HTTPException(status_code=404, detail="No call logs found for export")
-        
-        # Create DataFrame
-        df = pd.DataFrame(call_logs)
-        
-        # Rename columns for better readability
-        column_mapping = {
-            'id': 'ID',
-            'email_event_id': 'Email Event ID',
-            'contact_id': 'Contact ID',
-            'contact_name': 'Contact Name',
-            'phone_number': 'Phone Number',
-            'call_sid': 'Call SID',
-            'status': 'Status',
-            'duration': 'Duration (seconds)',
-            'attempt_number': 'Attempt Number',
-            'error_message': 'Error Message',
-            'created_at': 'Created At',
-            'updated_at': 'Updated At',
-            'from_email': 'From Email',
-            'email_subject': 'Email Subject'
-        }
-        
-        df = df.rename(columns=column_mapping)
-        
-        # Format datetime columns
-        for col in ['Created At', 'Updated At']:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col]).dt.strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Create Excel file in memory
-        excel_buffer = BytesIO()
-        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Call Logs', index=False)
-            
-            # Get workbook and worksheet to format
-            workbook = writer.book
-            worksheet = writer.sheets['Call Logs']
-            
-            # Auto-adjust column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        excel_buffer.seek(0)
-        
-        # Generate filename with current timestamp
-        current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"call_logs_export_{current_time}.xlsx"
-        
-        # Return as streaming response
-        return StreamingResponse(
-            BytesIO(excel_buffer.getvalue()),
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
\ No newline at end of file
+    return await _export(
+        start_date, end_date, db, export.call_logs_excel,
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'
+    )
\ No newline at end of file
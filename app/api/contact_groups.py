@@ -5,8 +5,11 @@ from app.database.connection import get_db_connection
 from app.crud.contact_groups import ContactGroupCRUD
 from app.schemas.contact_groups import ContactGroupCreate, ContactGroupUpdate, ContactGroupResponse, PaginatedResponse
 from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.responses import paginated_records_response
+from app.core.timing import TimedRoute
 
-router = APIRouter(prefix="/contact-groups", tags=["contact-groups"])
+router = APIRouter(route_class=TimedRoute, prefix="/contact-groups", tags=["contact-groups"])
 
 
 @router.post("/", response_model=ContactGroupResponse, status_code=status.HTTP_201_CREATED)
@@ -88,6 +91,9 @@ async def get_contact_groups(
     
     # Get total count and items in parallel
     total = await ContactGroupCRUD.get_total_count(db)
+    if settings.fast_json_responses:
+        rows = await ContactGroupCRUD.get_all_records(db, skip, per_page)
+        return paginated_records_response(rows, total, page, per_page)
     items = await ContactGroupCRUD.get_all(db, skip, per_page)
     
     total_pages = math.ceil(total / per_page)
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from typing import List, Optional
 import math
 from app.database.connection import get_db_connection
 from app.crud.contacts import ContactCRUD
 from app.schemas.contacts import ContactCreate, ContactUpdate, ContactResponse, PaginatedResponse
 from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.etag import etag_matches, make_etag, not_modified_response
+from app.core.responses import paginated_records_response
+from app.core.timing import TimedRoute
 
-router = APIRouter(prefix="/contacts", tags=["contacts"])
+router = APIRouter(route_class=TimedRoute, prefix="/contacts", tags=["contacts"])
 
 
 @router.post("/", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
@@ -100,6 +104,9 @@ async def get_contacts(
     
     # Get total count and items in parallel
     total = await ContactCRUD.get_total_count(db)
+    if settings.fast_json_responses:
+        rows = await ContactCRUD.get_all_records(db, skip, per_page)
+        return paginated_records_response(rows, total, page, per_page)
     items = await ContactCRUD.get_all(db, skip, per_page)
     
     total_pages = math.ceil(total / per_page)
@@ -128,9 +135,16 @@ async def get_contact(
 @router.get("/by-group/{group_id}", response_model=List[ContactResponse])
 async def get_contacts_by_group(
     group_id: str,
+    request: Request,
+    response: Response,
     db=Depends(get_db_connection),
     current_user=Depends(get_current_user)
 ):
+    version = await ContactCRUD.get_group_version(db, group_id)
+    etag = make_etag("contacts-by-group", group_id, *version)
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
     return await ContactCRUD.get_by_group_id(db, group_id)
 
 
@@ -0,0 +1,100 @@
+import math
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from app.database.connection import get_db_connection
+from app.crud.contact_groups import ContactGroupCRUD
+from app.crud.dispatch import DispatchCRUD
+from app.schemas.dispatch import DispatchClaim, DispatchLease, DispatchRequest
+from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.dispatch import DEFAULT_EMERGENCY_LEVEL, dispatch_limits
+from app.core.timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute, prefix="/dispatch", tags=["dispatch"])
+
+
+def _too_many(detail: str, retry_after: float) -> HTTPException:
+    # A bucket that never refills (rate 0) has no time to wait for; ask for a retry later anyway
+    if not math.isfinite(retry_after):
+        retry_after = settings.dispatch_retry_after_seconds
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+@router.post("/next", response_model=DispatchClaim, responses={204: {"description": "Nothing waiting for dispatch"}})
+async def claim_next_event(
+    db=Depends(get_db_connection),
+    current_user=Depends(get_current_user)
+):
+    """Claim the most urgent pending email event for dispatch.
+
+    Events are ordered by group emergency level, trigger priority and age.
+    The event moves to ``processing``; set it to ``processed`` when done, or
+    it is handed out again after ``DISPATCH_CLAIM_TIMEOUT_SECONDS``.
+    """
+    weights = settings.dispatch_level_weights
+    claim = await DispatchCRUD.claim_next(
+        db, weights, weights.get(DEFAULT_EMERGENCY_LEVEL, 0),
+        settings.dispatch_trigger_priority_weight,
+        settings.dispatch_aging_points_per_minute,
+        settings.dispatch_claim_timeout_seconds,
+        settings.dispatch_candidates_per_level
+    )
+    if claim is None:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return claim
+
+
+@router.post("/calls", response_model=DispatchLease, status_code=status.HTTP_201_CREATED)
+async def start_call(
+    dispatch: DispatchRequest,
+    db=Depends(get_db_connection),
+    current_user=Depends(get_current_user)
+):
+    """Ask permission to dial a contact.
+
+    Refused with 429 and ``Retry-After`` when the contact or its group is over
+    its call rate, or when the concurrent call cap for the group's emergency
+    level is reached. Release the returned lease when the call ends.
+    """
+    emergency_level = None
+    if dispatch.group_id:
+        group = await ContactGroupCRUD.get_by_id(db, dispatch.group_id)
+        if not group:
+            raise HTTPException(status_code=404, detail="Contact group not found")
+        emergency_level = group.emergency_level
+    level = dispatch_limits.level(emergency_level)
+
+    buckets = dispatch_limits.rate_buckets(level, dispatch.contact_id, dispatch.group_id)
+    lease, active, limited_by, retry_after = await DispatchCRUD.acquire_lease(
+        db, dispatch.contact_id, dispatch.group_id, dispatch.email_event_id, level,
+        dispatch_limits.max_active(level), settings.dispatch_lease_seconds, buckets
+    )
+    dispatch_limits.record(level, buckets, limited_by, active)
+    if limited_by == "concurrency":
+        raise _too_many(f"Concurrent call limit reached for {level} calls", settings.dispatch_retry_after_seconds)
+    if lease is None:
+        raise _too_many(f"Call rate limit reached for this {limited_by}", retry_after)
+    return lease
+
+
+@router.delete("/calls/{lease_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def end_call(
+    lease_id: int,
+    db=Depends(get_db_connection),
+    current_user=Depends(get_current_user)
+):
+    released = await DispatchCRUD.release_lease(db, lease_id)
+    if not released:
+        raise HTTPException(status_code=404, detail="Lease not found or already expired")
+
+
+@router.get("/limits")
+async def get_dispatch_limits(
+    db=Depends(get_db_connection),
+    current_user=Depends(get_current_user)
+):
+    """Calls in progress, the configured limits and this worker's decision counters"""
+    return {**dispatch_limits.stats(), "active_calls": await DispatchCRUD.get_active_count(db)}
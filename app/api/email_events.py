@@ -1,24 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from typing import List, Optional
 import math
-from app.database.connection import get_db_connection
+import time
+from datetime import datetime
+from app.database.connection import get_db_connection, stream_rows
 from app.crud.email_events import EmailEventCRUD
 from app.schemas.email_events import EmailEventCreate, EmailEventUpdate, EmailEventResponse, PaginatedResponse
 from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.coalescing import storm_coalescer
+from app.core.idempotency import dedup_window, idempotency_key, recent_ingest_keys
+from app.core.etag import etag_matches, make_etag, not_modified_response
+from app.core.pagination import decode_cursor, set_next_cursor
+from app.core.responses import ndjson_response, paginated_records_response
+from app.core.timing import TimedRoute
 
-router = APIRouter(prefix="/email-events", tags=["email-events"])
+router = APIRouter(route_class=TimedRoute, prefix="/email-events", tags=["email-events"])
 
 
 @router.post("/", response_model=EmailEventResponse, status_code=status.HTTP_201_CREATED)
 async def create_email_event(
     email_event: EmailEventCreate,
+    response: Response,
     db=Depends(get_db_connection),
     current_user=Depends(get_current_user)
 ):
+    """Ingest an email event idempotently.
+
+    A retry with the same id or Message-ID within
+    ``INGEST_DEDUP_WINDOW_SECONDS``, or with the same content within
+    ``INGEST_CONTENT_DEDUP_WINDOW_SECONDS``, returns the original event with
+    200 instead of creating a second alert. A new event whose trigger already
+    has an open incident in this worker is folded into it, also with 200.
+    """
+    key = idempotency_key(email_event)
+    window = dedup_window(key)
     try:
-        return await EmailEventCRUD.create(db, email_event)
+        known_id = recent_ingest_keys.get(key)
+        if known_id is not None:
+            existing = await EmailEventCRUD.get_by_id(db, known_id)
+            if existing is not None:
+                response.status_code = status.HTTP_200_OK
+                response.headers["Idempotent-Replayed"] = "true"
+                return existing
+        incident = storm_coalescer.incident_for(email_event.trigger_matched)
+        if incident is not None and await EmailEventCRUD.get_by_id(db, email_event.id) is None:
+            # Claim the key before folding, so a retry of an event that another
+            # worker stored or folded is replayed below instead of counted again
+            _, claimed, expires_in = await EmailEventCRUD.claim_key(db, key, incident.id, window)
+            if claimed:
+                recent_ingest_keys.set(key, incident.id, expires_at=time.time() + expires_in)
+                response.status_code = status.HTTP_200_OK
+                response.headers["X-Coalesced-Into"] = incident.id
+                return storm_coalescer.fold(incident)
+        event, created, expires_in = await EmailEventCRUD.create_idempotent(
+            db, email_event, key, window
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    recent_ingest_keys.set(key, event.id, expires_at=time.time() + expires_in)
+    if created:
+        storm_coalescer.open(event)
+    else:
+        response.status_code = status.HTTP_200_OK
+        response.headers["Idempotent-Replayed"] = "true"
+    return event
 
 
 @router.get("/{email_event_id}", response_model=EmailEventResponse)
@@ -44,6 +90,9 @@ async def get_email_events(
     
     # Get total count and items in parallel
     total = await EmailEventCRUD.get_total_count(db)
+    if settings.fast_json_responses:
+        rows = await EmailEventCRUD.get_all_records(db, skip, per_page)
+        return paginated_records_response(rows, total, page, per_page)
     items = await EmailEventCRUD.get_all(db, skip, per_page)
     
     total_pages = math.ceil(total / per_page)
@@ -60,19 +109,52 @@ async def get_email_events(
 @router.get("/by-status/{status}", response_model=List[EmailEventResponse])
 async def get_email_events_by_status(
     status: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.cursor_page_max_limit, description="Items per page (defaults to CURSOR_PAGE_DEFAULT_LIMIT)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    stream: bool = Query(False, description="Stream every remaining item as NDJSON instead of a page"),
     db=Depends(get_db_connection),
     current_user=Depends(get_current_user)
 ):
-    return await EmailEventCRUD.get_by_status(db, status)
+    position = decode_cursor(cursor, (datetime.fromisoformat, str))
+    if stream:
+        return ndjson_response(stream_rows(
+            lambda connection: EmailEventCRUD.iter_by_status(connection, status, position)
+        ))
+    limit = limit or settings.cursor_page_default_limit
+    
+    version = await EmailEventCRUD.get_status_version(db, status)
+    etag = make_etag("email-events-by-status", status, limit, cursor, *version)
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+    
+    items = await EmailEventCRUD.get_by_status(db, status, limit, position)
+    set_next_cursor(response, items, limit, lambda item: (item.received_at, item.id))
+    return items
 
 
 @router.get("/by-trigger/{trigger_matched}", response_model=List[EmailEventResponse])
 async def get_email_events_by_trigger(
     trigger_matched: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.cursor_page_max_limit, description="Items per page (defaults to CURSOR_PAGE_DEFAULT_LIMIT)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    stream: bool = Query(False, description="Stream every remaining item as NDJSON instead of a page"),
     db=Depends(get_db_connection),
     current_user=Depends(get_current_user)
 ):
-    return await EmailEventCRUD.get_by_trigger(db, trigger_matched)
+    position = decode_cursor(cursor, (datetime.fromisoformat, str))
+    if stream:
+        return ndjson_response(stream_rows(
+            lambda connection: EmailEventCRUD.iter_by_trigger(connection, trigger_matched, position)
+        ))
+    limit = limit or settings.cursor_page_default_limit
+    
+    items = await EmailEventCRUD.get_by_trigger(db, trigger_matched, limit, position)
+    set_next_cursor(response, items, limit, lambda item: (item.received_at, item.id))
+    return items
 
 
 @router.put("/{email_event_id}", response_model=EmailEventResponse)
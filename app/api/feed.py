@@ -0,0 +1,90 @@
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from app.core.auth import InvalidTokenError, decode_access_token, ensure_active_user, get_current_user_from_header_or_query
+from app.core.config import settings
+from app.core.events import FEED_TABLES, broadcaster
+from app.core.timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute, prefix="/feed", tags=["feed"])
+
+
+def _parse_tables(tables: Optional[List[str]]) -> set:
+    selected = set(tables or FEED_TABLES)
+    unknown = selected - set(FEED_TABLES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown tables: {', '.join(sorted(unknown))}")
+    return selected
+
+
+@router.get("/events")
+async def stream_events(
+    tables: Optional[List[str]] = Query(None, description="Tables to follow (email_events, call_logs); defaults to both"),
+    current_user=Depends(get_current_user_from_header_or_query)
+):
+    """Server-sent events for inserts and updates of email events and call logs"""
+    if not settings.realtime_enabled:
+        raise HTTPException(status_code=404, detail="Realtime feed is disabled")
+    subscription = await broadcaster.subscribe(_parse_tables(tables))
+
+    async def event_stream():
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                try:
+                    payload = await asyncio.wait_for(subscription.get(), timeout=settings.realtime_keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield f"data: {payload}\n\n".encode()
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def websocket_events(
+    websocket: WebSocket,
+    token: str = Query(...),
+    tables: Optional[List[str]] = Query(None)
+):
+    """WebSocket variant of ``/feed/events``; authenticate with the ``token`` query parameter"""
+    try:
+        await ensure_active_user(decode_access_token(token))
+        selected = _parse_tables(tables)
+    except (InvalidTokenError, HTTPException):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if not settings.realtime_enabled:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = await broadcaster.subscribe(selected)
+
+    async def wait_for_disconnect():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+    disconnect = asyncio.create_task(wait_for_disconnect())
+    try:
+        while not disconnect.done():
+            next_event = asyncio.create_task(subscription.get())
+            done, _ = await asyncio.wait({next_event, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+            if next_event in done:
+                await websocket.send_text(next_event.result())
+            else:
+                next_event.cancel()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnect.cancel()
+        broadcaster.unsubscribe(subscription)
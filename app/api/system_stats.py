@@ -1,11 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from app.database.connection import get_db_connection
+import asyncio
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+from datetime import datetime
+from app.database.connection import get_db_connection, get_db_pool
+from app.crud.call_stats import CallStatsCRUD
 from app.crud.system_stats import SystemStatsCRUD
-from app.schemas.system_stats import SystemStatsCreate, SystemStatsUpdate, SystemStatsResponse
-from app.core.auth import get_current_user
+from app.schemas.system_stats import (
+    SystemStatsCreate, SystemStatsUpdate, SystemStatsResponse, BucketSize, CallStatsBucket, CallStatsBreakdown,
+    DashboardSummary
+)
+from app.core.auth import get_current_admin, get_current_user
+from app.core.background import PeriodicTask
+from app.core.cache import SingleFlightCache
+from app.core.config import settings
+from app.core.retention import retention_engine
+from app.core.rollups import rebuild_rollups
+from app.core.timing import TimedRoute
 
-router = APIRouter(prefix="/system-stats", tags=["system-stats"])
+router = APIRouter(route_class=TimedRoute, prefix="/system-stats", tags=["system-stats"])
+
+summary_cache = SingleFlightCache(ttl=settings.summary_cache_ttl_seconds, maxsize=1)
+
+
+async def _compute_summary() -> DashboardSummary:
+    # Uses its own pool connection: the computation outlives any single request
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        return await SystemStatsCRUD.get_summary(connection)
+
+
+async def refresh_summary():
+    await summary_cache.refresh("summary", _compute_summary)
+
+
+# When this worker last served the summary; refreshing it for nobody is wasted work
+_summary_read_at: Optional[float] = None
+
+
+async def refresh_summary_if_read():
+    """Refresh the summary only if it was read in the last ``SUMMARY_REFRESH_IDLE_SECONDS``"""
+    if _summary_read_at is not None and time.monotonic() - _summary_read_at < settings.summary_refresh_idle_seconds:
+        await refresh_summary()
+
+
+# Keep references to fire-and-forget tasks so they are not garbage collected
+_background_runs = set()
+
+summary_refresher = PeriodicTask("dashboard-summary", settings.summary_refresh_seconds, refresh_summary_if_read)
+
+
+def _require_rollups():
+    if not settings.call_stats_rollups_enabled:
+        raise HTTPException(status_code=404, detail="Call statistics rollups are disabled")
 
 
 @router.post("/", response_model=SystemStatsResponse, status_code=status.HTTP_201_CREATED)
@@ -20,6 +67,29 @@ async def create_system_stats(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/summary", response_model=DashboardSummary)
+async def get_dashboard_summary(current_user=Depends(get_current_user)):
+    """Dashboard counters from a snapshot at most ``SUMMARY_CACHE_TTL_SECONDS`` old"""
+    global _summary_read_at
+    _summary_read_at = time.monotonic()
+    return await summary_cache.get("summary", _compute_summary)
+
+
+@router.get("/retention")
+async def get_retention_status(current_user=Depends(get_current_user)):
+    """Progress of the current or last retention run in this worker"""
+    return retention_engine.status()
+
+
+@router.post("/retention/run", status_code=status.HTTP_202_ACCEPTED)
+async def run_retention(current_user=Depends(get_current_admin)):
+    """Start a retention run in the background; poll ``GET /retention`` for progress"""
+    if not retention_engine.running:
+        _background_runs.add(asyncio.create_task(retention_engine.run()))
+        _background_runs.difference_update({task for task in _background_runs if task.done()})
+    return retention_engine.status()
+
+
 @router.get("/{stats_id}", response_model=SystemStatsResponse)
 async def get_system_stats(
     stats_id: int,
@@ -93,9 +163,11 @@ async def delete_system_stats(
 async def cleanup_old_stats(
     days_to_keep: int = 30,
     db=Depends(get_db_connection),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_admin)
 ):
-    deleted_count = await SystemStatsCRUD.delete_old_stats(db, days_to_keep)
+    deleted_count = await SystemStatsCRUD.delete_old_stats(
+        db, days_to_keep, settings.retention_batch_size, settings.retention_batch_pause_seconds
+    )
     return {"message": f"Deleted {deleted_count} old system stats records"}
 
 
@@ -132,4 +204,53 @@ async def get_daily_calls_count(
     current_user=Depends(get_current_user)
 ):
     count = await SystemStatsCRUD.get_daily_calls_count(db)
-    return {"total_daily_calls": count}
\ No newline at end of file
+    return {"total_daily_calls": count}
+
+@router.get("/timeseries/calls", response_model=List[CallStatsBucket])
+async def get_calls_timeseries(
+    bucket: BucketSize = BucketSize.hour,
+    start: Optional[datetime] = Query(None, description="Defaults to the last 2 hours, 2 days or 30 days depending on bucket"),
+    end: Optional[datetime] = None,
+    group_id: Optional[str] = None,
+    trigger_matched: Optional[str] = None,
+    db=Depends(get_db_connection),
+    current_user=Depends(get_current_user)
+):
+    """Calls per time bucket, read from the incremental rollups"""
+    _require_rollups()
+    return await CallStatsCRUD.get_timeseries(db, bucket, start, end, group_id, trigger_matched)
+
+
+@router.get("/timeseries/calls/by-group", response_model=List[CallStatsBreakdown])
+async def get_calls_by_group(
+    bucket: BucketSize = BucketSize.hour,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db=Depends(get_db_connection),
+    current_user=Depends(get_current_user)
+):
+    _require_rollups()
+    return await CallStatsCRUD.get_breakdown(db, "group_id", bucket, start, end)
+
+
+@router.get("/timeseries/calls/by-trigger", response_model=List[CallStatsBreakdown])
+async def get_calls_by_trigger(
+    bucket: BucketSize = BucketSize.hour,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db=Depends(get_db_connection),
+    current_user=Depends(get_current_user)
+):
+    _require_rollups()
+    return await CallStatsCRUD.get_breakdown(db, "trigger_matched", bucket, start, end)
+
+
+@router.post("/timeseries/rebuild")
+async def rebuild_calls_timeseries(
+    since: Optional[datetime] = Query(None, description="Recompute from this day onwards; everything when omitted"),
+    db=Depends(get_db_connection),
+    current_user=Depends(get_current_admin)
+):
+    _require_rollups()
+    rebuilt = await rebuild_rollups(db, since)
+    return {"message": f"Rebuilt {rebuilt} rollup rows"}
@@ -5,8 +5,11 @@ from app.database.connection import get_db_connection
 from app.crud.triggers import TriggerCRUD
 from app.schemas.triggers import TriggerCreate, TriggerUpdate, TriggerResponse, PaginatedResponse
 from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.responses import paginated_records_response
+from app.core.timing import TimedRoute
 
-router = APIRouter(prefix="/triggers", tags=["triggers"])
+router = APIRouter(route_class=TimedRoute, prefix="/triggers", tags=["triggers"])
 
 
 @router.post("/", response_model=TriggerResponse, status_code=status.HTTP_201_CREATED)
@@ -100,6 +103,9 @@ async def get_triggers(
     
     # Get total count and items in parallel
     total = await TriggerCRUD.get_total_count(db)
+    if settings.fast_json_responses:
+        rows = await TriggerCRUD.get_all_records(db, skip, per_page)
+        return paginated_records_response(rows, total, page, per_page)
     items = await TriggerCRUD.get_all(db, skip, per_page)
     
     total_pages = math.ceil(total / per_page)
@@ -1,14 +1,59 @@
+import asyncio
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Callable, Optional
+import asyncpg
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.schemas.auth import TokenData
+from app.core.prometheus import Counter, Gauge, registry
+from app.crud.users import UserCRUD
+from app.database.connection import get_db_pool
+from app.schemas.auth import TokenData, UserCreate
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# Verified tokens keyed by SHA-256 digest, kept until their ``exp`` claim
+token_cache = TTLCache(maxsize=settings.token_cache_size)
+# Users found to exist and be active; a deactivated user's tokens, cached or
+# not, stop working within TOKEN_USER_CHECK_SECONDS
+_active_users = TTLCache(maxsize=settings.token_cache_size, ttl=settings.token_user_check_seconds)
+
+
+def _token_cache_requests():
+    return [(("hit",), token_cache.hits), (("miss",), token_cache.misses)]
+
+
+registry.register(Counter(
+    "mailtocall_token_cache_requests_total", "Verified token cache lookups by result",
+    ("result",), _token_cache_requests,
+))
+registry.register(Gauge(
+    "mailtocall_token_cache_entries", "Verified tokens held in this worker's cache",
+    (), lambda: [((), len(token_cache))],
+))
+
+# bcrypt is CPU bound; run it on a small dedicated pool so login bursts can
+# neither block the event loop nor exhaust the default executor
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers, thread_name_prefix="password-hash"
+)
+# Recently verified credentials, keyed by an HMAC under a per-process secret
+_password_cache = TTLCache(maxsize=settings.password_cache_size, ttl=settings.password_cache_ttl_seconds)
+_password_cache_key = os.urandom(32)
+
+
+class InvalidTokenError(Exception):
+    pass
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -19,6 +64,40 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    key = hmac.new(
+        _password_cache_key, f"{hashed_password}\0{plain_password}".encode(), hashlib.sha256
+    ).digest()
+    if _password_cache.get(key):
+        return True
+    loop = asyncio.get_running_loop()
+    verified = await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+    if verified:
+        _password_cache.set(key, True)
+    return verified
+
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
+
+async def ensure_bootstrap_admin(db: asyncpg.Connection):
+    """Create the configured bootstrap admin user if it does not exist yet"""
+    if await UserCRUD.get_by_username(db, settings.bootstrap_admin_username):
+        return
+    user = UserCreate(
+        username=settings.bootstrap_admin_username,
+        email=settings.bootstrap_admin_email,
+        password=settings.bootstrap_admin_password,
+    )
+    try:
+        await UserCRUD.create(db, user, await get_password_hash_async(user.password))
+    except asyncpg.UniqueViolationError:
+        # Another worker created it first
+        pass
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -30,6 +109,77 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def _jose_decoder() -> Callable[[str], dict]:
+    def decode(token: str) -> dict:
+        try:
+            return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        except JWTError as e:
+            raise InvalidTokenError(str(e))
+    return decode
+
+
+def _pyjwt_decoder() -> Callable[[str], dict]:
+    try:
+        import jwt as pyjwt
+    except ImportError:
+        raise RuntimeError("JWT_BACKEND=pyjwt requires the PyJWT package to be installed")
+
+    def decode(token: str) -> dict:
+        try:
+            return pyjwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        except pyjwt.PyJWTError as e:
+            raise InvalidTokenError(str(e))
+    return decode
+
+
+JWT_BACKENDS = {
+    "jose": _jose_decoder,
+    "pyjwt": _pyjwt_decoder,
+}
+
+
+@lru_cache(maxsize=None)
+def get_token_decoder(backend: str) -> Callable[[str], dict]:
+    if backend not in JWT_BACKENDS:
+        raise RuntimeError(f"Unknown JWT backend: {backend}. Expected one of {', '.join(JWT_BACKENDS)}")
+    return JWT_BACKENDS[backend]()
+
+
+def decode_access_token(token: str) -> TokenData:
+    """Verify a bearer token, serving repeat tokens from ``token_cache``."""
+    key = hashlib.sha256(token.encode()).digest()
+    token_data = token_cache.get(key)
+    if token_data is not None:
+        return token_data
+
+    payload = get_token_decoder(settings.jwt_backend)(token)
+    username: str = payload.get("sub")
+    if username is None:
+        raise InvalidTokenError("Token has no subject")
+    token_data = TokenData(username=username)
+
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)):
+        token_cache.set(key, token_data, expires_at=expires_at)
+    return token_data
+
+
+async def ensure_active_user(token_data: TokenData):
+    """Reject tokens of users that were deactivated or deleted since the token was issued.
+
+    Checked against the database at most once per TOKEN_USER_CHECK_SECONDS
+    per user, so only a valid token ever takes a pool connection.
+    """
+    if _active_users.get(token_data.username):
+        return
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        user = await UserCRUD.get_credentials(connection, token_data.username)
+    if not user or not user["is_active"]:
+        raise InvalidTokenError("User is inactive or does not exist")
+    _active_users.set(token_data.username, True)
+
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -37,15 +187,35 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
+        token_data = decode_access_token(credentials.credentials)
+        await ensure_active_user(token_data)
+    except InvalidTokenError:
+        raise credentials_exception
+    return token_data
+
+
+async def get_current_user_from_header_or_query(
+    token: Optional[str] = Query(None, description="Access token, for clients that cannot send headers (EventSource)"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    token = credentials.credentials if credentials else token
+    if not token:
+        raise credentials_exception
+    try:
+        token_data = decode_access_token(token)
+        await ensure_active_user(token_data)
+    except InvalidTokenError:
         raise credentials_exception
-    
-    # Here you would typically fetch the user from database
-    # For now, we'll just return the token data
-    return token_data
\ No newline at end of file
+    return token_data
+
+
+async def get_current_admin(current_user: TokenData = Depends(get_current_user)):
+    """Authenticated user listed in ``ADMIN_USERNAMES``"""
+    if current_user.username not in settings.admin_usernames:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
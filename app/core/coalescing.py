@@ -0,0 +1,96 @@
+import time
+from typing import Dict, List, Optional, Tuple
+from app.core.background import PeriodicTask
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.crud.email_events import EmailEventCRUD
+from app.database.connection import get_db_pool
+from app.schemas.email_events import EmailEventResponse
+
+
+class StormCoalescer:
+    """Fold alerts for the same trigger into the incident that opened the window.
+
+    The first event matching a trigger is stored as usual and opens a window
+    of ``window`` seconds; later events for that trigger in the window only
+    bump the incident's counter in memory. Counters are written back in one
+    batched UPDATE by ``flush``. State is per worker, so each worker opens
+    at most one incident per trigger and window.
+    """
+
+    def __init__(self, window: float, maxsize: int):
+        self.window = window
+        # trigger -> [incident, occurrences so far]
+        self._incidents = TTLCache(maxsize=maxsize, ttl=window)
+        # incident id -> [occurrences not yet written, last seen]
+        self._pending: Dict[str, List] = {}
+        self.coalesced = 0
+        self.flushed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def open(self, incident: EmailEventResponse):
+        if self.enabled and incident.trigger_matched:
+            self._incidents.set(incident.trigger_matched, [incident, incident.occurrence_count])
+
+    def incident_for(self, trigger_matched: Optional[str]) -> Optional[EmailEventResponse]:
+        """The open incident for ``trigger_matched``, if any"""
+        if not self.enabled or not trigger_matched:
+            return None
+        entry = self._incidents.get(trigger_matched)
+        return entry[0] if entry is not None else None
+
+    def fold(self, incident: EmailEventResponse) -> EmailEventResponse:
+        """Count one more occurrence of ``incident``.
+
+        Callers check the event is new first (see ``incident_for``); the
+        window may have closed meanwhile, the occurrence still counts.
+        """
+        entry = self._incidents.get(incident.trigger_matched)
+        if entry is not None and entry[0].id == incident.id:
+            entry[1] += 1
+            occurrences = entry[1]
+        else:
+            occurrences = incident.occurrence_count + 1
+        now = time.time()
+        pending = self._pending.setdefault(incident.id, [0, now])
+        pending[0] += 1
+        pending[1] = now
+        self.coalesced += 1
+        return incident.model_copy(update={"occurrence_count": occurrences})
+
+    async def flush(self) -> int:
+        """Write pending counters; they are put back if the write fails"""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        counts: List[Tuple[str, int, float]] = [
+            (incident_id, occurrences, last_seen) for incident_id, (occurrences, last_seen) in pending.items()
+        ]
+        try:
+            pool = await get_db_pool()
+            async with pool.acquire() as connection:
+                await EmailEventCRUD.add_occurrences(connection, counts)
+        except Exception:
+            for incident_id, (occurrences, last_seen) in pending.items():
+                merged = self._pending.setdefault(incident_id, [0, last_seen])
+                merged[0] += occurrences
+                merged[1] = max(merged[1], last_seen)
+            raise
+        self.flushed += sum(occurrences for _, occurrences, _ in counts)
+        return len(counts)
+
+    def stats(self) -> Dict:
+        return {
+            "window_seconds": self.window,
+            "open_incidents": len(self._incidents),
+            "coalesced": self.coalesced,
+            "flushed": self.flushed,
+            "pending": sum(occurrences for occurrences, _ in self._pending.values()),
+        }
+
+
+storm_coalescer = StormCoalescer(settings.storm_coalesce_window_seconds, settings.storm_coalesce_max_incidents)
+storm_flush_task = PeriodicTask("storm-flush", settings.storm_flush_interval_seconds, storm_coalescer.flush)
@@ -0,0 +1,99 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+from app.core.prometheus import Counter, Gauge, registry
+
+DEFAULT_EMERGENCY_LEVEL = "medium"
+RATE_SCOPES = ("contact", "group")
+
+
+class DispatchLimits:
+    """Per-contact and per-group call rates and concurrent call caps, by emergency level.
+
+    Both are enforced in the database, so they hold across workers: the token
+    buckets live in ``dispatch_rate_buckets`` and calls in progress in
+    ``dispatch_leases``. This object holds the configuration and this
+    worker's decision counters.
+    """
+
+    def __init__(
+        self,
+        contact_calls_per_minute: Dict[str, float],
+        group_calls_per_minute: Dict[str, float],
+        max_concurrent_calls: Dict[str, int],
+    ):
+        self.calls_per_minute = {"contact": contact_calls_per_minute, "group": group_calls_per_minute}
+        self.max_concurrent_calls = max_concurrent_calls
+        # (scope, level, outcome) -> decisions
+        self.counts: Dict[Tuple[str, str, str], int] = {}
+        self.active_calls: Optional[int] = None
+
+    def level(self, emergency_level: Optional[str]) -> str:
+        return emergency_level if emergency_level in self.max_concurrent_calls else DEFAULT_EMERGENCY_LEVEL
+
+    def max_active(self, level: str) -> int:
+        return self.max_concurrent_calls[level]
+
+    def rate_buckets(
+        self, level: str, contact_id: str, group_id: Optional[str]
+    ) -> List[Tuple[str, str, float, float]]:
+        """``(scope, key, capacity, refill per second)`` of the buckets a call spends from.
+
+        Burst of one minute's worth of calls, refilled continuously; at
+        least one call, or rates below one per minute could never place a
+        call. A rate of 0 blocks the level's calls.
+        """
+        buckets = []
+        for scope, key in (("contact", contact_id), ("group", group_id)):
+            rate = self.calls_per_minute[scope].get(level)
+            if key and rate is not None:
+                capacity = max(1.0, rate) if rate > 0 else 0.0
+                buckets.append((scope, f"{scope}:{key}", capacity, rate / 60))
+        return buckets
+
+    def _count(self, scope: str, level: str, outcome: str):
+        self.counts[(scope, level, outcome)] = self.counts.get((scope, level, outcome), 0) + 1
+
+    def record(
+        self,
+        level: str,
+        buckets: List[Tuple[str, str, float, float]],
+        limited_by: Optional[str],
+        active: Optional[int],
+    ):
+        """Count one ``acquire_lease`` outcome"""
+        if limited_by in RATE_SCOPES:
+            self._count(limited_by, level, "limited")
+            return
+        self._count("concurrency", level, "limited" if limited_by else "allowed")
+        if not limited_by:
+            for scope, _, _, _ in buckets:
+                self._count(scope, level, "allowed")
+        self.active_calls = active if limited_by else active + 1
+
+    def decisions(self) -> Iterable[Tuple[Tuple[str, ...], int]]:
+        return sorted(self.counts.items())
+
+    def stats(self) -> Dict:
+        return {
+            "active_calls": self.active_calls,
+            "max_concurrent_calls": self.max_concurrent_calls,
+            "calls_per_minute": self.calls_per_minute,
+            "decisions": {" ".join(labels): count for labels, count in sorted(self.counts.items())},
+        }
+
+
+dispatch_limits = DispatchLimits(
+    settings.dispatch_contact_calls_per_minute,
+    settings.dispatch_group_calls_per_minute,
+    settings.dispatch_max_concurrent_calls,
+)
+
+registry.register(Counter(
+    "mailtocall_dispatch_decisions_total", "Call dispatch decisions by limit, emergency level and outcome",
+    ("scope", "level", "outcome"), dispatch_limits.decisions,
+))
+registry.register(Gauge(
+    "mailtocall_dispatch_active_calls", "Calls in progress as of this worker's last dispatch",
+    (), lambda: [] if dispatch_limits.active_calls is None else [((), dispatch_limits.active_calls)],
+    aggregate="max",
+))
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from typing import Optional, Set
+import asyncpg
+import orjson
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Published by the notify triggers of migration 0014
+FEED_TABLES = ("email_events", "call_logs")
+
+
+class Subscription:
+    """Bounded per-client queue; a slow client loses its oldest events instead of
+    stalling the listener or other clients."""
+
+    def __init__(self, tables: Set[str], maxsize: int):
+        self.tables = tables
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, table: str, payload: str):
+        if table not in self.tables:
+            return
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(payload)
+
+    async def get(self) -> str:
+        """Next payload; if events were dropped, report that first so the client can resync"""
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            return orjson.dumps({"table": None, "op": "OVERFLOW", "dropped": dropped}).decode()
+        return await self._queue.get()
+
+
+class EventBroadcaster:
+    """One LISTEN connection per worker, fanned out to every subscribed client."""
+
+    def __init__(self, channel: str, queue_size: int):
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscription] = set()
+        self._connection: Optional[asyncpg.Connection] = None
+        self._supervisor: Optional[asyncio.Task] = None
+        self.notifications = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def _on_notification(self, connection, pid, channel, payload: str):
+        self.notifications += 1
+        try:
+            table = orjson.loads(payload).get("table")
+        except orjson.JSONDecodeError:
+            return
+        for subscription in self._subscribers:
+            subscription.put(table, payload)
+
+    async def _supervise(self):
+        """Keep the LISTEN connection open, reconnecting with backoff if it drops"""
+        delay = 1
+        while True:
+            lost = asyncio.Event()
+            try:
+                self._connection = await asyncpg.connect(settings.database_url)
+                self._connection.add_termination_listener(lambda _: lost.set())
+                await self._connection.add_listener(self.channel, self._on_notification)
+                delay = 1
+                await lost.wait()
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("Realtime listener connection failed: %s", e)
+            except Exception:
+                # Anything else (CancelledError is not an Exception) would end
+                # the listener for good; log it and reconnect like the rest
+                logger.exception("Realtime listener failed")
+            if self._connection is not None and not self._connection.is_closed():
+                self._connection.terminate()
+            self._connection = None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    async def start(self):
+        if self._supervisor is None:
+            self._supervisor = asyncio.create_task(self._supervise())
+
+    async def stop(self):
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            try:
+                await self._supervisor
+            except asyncio.CancelledError:
+                pass
+            self._supervisor = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def subscribe(self, tables: Set[str]) -> Subscription:
+        await self.start()
+        subscription = Subscription(tables, self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+
+broadcaster = EventBroadcaster(settings.realtime_channel, settings.realtime_queue_size)
@@ -0,0 +1,56 @@
+"""Call log export to CSV and Excel.
+
+pandas and openpyxl are imported on first use, not at startup: exports are
+rare and importing them costs every worker import time and resident memory.
+The builders are synchronous and meant to run in a threadpool.
+"""
+from io import BytesIO
+from typing import List
+
+EXPORT_COLUMNS = {
+    'id': 'ID',
+    'email_event_id': 'Email Event ID',
+    'contact_id': 'Contact ID',
+    'contact_name': 'Contact Name',
+    'phone_number': 'Phone Number',
+    'call_sid': 'Call SID',
+    'status': 'Status',
+    'duration': 'Duration (seconds)',
+    'attempt_number': 'Attempt Number',
+    'error_message': 'Error Message',
+    'created_at': 'Created At',
+    'updated_at': 'Updated At',
+    'from_email': 'From Email',
+    'email_subject': 'Email Subject'
+}
+DATETIME_COLUMNS = ('Created At', 'Updated At')
+EXCEL_SHEET = 'Call Logs'
+EXCEL_MAX_COLUMN_WIDTH = 50
+
+
+def _dataframe(call_logs: List[dict]):
+    import pandas as pd
+
+    df = pd.DataFrame(call_logs).rename(columns=EXPORT_COLUMNS)
+    for col in DATETIME_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col]).dt.strftime('%Y-%m-%d %H:%M:%S')
+    return df
+
+
+def call_logs_csv(call_logs: List[dict]) -> bytes:
+    return _dataframe(call_logs).to_csv(index=False).encode('utf-8')
+
+
+def call_logs_excel(call_logs: List[dict]) -> bytes:
+    import pandas as pd
+
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        _dataframe(call_logs).to_excel(writer, sheet_name=EXCEL_SHEET, index=False)
+        worksheet = writer.sheets[EXCEL_SHEET]
+        # Fit each column to its longest value
+        for column in worksheet.columns:
+            max_length = max(len(str(cell.value)) for cell in column)
+            worksheet.column_dimensions[column[0].column_letter].width = min(max_length + 2, EXCEL_MAX_COLUMN_WIDTH)
+    return buffer.getvalue()
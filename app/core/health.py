@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncpg
+from app.core.config import settings
+from app.crud.call_logs import CallLogCRUD
+from app.crud.contacts import ContactCRUD
+from app.crud.email_events import EmailEventCRUD
+from app.crud.triggers import TriggerCRUD
+
+logger = logging.getLogger(__name__)
+
+# Read-only calls on the alert path. Running them on every pool connection
+# fills each connection's prepared statement cache and pulls the index pages
+# they touch into shared buffers.
+WARMUP_CALLS: Tuple[Tuple[str, Callable[[asyncpg.Connection], Awaitable[Any]]], ...] = (
+    ("trigger match", lambda db: TriggerCRUD.get_by_trigger_string(db, "")),
+    ("group roster", lambda db: ContactCRUD.get_by_group_id(db, "")),
+    ("group roster version", lambda db: ContactCRUD.get_group_version(db, "")),
+    ("pending email events", lambda db: EmailEventCRUD.get_by_status(db, "pending", limit=1)),
+    ("calls of an email event", lambda db: CallLogCRUD.get_by_email_event_id(db, "", limit=1)),
+    ("calls of a contact", lambda db: CallLogCRUD.get_by_contact_id(db, "", limit=1)),
+)
+
+
+async def _warm_connection(connection: asyncpg.Connection):
+    for _, call in WARMUP_CALLS:
+        await call(connection)
+
+
+class Readiness:
+    """Whether this worker should receive traffic.
+
+    Not ready until every idle pool connection has run the warmup calls and
+    the extra warmers (e.g. the dashboard summary) have finished; a failed
+    warmup is retried by the next readiness probe.
+    """
+
+    def __init__(self):
+        self.warmed = False
+        self.warmup_seconds: Optional[float] = None
+        self.warmup_error: Optional[str] = None
+        self._pool: Optional[asyncpg.Pool] = None
+        self._warmers: Tuple[Callable[[], Awaitable[Any]], ...] = ()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, pool: asyncpg.Pool, *warmers: Callable[[], Awaitable[Any]]):
+        self._pool = pool
+        self._warmers = warmers
+        self._start_warmup()
+
+    def _start_warmup(self):
+        if self._pool is not None and not self.warmed and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._warm_up(), name="warmup")
+
+    async def _warm_up(self):
+        started = time.perf_counter()
+        connections = []
+        try:
+            # Hold them all at once so each warmup lands on a different connection
+            for _ in range(self._pool.get_min_size()):
+                connections.append(await self._pool.acquire())
+            await asyncio.gather(*(_warm_connection(connection) for connection in connections))
+            for connection in connections:
+                await self._pool.release(connection)
+            connections = []
+            for warmer in self._warmers:
+                await warmer()
+        except Exception as e:
+            self.warmup_error = str(e)
+            logger.exception("Warmup failed")
+            return
+        finally:
+            for connection in connections:
+                await self._pool.release(connection)
+        self.warmup_seconds = round(time.perf_counter() - started, 3)
+        self.warmup_error = None
+        self.warmed = True
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def check(self) -> Tuple[bool, Dict[str, Any]]:
+        """Readiness plus the state of each check, for the probe's response body"""
+        checks: Dict[str, Any] = {
+            "warmed": self.warmed,
+            "warmup_seconds": self.warmup_seconds,
+            "warmup_error": self.warmup_error,
+        }
+        if self._pool is None:
+            return False, {**checks, "database": "no pool"}
+        self._start_warmup()
+
+        size, idle, max_size = self._pool.get_size(), self._pool.get_idle_size(), self._pool.get_max_size()
+        free = idle + max_size - size
+        checks["pool"] = {"in_use": size - idle, "free": free, "max_size": max_size}
+        has_headroom = free >= settings.readiness_min_free_connections
+
+        database_ok = False
+        if has_headroom:
+            try:
+                await asyncio.wait_for(self._pool.fetchval("SELECT 1"), settings.readiness_db_timeout_seconds)
+                database_ok = True
+                checks["database"] = "ok"
+            except (asyncio.TimeoutError, OSError, asyncpg.PostgresError) as e:
+                checks["database"] = str(e) or type(e).__name__
+        else:
+            checks["database"] = "skipped: pool has no headroom"
+        return self.warmed and has_headroom and database_ok, checks
+
+
+readiness = Readiness()
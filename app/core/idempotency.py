@@ -0,0 +1,37 @@
+import hashlib
+from typing import Optional
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas.email_events import EmailEventCreate
+
+# Keys of recently ingested events -> their event id, so a poller retrying in
+# a tight loop is answered without a write transaction. Entries expire with
+# the key row in email_event_keys, not a full window after this worker saw it.
+recent_ingest_keys = TTLCache(
+    maxsize=settings.ingest_dedup_cache_size,
+    ttl=max(settings.ingest_dedup_window_seconds, settings.ingest_content_dedup_window_seconds)
+)
+
+
+def normalize_message_id(message_id: str) -> Optional[str]:
+    message_id = message_id.strip().strip("<>").strip()
+    return message_id or None
+
+
+def idempotency_key(email_event: EmailEventCreate) -> str:
+    """The Message-ID when the poller sends one, otherwise a hash of the content"""
+    message_id = normalize_message_id(email_event.message_id or "")
+    if message_id:
+        return f"mid:{message_id}"
+    content = "\0".join(
+        value or "" for value in (email_event.from_email.strip().lower(), email_event.subject, email_event.body)
+    )
+    return "sha256:" + hashlib.sha256(content.encode()).hexdigest()
+
+
+def dedup_window(key: str) -> float:
+    """Seconds a key dedupes for: a Message-ID identifies one email, while the
+    same content can be a genuine repeat of the alert a few minutes later"""
+    if key.startswith("mid:"):
+        return settings.ingest_dedup_window_seconds
+    return settings.ingest_content_dedup_window_seconds
@@ -0,0 +1,98 @@
+import os
+from datetime import timedelta
+from typing import Dict, List
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.timing import request_latency
+from app.crud.system_stats import SystemStatsCRUD
+from app.database.connection import get_db_pool
+from app.schemas.system_stats import SystemStatsCreate
+
+# Serializes the workers' samples of the deployment-wide metrics
+GLOBAL_METRICS_LOCK = "mailtocall_global_metrics"
+
+SAMPLE_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM email_events WHERE status = 'pending') AS pending_email_events,
+        (
+            SELECT COALESCE(json_object_agg(status, calls), '{}'::json)
+            FROM (
+                SELECT status, COUNT(*) AS calls FROM call_logs
+                WHERE created_at >= LOCALTIMESTAMP - $1::interval
+                GROUP BY status
+            ) recent
+        ) AS calls_by_status
+"""
+
+
+def _success_rate(calls_by_status: Dict[str, int]) -> Dict:
+    total = sum(calls_by_status.values())
+    succeeded = sum(calls_by_status.get(status, 0) for status in settings.metrics_call_success_statuses)
+    return {
+        "window_seconds": settings.metrics_sample_interval_seconds,
+        "total": total,
+        "succeeded": succeeded,
+        "rate": round(succeeded / total, 4) if total else None,
+        "by_status": calls_by_status,
+    }
+
+
+async def _global_samples_due(connection) -> bool:
+    """Whether this worker should sample the deployment-wide metrics now.
+
+    Every worker runs the sampler; the one that gets the lock and finds no
+    sample from the last interval takes it, so the rows are not repeated once
+    per worker. The lock is held until the caller's transaction ends.
+    """
+    if not await connection.fetchval("SELECT pg_try_advisory_xact_lock(hashtext($1))", GLOBAL_METRICS_LOCK):
+        return False
+    return not await connection.fetchval(
+        """
+        SELECT EXISTS (
+            SELECT 1 FROM system_stats
+            WHERE metric_name = 'pending_email_events' AND recorded_at > LOCALTIMESTAMP - $1::interval
+        )
+        """,
+        timedelta(seconds=settings.metrics_sample_interval_seconds * 0.9)
+    )
+
+
+async def sample_metrics() -> List[SystemStatsCreate]:
+    """Take one sample and store it in ``system_stats`` with a single batched insert.
+
+    Pool and latency metrics are this worker's; pending events and the call
+    success rate are the same for every worker and written by one of them.
+    """
+    pool = await get_db_pool()
+    worker = os.getpid()
+    size, idle = pool.get_size(), pool.get_idle_size()
+    samples = [
+        SystemStatsCreate(metric_name="pool_utilization", metric_value={
+            "worker": worker,
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "max_size": pool.get_max_size(),
+        }),
+        SystemStatsCreate(metric_name="request_latency", metric_value={
+            "worker": worker,
+            "routes": request_latency.collect(),
+        }),
+    ]
+    async with pool.acquire() as connection:
+        async with connection.transaction():
+            if await _global_samples_due(connection):
+                row = await connection.fetchrow(
+                    SAMPLE_QUERY, timedelta(seconds=settings.metrics_sample_interval_seconds)
+                )
+                samples += [
+                    SystemStatsCreate(metric_name="pending_email_events", metric_value={
+                        "count": row["pending_email_events"],
+                    }),
+                    SystemStatsCreate(metric_name="call_success_rate", metric_value=_success_rate(row["calls_by_status"])),
+                ]
+            await SystemStatsCRUD.create_many(connection, samples)
+    return samples
+
+
+metrics_sampler = PeriodicTask("metrics-sampler", settings.metrics_sample_interval_seconds, sample_metrics)
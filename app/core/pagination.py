@@ -0,0 +1,33 @@
+import base64
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence, Tuple
+import orjson
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque keyset cursor holding the sort key of the last row of a page"""
+    payload = orjson.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], converters: Sequence[Callable[[Any], Any]]) -> Optional[Tuple]:
+    """Decode a cursor built by ``encode_cursor``; raises 400 if it is malformed"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = orjson.loads(base64.urlsafe_b64decode(padded))
+        if len(values) != len(converters):
+            raise ValueError("cursor has the wrong number of fields")
+        return tuple(convert(value) for convert, value in zip(converters, values))
+    except (ValueError, TypeError, orjson.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def set_next_cursor(response: Response, items: Sequence, limit: int, key: Callable[[Any], Tuple]):
+    """Advertise the next page's cursor when the current page is full"""
+    if len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(items[-1]))
@@ -0,0 +1,219 @@
+import bisect
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import orjson
+from app.core.background import PeriodicTask
+from app.core.config import settings
+
+# Seconds; roughly doubling from 1 ms to 10 s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Cumulative Prometheus histogram; one bucket array per label set"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        series = self._series.get(labels)
+        if series is None:
+            # bucket counts (last one is +Inf), sum
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def collect(self) -> Dict:
+        return {
+            "name": self.name, "documentation": self.documentation, "type": "histogram",
+            "labelnames": self.labelnames, "buckets": self.buckets,
+            "samples": [(labels, (list(counts), total)) for labels, (counts, total) in self._series.items()],
+        }
+
+
+class Gauge:
+    """Gauge read from a callback at scrape time.
+
+    ``aggregate`` says how the values of several workers combine: ``sum``
+    (e.g. pool connections) or ``max`` (e.g. a value each worker observes
+    of the whole deployment).
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]],
+        aggregate: str = "sum",
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._collect = collect
+        self.aggregate = aggregate
+
+    def collect(self) -> Dict:
+        return {
+            "name": self.name, "documentation": self.documentation, "type": self.type,
+            "labelnames": self.labelnames, "aggregate": self.aggregate,
+            "samples": [(tuple(labels), value) for labels, value in self._collect()],
+        }
+
+
+class Counter(Gauge):
+    """Monotonic counter read from a callback at scrape time"""
+
+    type = "counter"
+
+
+def _render_family(family: Dict) -> List[str]:
+    name, labelnames = family["name"], family["labelnames"]
+    lines = [f"# HELP {name} {family['documentation']}", f"# TYPE {name} {family['type']}"]
+    for labels, value in sorted(family["samples"], key=lambda sample: tuple(sample[0])):
+        if family["type"] != "histogram":
+            lines.append(f"{name}{_labels(labelnames, labels)} {value}")
+            continue
+        counts, total = value
+        cumulative = 0
+        for bound, count in zip(family["buckets"], counts):
+            cumulative += count
+            le = 'le="%s"' % bound
+            lines.append(f"{name}_bucket{_labels(labelnames, labels, le)} {cumulative}")
+        cumulative += counts[-1]
+        le = 'le="+Inf"'
+        lines.append(f"{name}_bucket{_labels(labelnames, labels, le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labelnames, labels)} {total}")
+        lines.append(f"{name}_count{_labels(labelnames, labels)} {cumulative}")
+    return lines
+
+
+def render_families(families: Iterable[Dict]) -> str:
+    lines = []
+    for family in families:
+        lines.extend(_render_family(family))
+    return "\n".join(lines) + "\n"
+
+
+def merge_families(snapshots: Iterable[Tuple[List[Dict], bool]]) -> List[Dict]:
+    """Combine the families of several workers, given as (families, worker alive).
+
+    Histograms and counters add up, including those of workers that have
+    exited, so totals never go backwards; gauges only combine live workers.
+    """
+    merged: Dict[str, Dict] = {}
+    for families, alive in snapshots:
+        for family in families:
+            if family["type"] not in ("histogram", "counter") and not alive:
+                continue
+            target = merged.setdefault(family["name"], {**family, "samples": {}})
+            samples = target["samples"]
+            for labels, value in family["samples"]:
+                labels = tuple(labels)
+                if labels not in samples:
+                    samples[labels] = value
+                elif family["type"] == "histogram":
+                    counts, total = samples[labels]
+                    samples[labels] = ([a + b for a, b in zip(counts, value[0])], total + value[1])
+                elif family.get("aggregate") == "max":
+                    samples[labels] = max(samples[labels], value)
+                else:
+                    samples[labels] = samples[labels] + value
+    return [{**family, "samples": list(family["samples"].items())} for family in merged.values()]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collect(self) -> List[Dict]:
+        return [metric.collect() for metric in self._metrics]
+
+    def render(self) -> str:
+        return render_families(self.collect())
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class WorkerSnapshots:
+    """Each worker's metrics as a file in a directory shared by the workers of one instance.
+
+    Workers share the listening port, so a scrape reaches one of them at
+    random; rendering the merged snapshots gives every scrape the totals of
+    the whole instance. The directory must be emptied before the workers
+    start (run.py does), or the counters of a previous run add up too.
+    """
+
+    def __init__(self, registry: "Registry", path: str):
+        self.registry = registry
+        self.path = Path(path)
+
+    def write(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        target = self.path / f"{os.getpid()}.json"
+        partial = target.with_suffix(".tmp")
+        partial.write_bytes(orjson.dumps(self.registry.collect()))
+        # Readers never see a half-written file
+        os.replace(partial, target)
+
+    def render(self) -> str:
+        self.write()
+        snapshots = []
+        for path in self.path.glob("*.json"):
+            try:
+                snapshots.append((orjson.loads(path.read_bytes()), _alive(int(path.stem))))
+            except (OSError, ValueError):
+                continue
+        return render_families(merge_families(snapshots))
+
+    def clear(self):
+        for path in self.path.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+
+registry = Registry()
+
+# Set when several workers serve one instance: /metrics then merges the
+# snapshot every worker writes every METRICS_SNAPSHOT_INTERVAL_SECONDS
+worker_snapshots: Optional[WorkerSnapshots] = (
+    WorkerSnapshots(registry, settings.metrics_multiprocess_dir) if settings.metrics_multiprocess_dir else None
+)
+
+
+async def _write_snapshot():
+    worker_snapshots.write()
+
+
+metrics_snapshot_task = PeriodicTask(
+    "metrics-snapshot", settings.metrics_snapshot_interval_seconds if worker_snapshots else 0, _write_snapshot
+)
@@ -0,0 +1,109 @@
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class TokenBucket:
+    """Classic token bucket: ``capacity`` tokens refilled at ``refill_rate`` per second."""
+
+    __slots__ = ("capacity", "refill_rate", "_tokens", "_updated_at")
+
+    def __init__(self, capacity: float, refill_rate: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_rate)
+            self._updated_at = now
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    @property
+    def is_full(self) -> bool:
+        return self.tokens >= self.capacity
+
+    def consume(self, amount: float = 1) -> bool:
+        self._refill()
+        if self._tokens < amount:
+            return False
+        self._tokens -= amount
+        return True
+
+    def refund(self, amount: float = 1):
+        """Give back tokens taken by ``consume``, up to the capacity."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+    def retry_after(self, amount: float = 1) -> float:
+        """Seconds until ``amount`` tokens are available."""
+        missing = amount - self.tokens
+        if missing <= 0:
+            return 0.0
+        if self.refill_rate <= 0:
+            return float("inf")
+        return missing / self.refill_rate
+
+
+class KeyedRateLimiter:
+    """One token bucket per key, bounded to ``max_keys`` least recently used keys."""
+
+    def __init__(self, capacity: float, refill_rate: float, max_keys: int = 10000):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+
+    def bucket(self, key: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.capacity, self.refill_rate)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._evict()
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _evict(self):
+        # Full buckets carry no state, drop those first; otherwise fall back to LRU
+        for key in [k for k, b in self._buckets.items() if b.is_full]:
+            del self._buckets[key]
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def check(self, key: Hashable, amount: float = 1) -> bool:
+        """Whether ``amount`` tokens are available, without consuming them."""
+        bucket = self._buckets.get(key)
+        return bucket is None or bucket.tokens >= amount
+
+    def consume(self, key: Hashable, amount: float = 1) -> bool:
+        if self.bucket(key).consume(amount):
+            self.allowed += 1
+            return True
+        self.limited += 1
+        return False
+
+    def refund(self, key: Hashable, amount: float = 1):
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.refund(amount)
+
+    def retry_after(self, key: Hashable, amount: float = 1) -> float:
+        bucket = self._buckets.get(key)
+        return 0.0 if bucket is None else bucket.retry_after(amount)
+
+    def reset(self, key: Hashable):
+        self._buckets.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"keys": len(self._buckets), "allowed": self.allowed, "limited": self.limited}
@@ -0,0 +1,51 @@
+import math
+from typing import Any, AsyncIterator, Iterable, Mapping
+import orjson
+from fastapi.responses import Response, StreamingResponse
+
+
+class ORJSONResponse(Response):
+    """JSON response rendered with orjson; datetimes and lists serialize natively."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content)
+
+
+def paginated_records_response(
+    rows: Iterable[Mapping[str, Any]],
+    total: int,
+    page: int,
+    per_page: int
+) -> ORJSONResponse:
+    """Serialize database rows straight into a ``PaginatedResponse`` body.
+
+    Skips building Pydantic models for rows Postgres has already typed and the
+    ``response_model`` re-validation FastAPI does on returned models.
+    """
+    return ORJSONResponse({
+        "items": [dict(row) for row in rows],
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": math.ceil(total / per_page),
+    })
+
+
+async def _ndjson_chunks(rows: AsyncIterator[Mapping[str, Any]], batch_size: int) -> AsyncIterator[bytes]:
+    batch = []
+    async for row in rows:
+        batch.append(orjson.dumps(dict(row)))
+        if len(batch) >= batch_size:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+
+def ndjson_response(rows: AsyncIterator[Mapping[str, Any]], batch_size: int = 500) -> StreamingResponse:
+    """Stream rows as newline-delimited JSON, ``batch_size`` rows per chunk"""
+    return StreamingResponse(_ndjson_chunks(rows, batch_size), media_type="application/x-ndjson")
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional
+import asyncpg
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.database.connection import get_db_pool
+from app.database.partitions import drop_expired_partitions, is_partitioned
+
+logger = logging.getLogger(__name__)
+
+# Walks the primary key in order, deleting the expired rows of each batch.
+# Ids grow with time, so the first batch without expired rows ends the run.
+KEY_RANGE_BATCH_SQL = """
+    WITH batch AS (
+        SELECT {key}, {timestamp_column} FROM {table}
+        WHERE {key} > $1
+        ORDER BY {key}
+        LIMIT $2
+    ), deleted AS (
+        DELETE FROM {table}
+        WHERE {key} IN (SELECT {key} FROM batch WHERE {timestamp_column} < $3){condition}
+        RETURNING 1
+    )
+    SELECT (SELECT max({key}) FROM batch) AS last_key,
+           (SELECT count(*) FROM batch) AS scanned,
+           (SELECT count(*) FROM deleted) AS deleted
+"""
+
+# For tables without an ordered key: oldest expired rows first
+OLDEST_FIRST_BATCH_SQL = """
+    WITH batch AS (
+        SELECT {key} FROM {table}
+        WHERE {timestamp_column} < $1{condition}
+        ORDER BY {timestamp_column}
+        LIMIT $2
+        FOR UPDATE SKIP LOCKED
+    )
+    DELETE FROM {table} WHERE {key} IN (SELECT {key} FROM batch)
+"""
+
+
+class RetentionPolicy:
+    """How long rows of one table are kept and how to find expired ones"""
+
+    def __init__(
+        self,
+        table: str,
+        timestamp_column: str,
+        days: int,
+        key: str = "id",
+        ordered_key: bool = True,
+        condition: Optional[str] = None
+    ):
+        self.table = table
+        self.timestamp_column = timestamp_column
+        self.days = days
+        self.key = key
+        self.ordered_key = ordered_key
+        self.condition = condition
+
+    def batch_sql(self) -> str:
+        template = KEY_RANGE_BATCH_SQL if self.ordered_key else OLDEST_FIRST_BATCH_SQL
+        condition = f" AND {self.condition}" if self.condition else ""
+        return template.format(
+            table=self.table, key=self.key, timestamp_column=self.timestamp_column, condition=condition
+        )
+
+
+def default_policies() -> List[RetentionPolicy]:
+    key_window = max(settings.ingest_dedup_window_seconds, settings.ingest_content_dedup_window_seconds)
+    # call_logs go first so the email events they reference can be purged in the same run
+    return [
+        RetentionPolicy("call_logs", "created_at", settings.retention_call_logs_days),
+        RetentionPolicy(
+            "email_events", "received_at", settings.retention_email_events_days, ordered_key=False,
+            condition="NOT EXISTS (SELECT 1 FROM call_logs c WHERE c.email_event_id = email_events.id)"
+        ),
+        # Dropped or detached partitions leave their ids behind (migration 0015)
+        RetentionPolicy(
+            "call_log_ids", "created_at", settings.retention_call_logs_days,
+            condition="NOT EXISTS (SELECT 1 FROM call_logs c WHERE c.id = call_log_ids.id "
+                      "AND c.created_at = call_log_ids.created_at)"
+        ),
+        RetentionPolicy(
+            "email_event_ids", "received_at", settings.retention_email_events_days, ordered_key=False,
+            condition="NOT EXISTS (SELECT 1 FROM email_events e WHERE e.id = email_event_ids.id "
+                      "AND e.received_at = email_event_ids.received_at)"
+        ),
+        RetentionPolicy("system_stats", "recorded_at", settings.retention_system_stats_days),
+        # A rate bucket idle for a minute is full again; the row carries no state
+        RetentionPolicy("dispatch_rate_buckets", "updated_at", 1, key="key", ordered_key=False),
+        # Keys outside the dedup window no longer match anything
+        RetentionPolicy(
+            "email_event_keys", "created_at", math.ceil(key_window / 86400) + 1, key="key", ordered_key=False
+        ),
+    ]
+
+
+class RetentionEngine:
+    """Purges expired rows in small batches, one transaction each, pausing in between.
+
+    A session advisory lock keeps two workers from purging at the same time.
+    """
+
+    LOCK_NAME = "mailtocall_retention"
+
+    def __init__(self, policies: List[RetentionPolicy], batch_size: int, pause_seconds: float):
+        self.policies = policies
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.running = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.tables: Dict[str, Dict[str, Any]] = {}
+
+    async def _purge(self, connection: asyncpg.Connection, policy: RetentionPolicy, progress: Dict[str, Any]):
+        cutoff = await connection.fetchval("SELECT LOCALTIMESTAMP - make_interval(days => $1)", policy.days)
+        progress["cutoff"] = cutoff
+        if await is_partitioned(connection, policy.table):
+            # Whole months go at once, unless a row in them fails the policy's
+            # condition; the batches below then purge what is left (the
+            # boundary month and kept partitions).
+            # Detached partitions are kept for archiving, so with
+            # detach_only rows only ever leave with their partition.
+            progress["partitions_removed"] = await drop_expired_partitions(
+                connection, policy.table, cutoff, settings.partition_detach_only, policy.condition
+            )
+            if settings.partition_detach_only:
+                progress["batches"] += 1
+                return
+        sql = policy.batch_sql()
+        last_key = None
+        while True:
+            if policy.ordered_key:
+                row = await connection.fetchrow(sql, last_key if last_key is not None else -1, self.batch_size, cutoff)
+                deleted, last_key = row["deleted"], row["last_key"]
+                done = row["scanned"] < self.batch_size or deleted == 0
+            else:
+                result = await connection.execute(sql, cutoff, self.batch_size)
+                deleted = int(result.split()[-1])
+                done = deleted < self.batch_size
+            progress["deleted"] += deleted
+            progress["batches"] += 1
+            if done:
+                return
+            await asyncio.sleep(self.pause_seconds)
+
+    async def run(self) -> Dict[str, Any]:
+        """Apply every policy once; returns the progress report"""
+        if self.running:
+            return self.status()
+        self.running = True
+        self.started_at, self.finished_at = time.time(), None
+        try:
+            pool = await get_db_pool()
+            async with pool.acquire() as connection:
+                locked = await connection.fetchval("SELECT pg_try_advisory_lock(hashtext($1))", self.LOCK_NAME)
+                if not locked:
+                    logger.info("Retention already running in another worker")
+                    return self.status()
+                try:
+                    for policy in self.policies:
+                        if policy.days <= 0:
+                            continue
+                        progress = self.tables[policy.table] = {
+                            "days": policy.days, "cutoff": None, "deleted": 0, "batches": 0,
+                            "state": "running", "error": None,
+                        }
+                        try:
+                            await self._purge(connection, policy, progress)
+                            progress["state"] = "done"
+                        except asyncpg.PostgresError as e:
+                            progress["state"], progress["error"] = "failed", str(e)
+                            logger.warning("Retention of %s failed: %s", policy.table, e)
+                finally:
+                    await connection.execute("SELECT pg_advisory_unlock(hashtext($1))", self.LOCK_NAME)
+        finally:
+            self.running = False
+            self.finished_at = time.time()
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "batch_size": self.batch_size,
+            "tables": self.tables,
+        }
+
+
+retention_engine = RetentionEngine(
+    default_policies(), settings.retention_batch_size, settings.retention_batch_pause_seconds
+)
+retention_task = PeriodicTask(
+    "retention", settings.retention_interval_seconds, retention_engine.run,
+    initial_delay=settings.retention_interval_seconds
+)
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from typing import Optional
+import asyncpg
+
+# Recomputes the buckets maintained by the call_logs_rollup trigger
+# (app/database/migrations/0003_call_stats_rollups.sql), using the group and
+# trigger each call log was counted under (0008_call_log_rollup_keys.sql)
+REBUILD_SQL = """
+INSERT INTO call_stats_rollups
+    (bucket_size, bucket_start, group_id, trigger_matched, status,
+     calls, attempts, total_duration, duration_samples)
+SELECT s.size, date_trunc(s.size, cl.created_at), COALESCE(cl.rollup_group_id, ''), COALESCE(cl.rollup_trigger, ''),
+       COALESCE(cl.status, ''), COUNT(*), SUM(COALESCE(cl.attempt_number, 1)),
+       COALESCE(SUM(cl.duration), 0), COUNT(cl.duration)
+FROM call_logs cl
+CROSS JOIN (VALUES ('minute'), ('hour'), ('day')) AS s(size)
+WHERE cl.created_at >= $1::timestamp AND cl.created_at < $2::timestamp
+GROUP BY 1, 2, 3, 4, 5
+"""
+
+DELETE_SQL = "DELETE FROM call_stats_rollups WHERE bucket_start >= $1::timestamp AND bucket_start < $2::timestamp"
+
+
+async def rebuild_rollups(connection: asyncpg.Connection, since: Optional[datetime] = None) -> int:
+    """Recompute the rollups from ``call_logs``, starting at the day of ``since`` (everything by default).
+
+    Every bucket lies within one day, so the rebuild goes a day at a time,
+    each in its own transaction: call log writes wait for one day's
+    aggregate instead of the whole rebuild.
+    """
+    bounds = await connection.fetchrow(
+        """
+        SELECT date_trunc('day', MIN(created_at)) AS first_day, date_trunc('day', MAX(created_at)) AS last_day
+        FROM call_logs WHERE created_at >= date_trunc('day', $1::timestamp)
+        """,
+        since or datetime.min
+    )
+    start = datetime.min if since is None else since.replace(hour=0, minute=0, second=0, microsecond=0)
+    day = bounds["first_day"] or start
+    last_day = bounds["last_day"] or day
+
+    rebuilt = 0
+    # The first transaction also clears buckets before the oldest call log and
+    # the last one everything after the newest, including rows written meanwhile
+    lower = start
+    while True:
+        upper = day + timedelta(days=1) if day < last_day else datetime.max
+        async with connection.transaction():
+            # Block concurrent call log writes so none is counted twice or missed
+            await connection.execute("LOCK TABLE call_logs IN SHARE MODE")
+            await connection.execute(DELETE_SQL, lower, upper)
+            result = await connection.execute(REBUILD_SQL, lower, upper)
+        rebuilt += int(result.split()[-1])
+        if upper == datetime.max:
+            return rebuilt
+        day = lower = upper
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import random
+import re
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.core.timing import current_timing, normalize_sql, route_label, statement_label
+
+logger = logging.getLogger(__name__)
+
+# Only read-only statements are re-run under EXPLAIN ANALYZE; anything that
+# writes or locks rows is logged without a plan
+_READS = re.compile(r"(SELECT|WITH)\b", re.IGNORECASE)
+_WRITES = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE|COPY|CALL)\b", re.IGNORECASE)
+# A SELECT can still have effects the rollback does not undo: session
+# advisory locks, sequence advances, session settings, notifications, sleeps
+_SIDE_EFFECTS = re.compile(
+    r"\b(pg_\w*advisory\w*|nextval|setval|set_config|pg_notify|pg_sleep\w*|pg_cancel_backend"
+    r"|pg_terminate_backend|pg_reload_conf|pg_rotate_logfile|txid_current|pg_current_xact_id|lo_\w+|dblink\w*)\s*\("
+    r"|\bFOR\s+(NO\s+KEY\s+)?(UPDATE|SHARE)\b|\bFOR\s+KEY\s+SHARE\b",
+    re.IGNORECASE
+)
+
+
+def param_shape(value: Any) -> str:
+    """Type of a query parameter without its value; lists also report their length"""
+    if value is None:
+        return "null"
+    if isinstance(value, (list, tuple)):
+        inner = sorted({param_shape(item) for item in value})
+        return f"{'|'.join(inner) or 'empty'}[{len(value)}]"
+    return type(value).__name__
+
+
+def explainable(query: str) -> bool:
+    normalized = normalize_sql(query)
+    return (
+        bool(_READS.match(normalized)) and not _WRITES.search(normalized) and not _SIDE_EFFECTS.search(normalized)
+    )
+
+
+class SlowQueryLog:
+    """asyncpg query logger that records statements slower than a threshold.
+
+    A sampled fraction of slow read-only statements is re-run with
+    ``EXPLAIN (ANALYZE, BUFFERS)`` inside a transaction that is rolled back,
+    one at a time, and the plans are kept in a ring buffer.
+    """
+
+    def __init__(self, threshold_ms: float, size: int, plan_size: int, sample_rate: float = 0.0):
+        self.threshold = threshold_ms / 1000
+        self.entries: deque = deque(maxlen=size)
+        self.plans: deque = deque(maxlen=plan_size)
+        self.sample_rate = sample_rate
+        self.sample_until: Optional[float] = None
+        self.observed = 0
+        self._explaining: Optional[asyncio.Task] = None
+
+    @property
+    def sampling_rate(self) -> float:
+        if self.sample_until is not None and time.time() > self.sample_until:
+            self.sample_rate, self.sample_until = settings.slow_query_explain_sample_rate, None
+        return self.sample_rate
+
+    def start_sampling(self, rate: float, seconds: Optional[float] = None):
+        """Explain ``rate`` of slow statements, reverting to the configured rate after ``seconds``"""
+        self.sample_rate = rate
+        self.sample_until = time.time() + seconds if seconds else None
+
+    def observe(self, record):
+        if record.elapsed < self.threshold or record.query.startswith("EXPLAIN"):
+            return
+        timing = current_timing.get()
+        entry = {
+            "at": time.time(),
+            "statement": statement_label(record.query),
+            "params": [param_shape(arg) for arg in record.args or ()],
+            "duration_ms": round(record.elapsed * 1000, 3),
+            "route": route_label(timing.scope) if timing is not None else None,
+            "error": type(record.exception).__name__ if record.exception else None,
+        }
+        self.observed += 1
+        self.entries.append(entry)
+        logger.warning(
+            "Slow query %.1f ms route=%s params=(%s): %s",
+            entry["duration_ms"], entry["route"], ", ".join(entry["params"]), normalize_sql(record.query),
+        )
+        rate = self.sampling_rate
+        # Only statements issued by a request: background tasks and the
+        # migration runner run maintenance statements that must not run twice
+        if (
+            timing is not None and rate > 0 and random.random() < rate and explainable(record.query)
+            and (self._explaining is None or self._explaining.done())
+        ):
+            self._explaining = asyncio.get_running_loop().create_task(
+                self._explain(entry, record.query, record.args or ())
+            )
+
+    async def _explain(self, entry: Dict, query: str, args):
+        # Imported here: the connection module registers this logger on every connection
+        from app.database.connection import get_db_pool
+
+        pool = await get_db_pool()
+        try:
+            async with pool.acquire() as connection:
+                transaction = connection.transaction(readonly=True)
+                await transaction.start()
+                try:
+                    await connection.execute(
+                        f"SET LOCAL statement_timeout = {int(settings.slow_query_explain_timeout_seconds * 1000)}"
+                    )
+                    plan = await connection.fetchval(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", *args)
+                finally:
+                    await transaction.rollback()
+        except Exception as e:
+            logger.warning("Could not explain slow query %s: %s", entry["statement"], e)
+            return
+        self.plans.append({**entry, "plan": plan})
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "observed": self.observed,
+            "sample_rate": self.sampling_rate,
+            "sample_until": self.sample_until,
+        }
+
+    def recent(self) -> List[Dict]:
+        return list(reversed(self.entries))
+
+    def recent_plans(self) -> List[Dict]:
+        return list(reversed(self.plans))
+
+    def clear(self):
+        self.entries.clear()
+        self.plans.clear()
+        self.observed = 0
+
+
+slow_query_log = SlowQueryLog(
+    settings.slow_query_threshold_ms,
+    settings.slow_query_log_size,
+    settings.slow_query_plan_buffer_size,
+    settings.slow_query_explain_sample_rate,
+)
@@ -0,0 +1,228 @@
+import asyncio
+import bisect
+import contextvars
+import functools
+import hashlib
+import re
+import time
+from typing import Dict, Optional
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from app.core.prometheus import Histogram, registry
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram; ``observe`` is a bisect and two additions"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, elapsed_ms: float):
+        self.counts[bisect.bisect_left(self.buckets, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``q`` quantile"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p99_ms": self.quantile(0.99),
+            "buckets": {
+                **{f"le_{bound}": bucket_count for bound, bucket_count in zip(self.buckets, self.counts)},
+                "le_inf": self.counts[-1],
+            },
+        }
+
+
+class LatencyRecorder:
+    """Request latency histograms per route, swapped out on every sample"""
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def observe(self, route: str, elapsed_ms: float):
+        histogram = self._histograms.get(route)
+        if histogram is None:
+            histogram = self._histograms[route] = LatencyHistogram()
+        histogram.observe(elapsed_ms)
+
+    def collect(self) -> Dict[str, Dict]:
+        histograms, self._histograms = self._histograms, {}
+        return {route: histogram.snapshot() for route, histogram in sorted(histograms.items())}
+
+
+request_latency = LatencyRecorder()
+
+request_duration = registry.register(Histogram(
+    "mailtocall_http_request_duration_seconds", "Time to the start of the response",
+    ("method", "route", "status"),
+))
+request_phase_duration = registry.register(Histogram(
+    "mailtocall_http_request_phase_seconds", "Request time split by phase",
+    ("route", "phase"),
+))
+statement_duration = registry.register(Histogram(
+    "mailtocall_db_statement_duration_seconds", "Execution time per normalized SQL statement",
+    ("statement",),
+))
+
+
+class RequestTiming:
+    """Where one request spent its time; filled in by the DB layer and ``TimedRoute``"""
+
+    __slots__ = ("scope", "started", "acquire", "db", "queries", "handler_started", "handler_finished")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.acquire = 0.0
+        self.db = 0.0
+        self.queries = 0
+        self.handler_started: Optional[float] = None
+        self.handler_finished: Optional[float] = None
+
+    def phases(self, now: float) -> Dict[str, float]:
+        """Seconds per phase; ``handler`` is endpoint time not spent waiting on the database"""
+        phases = {"acquire": self.acquire, "db": self.db}
+        if self.handler_started is not None and self.handler_finished is not None:
+            phases["dependencies"] = self.handler_started - self.started
+            phases["handler"] = max(0.0, self.handler_finished - self.handler_started - self.acquire - self.db)
+            phases["serialize"] = now - self.handler_finished
+        phases["total"] = now - self.started
+        return phases
+
+
+current_timing: contextvars.ContextVar[Optional[RequestTiming]] = contextvars.ContextVar("request_timing", default=None)
+
+
+def record_acquire(elapsed: float):
+    timing = current_timing.get()
+    if timing is not None:
+        timing.acquire += elapsed
+
+
+def record_query(elapsed: float):
+    timing = current_timing.get()
+    if timing is not None:
+        timing.db += elapsed
+        timing.queries += 1
+
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|(?<![$\w])\d+(?:\.\d+)?\b")
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(query: str) -> str:
+    """Single-line statement with literals replaced by ``?``; ``$n`` placeholders are kept"""
+    return _LITERALS.sub("?", _WHITESPACE.sub(" ", query).strip())
+
+
+@functools.lru_cache(maxsize=1024)
+def statement_label(query: str) -> str:
+    """Short, stable label for a statement: its start plus a fingerprint of the whole text"""
+    normalized = normalize_sql(query)
+    fingerprint = hashlib.sha1(normalized.encode()).hexdigest()[:8]
+    return f"{normalized[:80]} [{fingerprint}]"
+
+
+def log_query(record):
+    """asyncpg query logger; runs for every statement on every pool connection"""
+    statement_duration.observe((statement_label(record.query),), record.elapsed)
+
+
+def route_label(scope) -> str:
+    """Path template of the matched route, so ``/contacts/{contact_id}`` is one series"""
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or "unmatched"
+
+
+def _timed_endpoint(endpoint):
+    @functools.wraps(endpoint)
+    async def timed(*args, **kwargs):
+        timing = current_timing.get()
+        if timing is None:
+            return await endpoint(*args, **kwargs)
+        timing.handler_started = time.perf_counter()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            timing.handler_finished = time.perf_counter()
+
+    timed.__timed__ = True
+    return timed
+
+
+class TimedRoute(APIRoute):
+    """Route whose endpoint reports when it starts and returns, separating the
+    handler from dependency resolution and response serialization."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if asyncio.iscoroutinefunction(endpoint) and not getattr(endpoint, "__timed__", False):
+            endpoint = _timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def server_timing(phases: Dict[str, float], queries: int) -> str:
+    entries = []
+    for phase, seconds in phases.items():
+        entry = f"{phase};dur={seconds * 1000:.3f}"
+        if phase == "db":
+            entry += f';desc="{queries} queries"'
+        entries.append(entry)
+    return ", ".join(entries)
+
+
+class TimingMiddleware:
+    """Time each request up to the start of its response and attribute it to phases.
+
+    Streaming bodies are not included, so SSE and NDJSON responses do not skew
+    the histograms.
+    """
+
+    def __init__(self, app, server_timing_header: bool = True):
+        self.app = app
+        self.server_timing_header = server_timing_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        timing = RequestTiming(scope)
+        token = current_timing.set(timing)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                phases = timing.phases(time.perf_counter())
+                route = route_label(scope)
+                request_latency.observe(f"{scope['method']} {route}", phases["total"] * 1000)
+                request_duration.observe((scope["method"], route, str(message["status"])), phases["total"])
+                for phase, seconds in phases.items():
+                    if phase != "total":
+                        request_phase_duration.observe((route, phase), seconds)
+                if self.server_timing_header:
+                    MutableHeaders(scope=message).append("Server-Timing", server_timing(phases, timing.queries))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_timing.reset(token)
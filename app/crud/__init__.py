@@ -4,6 +4,9 @@ from .contacts import ContactCRUD
 from .call_logs import CallLogCRUD
 from .email_events import EmailEventCRUD
 from .system_stats import SystemStatsCRUD
+from .users import UserCRUD
+from .call_stats import CallStatsCRUD
+from .dispatch import DispatchCRUD
 
 __all__ = [
     "ContactGroupCRUD",
@@ -11,5 +14,8 @@ __all__ = [
     "ContactCRUD",
     "CallLogCRUD",
     "EmailEventCRUD",
-    "SystemStatsCRUD"
+    "SystemStatsCRUD",
+    "UserCRUD",
+    "CallStatsCRUD",
+    "DispatchCRUD"
 ]
\ No newline at end of file
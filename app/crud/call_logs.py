@@ -1,7 +1,8 @@
 import asyncpg
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime, date
 from app.schemas.call_logs import CallLogCreate, CallLogUpdate, CallLogResponse
+from app.crud.rows import from_row, from_rows
 
 
 class CallLogCRUD:
@@ -24,28 +25,32 @@ class CallLogCRUD:
             call_log.attempt_number,
             call_log.error_message
         )
-        return CallLogResponse(**dict(row))
+        return from_row(CallLogResponse, row)
     
     @staticmethod
     async def get_by_id(db: asyncpg.Connection, call_log_id: int) -> Optional[CallLogResponse]:
         query = """
             SELECT id, email_event_id, contact_id, phone_number, call_sid, status, duration, attempt_number, error_message, created_at, updated_at
             FROM call_logs
-            WHERE id = $1
+            WHERE id = $1 AND created_at = (SELECT created_at FROM call_log_ids WHERE id = $1)
         """
         row = await db.fetchrow(query, call_log_id)
-        return CallLogResponse(**dict(row)) if row else None
+        return from_row(CallLogResponse, row) if row else None
     
     @staticmethod
     async def get_all(db: asyncpg.Connection, skip: int = 0, limit: int = 100) -> List[CallLogResponse]:
+        rows = await CallLogCRUD.get_all_records(db, skip, limit)
+        return from_rows(CallLogResponse, rows)
+    
+    @staticmethod
+    async def get_all_records(db: asyncpg.Connection, skip: int = 0, limit: int = 100) -> List[asyncpg.Record]:
         query = """
             SELECT id, email_event_id, contact_id, phone_number, call_sid, status, duration, attempt_number, error_message, created_at, updated_at
             FROM call_logs
             ORDER BY created_at DESC
             OFFSET $1 LIMIT $2
         """
-        rows = await db.fetch(query, skip, limit)
-        return [CallLogResponse(**dict(row)) for row in rows]
+        return await db.fetch(query, skip, limit)
     
     @staticmethod
     async def get_total_count(db: asyncpg.Connection) -> int:
@@ -72,10 +77,11 @@ class CallLogCRUD:
                 ee.subject as email_subject,
                 c.name as contact_name
             FROM call_logs cl
-            LEFT JOIN email_events ee ON cl.email_event_id = ee.id
+            LEFT JOIN email_events ee ON cl.email_event_id = ee.id{event_bound}
             LEFT JOIN contacts c ON cl.contact_id = c.id
         """
         
+        event_bound = ""
         conditions = []
         params = []
         param_counter = 1
@@ -97,11 +103,15 @@ class CallLogCRUD:
                 # Add 23:59:59 to include the entire end date
                 end_datetime = end_datetime.replace(hour=23, minute=59, second=59, microsecond=999999)
                 conditions.append(f"cl.created_at <= ${param_counter}")
+                # An email event is received before its calls, so the same bound
+                # lets a partitioned email_events skip later months
+                event_bound = f" AND ee.received_at <= ${param_counter}"
                 params.append(end_datetime)
                 param_counter += 1
             except ValueError:
                 raise ValueError(f"Invalid end_date format: {end_date}. Expected YYYY-MM-DD")
         
+        base_query = base_query.format(event_bound=event_bound)
         if conditions:
             base_query += " WHERE " + " AND ".join(conditions)
             
@@ -111,26 +121,70 @@ class CallLogCRUD:
         return [dict(row) for row in rows]
     
     @staticmethod
-    async def get_by_email_event_id(db: asyncpg.Connection, email_event_id: str) -> List[CallLogResponse]:
-        query = """
+    def _by_email_event_query(email_event_id: str, cursor: Optional[Tuple] = None) -> Tuple[str, list]:
+        """Attempts for an event in order, resuming after an (attempt_number, created_at, id) cursor"""
+        conditions = ["email_event_id = $1"]
+        params = [email_event_id]
+        if cursor:
+            conditions.append("(COALESCE(attempt_number, 1), created_at, id) > ($2, $3, $4)")
+            params.extend(cursor)
+        query = f"""
             SELECT id, email_event_id, contact_id, phone_number, call_sid, status, duration, attempt_number, error_message, created_at, updated_at
             FROM call_logs
-            WHERE email_event_id = $1
-            ORDER BY attempt_number ASC, created_at ASC
+            WHERE {' AND '.join(conditions)}
+            ORDER BY COALESCE(attempt_number, 1) ASC, created_at ASC, id ASC
         """
-        rows = await db.fetch(query, email_event_id)
-        return [CallLogResponse(**dict(row)) for row in rows]
+        return query, params
     
     @staticmethod
-    async def get_by_contact_id(db: asyncpg.Connection, contact_id: str) -> List[CallLogResponse]:
-        query = """
+    async def get_by_email_event_id(db: asyncpg.Connection, email_event_id: str, limit: Optional[int] = None, cursor: Optional[Tuple] = None) -> List[CallLogResponse]:
+        query, params = CallLogCRUD._by_email_event_query(email_event_id, cursor)
+        rows = await db.fetch(f"{query} LIMIT ${len(params) + 1}", *params, limit)
+        return from_rows(CallLogResponse, rows)
+    
+    @staticmethod
+    def iter_by_email_event_id(db: asyncpg.Connection, email_event_id: str, cursor: Optional[Tuple] = None) -> asyncpg.cursor.CursorFactory:
+        """Server-side cursor over every attempt for an event; ``db`` must be in a transaction"""
+        query, params = CallLogCRUD._by_email_event_query(email_event_id, cursor)
+        return db.cursor(query, *params)
+    
+    @staticmethod
+    def _by_contact_query(contact_id: str, cursor: Optional[Tuple] = None) -> Tuple[str, list]:
+        """Calls to a contact, newest first, resuming after a (created_at, id) cursor"""
+        conditions = ["contact_id = $1"]
+        params = [contact_id]
+        if cursor:
+            conditions.append("(created_at, id) < ($2, $3)")
+            params.extend(cursor)
+        query = f"""
             SELECT id, email_event_id, contact_id, phone_number, call_sid, status, duration, attempt_number, error_message, created_at, updated_at
             FROM call_logs
+            WHERE {' AND '.join(conditions)}
+            ORDER BY created_at DESC, id DESC
+        """
+        return query, params
+    
+    @staticmethod
+    async def get_by_contact_id(db: asyncpg.Connection, contact_id: str, limit: Optional[int] = None, cursor: Optional[Tuple] = None) -> List[CallLogResponse]:
+        query, params = CallLogCRUD._by_contact_query(contact_id, cursor)
+        rows = await db.fetch(f"{query} LIMIT ${len(params) + 1}", *params, limit)
+        return from_rows(CallLogResponse, rows)
+    
+    @staticmethod
+    def iter_by_contact_id(db: asyncpg.Connection, contact_id: str, cursor: Optional[Tuple] = None) -> asyncpg.cursor.CursorFactory:
+        """Server-side cursor over every call to a contact; ``db`` must be in a transaction"""
+        query, params = CallLogCRUD._by_contact_query(contact_id, cursor)
+        return db.cursor(query, *params)
+    
+    @staticmethod
+    async def get_contact_version(db: asyncpg.Connection, contact_id: str) -> asyncpg.Record:
+        """Row count and last update of a contact's call logs, used to build its ETag"""
+        query = """
+            SELECT COUNT(*) AS count, MAX(updated_at) AS last_updated_at
+            FROM call_logs
             WHERE contact_id = $1
-            ORDER BY created_at DESC
         """
-        rows = await db.fetch(query, contact_id)
-        return [CallLogResponse(**dict(row)) for row in rows]
+        return await db.fetchrow(query, contact_id)
     
     @staticmethod
     async def update(db: asyncpg.Connection, call_log_id: int, call_log_update: CallLogUpdate) -> Optional[CallLogResponse]:
@@ -150,15 +204,19 @@ class CallLogCRUD:
             UPDATE call_logs
             SET {', '.join(update_fields)}, updated_at = CURRENT_TIMESTAMP
             WHERE id = ${param_counter}
+              AND created_at = (SELECT created_at FROM call_log_ids WHERE id = ${param_counter})
             RETURNING id, email_event_id, contact_id, phone_number, call_sid, status, duration, attempt_number, error_message, created_at, updated_at
         """
         values.append(call_log_id)
         
         row = await db.fetchrow(query, *values)
-        return CallLogResponse(**dict(row)) if row else None
+        return from_row(CallLogResponse, row) if row else None
     
     @staticmethod
     async def delete(db: asyncpg.Connection, call_log_id: int) -> bool:
-        query = "DELETE FROM call_logs WHERE id = $1"
+        query = """
+            DELETE FROM call_logs
+            WHERE id = $1 AND created_at = (SELECT created_at FROM call_log_ids WHERE id = $1)
+        """
         result = await db.execute(query, call_log_id)
         return result == "DELETE 1"
\ No newline at end of file
@@ -0,0 +1,111 @@
+import asyncpg
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from app.schemas.system_stats import BucketSize, CallStatsBreakdown, CallStatsBucket
+
+# Range returned when the caller gives no start
+DEFAULT_WINDOWS = {
+    BucketSize.minute: timedelta(hours=2),
+    BucketSize.hour: timedelta(days=2),
+    BucketSize.day: timedelta(days=30),
+}
+
+
+def _merge(groups: Dict, key, row) -> Dict:
+    """Fold one (key, status) aggregate row into the per-key totals"""
+    entry = groups.setdefault(key, {"calls": 0, "attempts": 0, "total_duration": 0, "duration_samples": 0, "by_status": {}})
+    entry["calls"] += row["calls"]
+    entry["attempts"] += row["attempts"]
+    entry["total_duration"] += row["total_duration"]
+    entry["duration_samples"] += row["duration_samples"]
+    entry["by_status"][row["status"]] = row["calls"]
+    return entry
+
+
+def _averaged(entry: Dict) -> Dict:
+    samples = entry.pop("duration_samples")
+    total_duration = entry.pop("total_duration")
+    entry["avg_duration"] = total_duration / samples if samples else None
+    return entry
+
+
+class CallStatsCRUD:
+    """Reads of the ``call_stats_rollups`` aggregates maintained by ``app.core.rollups``"""
+
+    @staticmethod
+    def _filters(
+        bucket: BucketSize,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        group_id: Optional[str] = None,
+        trigger_matched: Optional[str] = None
+    ):
+        conditions = ["bucket_size = $1"]
+        values = [bucket.value]
+        param_counter = 2
+        if start is not None:
+            conditions.append(f"bucket_start >= ${param_counter}")
+            values.append(start)
+        else:
+            # Relative to the database clock, which also stamps call_logs.created_at
+            conditions.append(f"bucket_start >= LOCALTIMESTAMP - ${param_counter}::interval")
+            values.append(DEFAULT_WINDOWS[bucket])
+        param_counter += 1
+        for column, value in (("bucket_start <", end), ("group_id =", group_id), ("trigger_matched =", trigger_matched)):
+            if value is not None:
+                conditions.append(f"{column} ${param_counter}")
+                values.append(value)
+                param_counter += 1
+        return " AND ".join(conditions), values
+
+    @staticmethod
+    async def get_timeseries(
+        db: asyncpg.Connection,
+        bucket: BucketSize,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        group_id: Optional[str] = None,
+        trigger_matched: Optional[str] = None
+    ) -> List[CallStatsBucket]:
+        where, values = CallStatsCRUD._filters(bucket, start, end, group_id, trigger_matched)
+        query = f"""
+            SELECT bucket_start, status, SUM(calls)::bigint AS calls, SUM(attempts)::bigint AS attempts,
+                   SUM(total_duration)::bigint AS total_duration, SUM(duration_samples)::bigint AS duration_samples
+            FROM call_stats_rollups
+            WHERE {where}
+            GROUP BY bucket_start, status
+            ORDER BY bucket_start
+        """
+        rows = await db.fetch(query, *values)
+        buckets: Dict = {}
+        for row in rows:
+            _merge(buckets, row["bucket_start"], row)
+        return [
+            CallStatsBucket(bucket_start=bucket_start, **_averaged(entry))
+            for bucket_start, entry in buckets.items()
+        ]
+
+    @staticmethod
+    async def get_breakdown(
+        db: asyncpg.Connection,
+        dimension: str,
+        bucket: BucketSize,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[CallStatsBreakdown]:
+        if dimension not in ("group_id", "trigger_matched"):
+            raise ValueError(f"Unknown dimension: {dimension}")
+        where, values = CallStatsCRUD._filters(bucket, start, end)
+        query = f"""
+            SELECT {dimension} AS key, status, SUM(calls)::bigint AS calls, SUM(attempts)::bigint AS attempts,
+                   SUM(total_duration)::bigint AS total_duration, SUM(duration_samples)::bigint AS duration_samples
+            FROM call_stats_rollups
+            WHERE {where}
+            GROUP BY {dimension}, status
+        """
+        rows = await db.fetch(query, *values)
+        totals: Dict = {}
+        for row in rows:
+            _merge(totals, row["key"], row)
+        breakdown = [CallStatsBreakdown(key=key, **_averaged(entry)) for key, entry in totals.items()]
+        return sorted(breakdown, key=lambda item: item.calls, reverse=True)
@@ -1,6 +1,7 @@
 import asyncpg
 from typing import List, Optional
 from app.schemas.contact_groups import ContactGroupCreate, ContactGroupUpdate, ContactGroupResponse
+from app.crud.rows import from_row, from_rows
 
 
 class ContactGroupCRUD:
@@ -20,7 +21,7 @@ class ContactGroupCRUD:
             contact_group.is_active,
             contact_group.emergency_level
         )
-        return ContactGroupResponse(**dict(row))
+        return from_row(ContactGroupResponse, row)
     
     @staticmethod
     async def get_by_id(db: asyncpg.Connection, contact_group_id: str) -> Optional[ContactGroupResponse]:
@@ -30,18 +31,22 @@ class ContactGroupCRUD:
             WHERE id = $1
         """
         row = await db.fetchrow(query, contact_group_id)
-        return ContactGroupResponse(**dict(row)) if row else None
+        return from_row(ContactGroupResponse, row) if row else None
     
     @staticmethod
     async def get_all(db: asyncpg.Connection, skip: int = 0, limit: int = 100) -> List[ContactGroupResponse]:
+        rows = await ContactGroupCRUD.get_all_records(db, skip, limit)
+        return from_rows(ContactGroupResponse, rows)
+    
+    @staticmethod
+    async def get_all_records(db: asyncpg.Connection, skip: int = 0, limit: int = 100) -> List[asyncpg.Record]:
         query = """
             SELECT id, name, description, is_active, emergency_level, created_at, updated_at
             FROM contact_groups
             ORDER BY created_at DESC
             OFFSET $1 LIMIT $2
         """
-        rows = await db.fetch(query, skip, limit)
-        return [ContactGroupResponse(**dict(row)) for row in rows]
+        return await db.fetch(query, skip, limit)
     
     @staticmethod
     async def get_total_count(db: asyncpg.Connection) -> int:
@@ -107,7 +112,7 @@ class ContactGroupCRUD:
         params.extend([skip, limit])
         
         rows = await db.fetch(base_query, *params)
-        return [ContactGroupResponse(**dict(row)) for row in rows]
+        return from_rows(ContactGroupResponse, rows)
     
     @staticmethod
     async def get_search_count(
@@ -185,7 +190,7 @@ class ContactGroupCRUD:
         values.append(contact_group_id)
         
         row = await db.fetchrow(query, *values)
-        return ContactGroupResponse(**dict(row)) if row else None
+        return from_row(ContactGroupResponse, row) if row else None
     
     @staticmethod
     async def delete(db: asyncpg.Connection, contact_group_id: str) -> bool:
@@ -1,6 +1,7 @@
 import asyncpg
 from typing import List, Optional
 from app.schemas.contacts import ContactCreate, ContactUpdate, ContactResponse
+from app.crud.rows import from_row, from_rows
 
 
 class ContactCRUD:
@@ -23,7 +24,7 @@ class ContactCRUD:
             contact.department,
             contact.group_ids
         )
-        return ContactResponse(**dict(row))
+        return from_row(ContactResponse, row)
     
     @staticmethod
     async def get_by_id(db: asyncpg.Connection, contact_id: str) -> Optional[ContactResponse]:
@@ -33,18 +34,22 @@ class ContactCRUD:
             WHERE id = $1
         """
         row = await db.fetchrow(query, contact_id)
-        return ContactResponse(**dict(row)) if row else None
+        return from_row(ContactResponse, row) if row else None
     
     @staticmethod
     async def get_all(db: asyncpg.Connection, skip: int = 0, limit: int = 100) -> List[ContactResponse]:
+        rows = await ContactCRUD.get_all_records(db, skip, limit)
+        return from_rows(ContactResponse, rows)
+    
+    @staticmethod
+    async def get_all_records(db: asyncpg.Connection, skip: int = 0, limit: int = 100) -> List[asyncpg.Record]:
         query = """
             SELECT id, name, phone_number, priority, is_active, role, department, group_ids, created_at, updated_at
             FROM contacts
             ORDER BY priority ASC, created_at DESC
             OFFSET $1 LIMIT $2
         """
-        rows = await db.fetch(query, skip, limit)
-        return [ContactResponse(**dict(row)) for row in rows]
+        return await db.fetch(query, skip, limit)
     
     @staticmethod
     async def get_total_count(db: asyncpg.Connection) -> int:
@@ -125,7 +130,7 @@ class ContactCRUD:
             param_counter += 1
             
         if group_id:
-            conditions.append(f"${param_counter} = ANY(group_ids)")
+            conditions.append(f"group_ids @> ARRAY[${param_counter}]")
             params.append(group_id)
             param_counter += 1
         
@@ -136,7 +141,7 @@ class ContactCRUD:
         params.extend([skip, limit])
         
         rows = await db.fetch(base_query, *params)
-        return [ContactResponse(**dict(row)) for row in rows]
+        return from_rows(ContactResponse, rows)
     
     @staticmethod
     async def get_search_count(
@@ -207,7 +212,7 @@ class ContactCRUD:
             param_counter += 1
             
         if group_id:
-            conditions.append(f"${param_counter} = ANY(group_ids)")
+            conditions.append(f"group_ids @> ARRAY[${param_counter}]")
             params.append(group_id)
             param_counter += 1
         
@@ -221,11 +226,21 @@ class ContactCRUD:
         query = """
             SELECT id, name, phone_number, priority, is_active, role, department, group_ids, created_at, updated_at
             FROM contacts
-            WHERE $1 = ANY(group_ids) AND is_active = true
+            WHERE group_ids @> ARRAY[$1] AND is_active = true
             ORDER BY priority ASC
         """
         rows = await db.fetch(query, group_id)
-        return [ContactResponse(**dict(row)) for row in rows]
+        return from_rows(ContactResponse, rows)
+    
+    @staticmethod
+    async def get_group_version(db: asyncpg.Connection, group_id: str) -> asyncpg.Record:
+        """Row count and last update of a group's roster, used to build its ETag"""
+        query = """
+            SELECT COUNT(*) AS count, MAX(updated_at) AS last_updated_at
+            FROM contacts
+            WHERE group_ids @> ARRAY[$1] AND is_active = true
+        """
+        return await db.fetchrow(query, group_id)
     
     @staticmethod
     async def update(db: asyncpg.Connection, contact_id: str, contact_update: ContactUpdate) -> Optional[ContactResponse]:
@@ -250,7 +265,7 @@ class ContactCRUD:
         values.append(contact_id)
         
         row = await db.fetchrow(query, *values)
-        return ContactResponse(**dict(row)) if row else None
+        return from_row(ContactResponse, row) if row else None
     
     @staticmethod
     async def delete(db: asyncpg.Connection, contact_id: str) -> bool:
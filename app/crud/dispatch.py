@@ -0,0 +1,169 @@
+import asyncpg
+from typing import Dict, Optional, Sequence, Tuple
+from app.schemas.dispatch import DispatchClaim, DispatchLease
+from app.schemas.email_events import EmailEventResponse
+from app.crud.rows import from_row
+
+
+class DispatchCRUD:
+
+    LOCK_NAME = "mailtocall_dispatch_leases"
+
+    @staticmethod
+    async def _available_tokens(db: asyncpg.Connection, key: str, capacity: float, refill_rate: float) -> float:
+        query = """
+            SELECT LEAST(
+                $2::float8,
+                tokens + GREATEST(EXTRACT(EPOCH FROM clock_timestamp()::timestamp - updated_at)::float8, 0) * $3::float8
+            )
+            FROM dispatch_rate_buckets
+            WHERE key = $1
+        """
+        tokens = await db.fetchval(query, key, capacity, refill_rate)
+        return capacity if tokens is None else tokens
+
+    @staticmethod
+    async def acquire_lease(
+        db: asyncpg.Connection,
+        contact_id: str,
+        group_id: Optional[str],
+        email_event_id: Optional[str],
+        emergency_level: str,
+        max_active: int,
+        lease_seconds: float,
+        rate_buckets: Sequence[Tuple[str, str, float, float]] = ()
+    ) -> Tuple[Optional[DispatchLease], Optional[int], Optional[str], float]:
+        """Take a call slot if every rate bucket has a token and fewer than ``max_active`` calls are in progress.
+
+        ``rate_buckets`` are ``(scope, key, capacity, refill per second)``.
+        Returns the lease (None when refused), the number of calls in progress
+        before it (None when a rate bucket refused first), the scope that
+        refused (``contact``, ``group`` or ``concurrency``) and the seconds
+        until its bucket has a token. The advisory lock serializes concurrent
+        acquires across workers, so neither limit can be overshot; tokens are
+        only spent when the lease is granted.
+        """
+        query = """
+            INSERT INTO dispatch_leases (contact_id, group_id, email_event_id, emergency_level, expires_at)
+            VALUES ($1, $2, $3, $4, LOCALTIMESTAMP + make_interval(secs => $5))
+            RETURNING id, contact_id, group_id, email_event_id, emergency_level, acquired_at, expires_at
+        """
+        spend = """
+            INSERT INTO dispatch_rate_buckets (key, tokens, updated_at)
+            VALUES ($1, $2, clock_timestamp()::timestamp)
+            ON CONFLICT (key) DO UPDATE SET tokens = EXCLUDED.tokens, updated_at = EXCLUDED.updated_at
+        """
+        async with db.transaction():
+            await db.execute("SELECT pg_advisory_xact_lock(hashtext($1))", DispatchCRUD.LOCK_NAME)
+            tokens = []
+            for scope, key, capacity, refill_rate in rate_buckets:
+                available = await DispatchCRUD._available_tokens(db, key, capacity, refill_rate)
+                if available < 1:
+                    retry_after = (1 - available) / refill_rate if refill_rate > 0 else float("inf")
+                    return None, None, scope, retry_after
+                tokens.append((key, available - 1))
+            await db.execute("DELETE FROM dispatch_leases WHERE expires_at <= LOCALTIMESTAMP")
+            active = await db.fetchval("SELECT COUNT(*) FROM dispatch_leases")
+            if active >= max_active:
+                return None, active, "concurrency", 0.0
+            row = await db.fetchrow(query, contact_id, group_id, email_event_id, emergency_level, lease_seconds)
+            await db.executemany(spend, tokens)
+            return from_row(DispatchLease, row), active, None, 0.0
+
+    @staticmethod
+    async def release_lease(db: asyncpg.Connection, lease_id: int) -> bool:
+        result = await db.execute("DELETE FROM dispatch_leases WHERE id = $1", lease_id)
+        return result == "DELETE 1"
+
+    @staticmethod
+    async def get_active_count(db: asyncpg.Connection) -> int:
+        query = "SELECT COUNT(*) FROM dispatch_leases WHERE expires_at > LOCALTIMESTAMP"
+        return await db.fetchval(query)
+
+    @staticmethod
+    async def claim_next(
+        db: asyncpg.Connection,
+        level_weights: Dict[str, float],
+        default_level_weight: float,
+        trigger_priority_weight: float,
+        aging_per_minute: float,
+        claim_timeout_seconds: float,
+        candidates_per_level: int
+    ) -> Optional[DispatchClaim]:
+        """Claim the most urgent event waiting for dispatch and mark it ``processing``.
+
+        Urgency is the weight of the matched trigger's group emergency level,
+        minus the trigger priority (1 is the most important) times its weight,
+        plus the minutes the event has waited times the aging rate, so low
+        severity events eventually overtake fresh critical ones. Level, group
+        and trigger priority are the ones resolved when the event was stored
+        (migration 0012). Claims older than ``claim_timeout_seconds`` that
+        were never processed are claimed again. Concurrent dispatchers skip
+        each other's rows.
+
+        Only the oldest ``candidates_per_level`` waiting events of each level
+        are scored, read through the queue index, so a claim does not grow
+        with the backlog. Within a level a younger event only outranks an
+        older one through a better trigger priority.
+        """
+        query = """
+            WITH RECURSIVE levels AS (
+                (SELECT dispatch_level FROM email_events
+                 WHERE status IN ('pending', 'processing')
+                 ORDER BY dispatch_level
+                 LIMIT 1)
+                UNION ALL
+                SELECT (
+                    SELECT e.dispatch_level FROM email_events e
+                    WHERE e.status IN ('pending', 'processing') AND e.dispatch_level > l.dispatch_level
+                    ORDER BY e.dispatch_level
+                    LIMIT 1
+                )
+                FROM levels l
+                WHERE l.dispatch_level IS NOT NULL
+            ), candidate AS (
+                SELECT ee.id, ee.received_at, ee.dispatch_group_id AS group_id, NULLIF(ee.dispatch_level, '') AS emergency_level,
+                       ee.dispatch_trigger_priority AS trigger_priority,
+                       COALESCE(w.weight, $3::float8)
+                         - COALESCE(ee.dispatch_trigger_priority, 1) * $4::float8
+                         + EXTRACT(EPOCH FROM LOCALTIMESTAMP - ee.received_at) / 60 * $5::float8 AS score
+                FROM levels l
+                CROSS JOIN LATERAL (
+                    SELECT e.id, e.received_at FROM email_events e
+                    WHERE e.dispatch_level = l.dispatch_level
+                      AND e.status IN ('pending', 'processing')
+                      AND (e.status = 'pending' OR e.claimed_at < LOCALTIMESTAMP - make_interval(secs => $6))
+                    ORDER BY e.received_at
+                    LIMIT $7
+                ) oldest
+                JOIN email_events ee ON ee.id = oldest.id AND ee.received_at = oldest.received_at
+                LEFT JOIN unnest($1::text[], $2::float8[]) AS w(level, weight) ON w.level = ee.dispatch_level
+                -- Checked again on the locked row, in case another dispatcher claimed it meanwhile
+                WHERE ee.status IN ('pending', 'processing')
+                  AND (ee.status = 'pending' OR ee.claimed_at < LOCALTIMESTAMP - make_interval(secs => $6))
+                ORDER BY score DESC, ee.received_at
+                LIMIT 1
+                FOR UPDATE OF ee SKIP LOCKED
+            )
+            UPDATE email_events ee
+            SET status = 'processing', claimed_at = LOCALTIMESTAMP, updated_at = CURRENT_TIMESTAMP
+            FROM candidate c
+            WHERE ee.id = c.id AND ee.received_at = c.received_at
+            RETURNING ee.id, ee.from_email, ee.subject, ee.body, ee.trigger_matched, ee.received_at,
+                      ee.processed_at, ee.status, ee.occurrence_count, ee.last_occurrence_at,
+                      c.group_id, c.emergency_level, c.trigger_priority, c.score
+        """
+        row = await db.fetchrow(
+            query,
+            list(level_weights), list(level_weights.values()), default_level_weight,
+            trigger_priority_weight, aging_per_minute, claim_timeout_seconds, candidates_per_level
+        )
+        if row is None:
+            return None
+        return DispatchClaim(
+            email_event=from_row(EmailEventResponse, row),
+            group_id=row["group_id"],
+            emergency_level=row["emergency_level"],
+            trigger_priority=row["trigger_priority"],
+            score=float(row["score"]),
+        )
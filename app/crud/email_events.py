@@ -1,6 +1,7 @@
 import asyncpg
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.schemas.email_events import EmailEventCreate, EmailEventUpdate, EmailEventResponse
+from app.crud.rows import from_row, from_rows
 
 
 class EmailEventCRUD:
@@ -10,7 +11,8 @@ class EmailEventCRUD:
         query = """
             INSERT INTO email_events (id, from_email, subject, body, trigger_matched, status)
             VALUES ($1, $2, $3, $4, $5, $6)
-            RETURNING id, from_email, subject, body, trigger_matched, received_at, processed_at, status
+            RETURNING id, from_email, subject, body, trigger_matched, received_at, processed_at, status,
+                   occurrence_count, last_occurrence_at
         """
         row = await db.fetchrow(
             query,
@@ -21,28 +23,108 @@ class EmailEventCRUD:
             email_event.trigger_matched,
             email_event.status
         )
-        return EmailEventResponse(**dict(row))
+        return from_row(EmailEventResponse, row)
+    
+    @staticmethod
+    async def claim_key(
+        db: asyncpg.Connection, key: str, email_event_id: str, window_seconds: float
+    ) -> Tuple[str, bool, float]:
+        """Point ``key`` at ``email_event_id`` unless it is still within its dedup window.
+
+        Returns the event id the key maps to, whether this call claimed it and
+        the seconds left in its window, measured from the key row.
+        """
+        expires_in = "EXTRACT(EPOCH FROM created_at + make_interval(secs => $2) - LOCALTIMESTAMP)::float8"
+        claim = f"""
+            INSERT INTO email_event_keys (key, email_event_id)
+            VALUES ($1, $3)
+            ON CONFLICT (key) DO UPDATE
+                SET email_event_id = EXCLUDED.email_event_id, created_at = EXCLUDED.created_at
+                WHERE email_event_keys.created_at < LOCALTIMESTAMP - make_interval(secs => $2)
+            RETURNING email_event_id, {expires_in} AS expires_in
+        """
+        row = await db.fetchrow(claim, key, window_seconds, email_event_id)
+        if row is not None:
+            return row["email_event_id"], True, row["expires_in"]
+        row = await db.fetchrow(
+            f"SELECT email_event_id, {expires_in} AS expires_in FROM email_event_keys WHERE key = $1",
+            key, window_seconds
+        )
+        return row["email_event_id"], False, row["expires_in"]
+
+    @staticmethod
+    async def create_idempotent(
+        db: asyncpg.Connection, email_event: EmailEventCreate, key: str, window_seconds: float
+    ) -> Tuple[EmailEventResponse, bool, float]:
+        """Create the event unless ``key`` or its id was already ingested.
+
+        Returns the event, whether it was created and the seconds left in the
+        key's dedup window; a duplicate returns the event that was created
+        first. Concurrent duplicates wait on the key row, so only one of them
+        inserts.
+        """
+        insert_event = """
+            INSERT INTO email_events (id, from_email, subject, body, trigger_matched, status)
+            VALUES ($1, $2, $3, $4, $5, $6)
+            RETURNING id, from_email, subject, body, trigger_matched, received_at, processed_at, status,
+                   occurrence_count, last_occurrence_at
+        """
+        async with db.transaction():
+            event_id, claimed, expires_in = await EmailEventCRUD.claim_key(db, key, email_event.id, window_seconds)
+            if not claimed:
+                existing = await EmailEventCRUD.get_by_id(db, event_id)
+                if existing is not None:
+                    return existing, False, expires_in
+                # The first event was deleted since; this one takes over the key
+                await db.execute(
+                    "UPDATE email_event_keys SET email_event_id = $2, created_at = LOCALTIMESTAMP WHERE key = $1",
+                    key, email_event.id
+                )
+            # Partitioned, email_events' primary key includes received_at; a
+            # second row with the same id is only rejected by email_event_ids,
+            # so a same-id retry waits here and returns the first row instead
+            await db.execute("SELECT pg_advisory_xact_lock(hashtext('mailtocall_email_event:' || $1))", email_event.id)
+            existing = await EmailEventCRUD.get_by_id(db, email_event.id)
+            if existing is not None:
+                # Retried with the same id
+                return existing, False, window_seconds
+            row = await db.fetchrow(
+                insert_event,
+                email_event.id,
+                email_event.from_email,
+                email_event.subject,
+                email_event.body,
+                email_event.trigger_matched,
+                email_event.status
+            )
+            return from_row(EmailEventResponse, row), True, window_seconds
     
     @staticmethod
     async def get_by_id(db: asyncpg.Connection, email_event_id: str) -> Optional[EmailEventResponse]:
         query = """
-            SELECT id, from_email, subject, body, trigger_matched, received_at, processed_at, status
+            SELECT id, from_email, subject, body, trigger_matched, received_at, processed_at, status,
+                   occurrence_count, last_occurrence_at
             FROM email_events
-            WHERE id = $1
+            WHERE id = $1 AND received_at = (SELECT received_at FROM email_event_ids WHERE id = $1)
         """
         row = await db.fetchrow(query, email_event_id)
-        return EmailEventResponse(**dict(row)) if row else None
+        return from_row(EmailEventResponse, row) if row else None
     
     @staticmethod
     async def get_all(db: asyncpg.Connection, skip: int = 0, limit: int = 100) -> List[EmailEventResponse]:
+        rows = await EmailEventCRUD.get_all_records(db, skip, limit)
+        return from_rows(EmailEventResponse, rows)
+    
+    @staticmethod
+    async def get_all_records(db: asyncpg.Connection, skip: int = 0, limit: int = 100) -> List[asyncpg.Record]:
         query = """
-            SELECT id, from_email, subject, body, trigger_matched, received_at, processed_at, status
+            SELECT id, from_email, subject, body, trigger_matched, received_at, processed_at, status,
+                   occurrence_count, last_occurrence_at
             FROM email_events
             ORDER BY received_at DESC
             OFFSET $1 LIMIT $2
         """
-        rows = await db.fetch(query, skip, limit)
-        return [EmailEventResponse(**dict(row)) for row in rows]
+        return await db.fetch(query, skip, limit)
     
     @staticmethod
     async def get_total_count(db: asyncpg.Connection) -> int:
@@ -50,26 +132,55 @@ class EmailEventCRUD:
         return await db.fetchval(query)
     
     @staticmethod
-    async def get_by_status(db: asyncpg.Connection, status: str) -> List[EmailEventResponse]:
-        query = """
-            SELECT id, from_email, subject, body, trigger_matched, received_at, processed_at, status
+    def _newest_first_query(column: str, value: str, cursor: Optional[Tuple] = None) -> Tuple[str, list]:
+        """Events with ``column = value``, newest first, resuming after a (received_at, id) cursor"""
+        conditions = [f"{column} = $1"]
+        params = [value]
+        if cursor:
+            conditions.append("(received_at, id) < ($2, $3)")
+            params.extend(cursor)
+        query = f"""
+            SELECT id, from_email, subject, body, trigger_matched, received_at, processed_at, status,
+                   occurrence_count, last_occurrence_at
             FROM email_events
-            WHERE status = $1
-            ORDER BY received_at DESC
+            WHERE {' AND '.join(conditions)}
+            ORDER BY received_at DESC, id DESC
         """
-        rows = await db.fetch(query, status)
-        return [EmailEventResponse(**dict(row)) for row in rows]
+        return query, params
+    
+    @staticmethod
+    async def get_by_status(db: asyncpg.Connection, status: str, limit: Optional[int] = None, cursor: Optional[Tuple] = None) -> List[EmailEventResponse]:
+        query, params = EmailEventCRUD._newest_first_query("status", status, cursor)
+        rows = await db.fetch(f"{query} LIMIT ${len(params) + 1}", *params, limit)
+        return from_rows(EmailEventResponse, rows)
+    
+    @staticmethod
+    def iter_by_status(db: asyncpg.Connection, status: str, cursor: Optional[Tuple] = None) -> asyncpg.cursor.CursorFactory:
+        """Server-side cursor over every event in ``status``; ``db`` must be in a transaction"""
+        query, params = EmailEventCRUD._newest_first_query("status", status, cursor)
+        return db.cursor(query, *params)
     
     @staticmethod
-    async def get_by_trigger(db: asyncpg.Connection, trigger_matched: str) -> List[EmailEventResponse]:
+    async def get_status_version(db: asyncpg.Connection, status: str) -> asyncpg.Record:
+        """Row count and latest change of the events in a status, used to build its ETag"""
         query = """
-            SELECT id, from_email, subject, body, trigger_matched, received_at, processed_at, status
+            SELECT COUNT(*) AS count, MAX(updated_at) AS last_updated_at
             FROM email_events
-            WHERE trigger_matched = $1
-            ORDER BY received_at DESC
+            WHERE status = $1
         """
-        rows = await db.fetch(query, trigger_matched)
-        return [EmailEventResponse(**dict(row)) for row in rows]
+        return await db.fetchrow(query, status)
+    
+    @staticmethod
+    async def get_by_trigger(db: asyncpg.Connection, trigger_matched: str, limit: Optional[int] = None, cursor: Optional[Tuple] = None) -> List[EmailEventResponse]:
+        query, params = EmailEventCRUD._newest_first_query("trigger_matched", trigger_matched, cursor)
+        rows = await db.fetch(f"{query} LIMIT ${len(params) + 1}", *params, limit)
+        return from_rows(EmailEventResponse, rows)
+    
+    @staticmethod
+    def iter_by_trigger(db: asyncpg.Connection, trigger_matched: str, cursor: Optional[Tuple] = None) -> asyncpg.cursor.CursorFactory:
+        """Server-side cursor over every event for a trigger; ``db`` must be in a transaction"""
+        query, params = EmailEventCRUD._newest_first_query("trigger_matched", trigger_matched, cursor)
+        return db.cursor(query, *params)
     
     @staticmethod
     async def update(db: asyncpg.Connection, email_event_id: str, email_event_update: EmailEventUpdate) -> Optional[EmailEventResponse]:
@@ -93,17 +204,41 @@ class EmailEventCRUD:
         
         query = f"""
             UPDATE email_events
-            SET {', '.join(update_fields)}
+            SET {', '.join(update_fields)}, updated_at = CURRENT_TIMESTAMP
             WHERE id = ${param_counter}
-            RETURNING id, from_email, subject, body, trigger_matched, received_at, processed_at, status
+              AND received_at = (SELECT received_at FROM email_event_ids WHERE id = ${param_counter})
+            RETURNING id, from_email, subject, body, trigger_matched, received_at, processed_at, status,
+                   occurrence_count, last_occurrence_at
         """
         values.append(email_event_id)
         
         row = await db.fetchrow(query, *values)
-        return EmailEventResponse(**dict(row)) if row else None
+        return from_row(EmailEventResponse, row) if row else None
     
     @staticmethod
     async def delete(db: asyncpg.Connection, email_event_id: str) -> bool:
-        query = "DELETE FROM email_events WHERE id = $1"
+        query = """
+            DELETE FROM email_events
+            WHERE id = $1 AND received_at = (SELECT received_at FROM email_event_ids WHERE id = $1)
+        """
         result = await db.execute(query, email_event_id)
-        return result == "DELETE 1"
\ No newline at end of file
+        return result == "DELETE 1"
+    
+    @staticmethod
+    async def add_occurrences(db: asyncpg.Connection, counts: List[Tuple[str, int, float]]) -> int:
+        """Add coalesced occurrences to their incidents in one statement.
+
+        ``counts`` holds (event id, occurrences, last seen as a Unix timestamp).
+        """
+        query = """
+            UPDATE email_events ee
+            SET occurrence_count = ee.occurrence_count + c.occurrences,
+                last_occurrence_at = GREATEST(ee.last_occurrence_at, to_timestamp(c.last_seen)::timestamp),
+                updated_at = CURRENT_TIMESTAMP
+            FROM unnest($1::text[], $2::int[], $3::float8[]) AS c(id, occurrences, last_seen)
+            JOIN email_event_ids l ON l.id = c.id
+            WHERE ee.id = c.id AND ee.received_at = l.received_at
+        """
+        ids, occurrences, last_seen = zip(*counts)
+        result = await db.execute(query, list(ids), list(occurrences), list(last_seen))
+        return int(result.split()[-1])
@@ -1,6 +1,22 @@
+import asyncio
 import asyncpg
 from typing import List, Optional
-from app.schemas.system_stats import SystemStatsCreate, SystemStatsUpdate, SystemStatsResponse
+from app.schemas.system_stats import SystemStatsCreate, SystemStatsUpdate, SystemStatsResponse, DashboardSummary
+from app.crud.rows import from_row, from_rows
+from app.core.config import settings
+
+
+def _daily_calls_expression() -> str:
+    if settings.call_stats_rollups_enabled:
+        return """(
+            SELECT COALESCE(SUM(calls), 0)::bigint FROM call_stats_rollups
+            WHERE bucket_size = 'day' AND bucket_start = CURRENT_DATE
+        )"""
+    # Range predicate instead of DATE(created_at) so an index on created_at applies
+    return """(
+        SELECT COUNT(*) FROM call_logs
+        WHERE created_at >= CURRENT_DATE AND created_at < CURRENT_DATE + 1
+    )"""
 
 
 class SystemStatsCRUD:
@@ -17,7 +33,12 @@ class SystemStatsCRUD:
             system_stats.metric_name,
             system_stats.metric_value
         )
-        return SystemStatsResponse(**dict(row))
+        return from_row(SystemStatsResponse, row)
+    
+    @staticmethod
+    async def create_many(db: asyncpg.Connection, items: List[SystemStatsCreate]):
+        query = "INSERT INTO system_stats (metric_name, metric_value) VALUES ($1, $2)"
+        await db.executemany(query, [(item.metric_name, item.metric_value) for item in items])
     
     @staticmethod
     async def get_by_id(db: asyncpg.Connection, stats_id: int) -> Optional[SystemStatsResponse]:
@@ -27,7 +48,7 @@ class SystemStatsCRUD:
             WHERE id = $1
         """
         row = await db.fetchrow(query, stats_id)
-        return SystemStatsResponse(**dict(row)) if row else None
+        return from_row(SystemStatsResponse, row) if row else None
     
     @staticmethod
     async def get_all(db: asyncpg.Connection, skip: int = 0, limit: int = 100) -> List[SystemStatsResponse]:
@@ -38,7 +59,7 @@ class SystemStatsCRUD:
             OFFSET $1 LIMIT $2
         """
         rows = await db.fetch(query, skip, limit)
-        return [SystemStatsResponse(**dict(row)) for row in rows]
+        return from_rows(SystemStatsResponse, rows)
     
     @staticmethod
     async def get_by_metric_name(db: asyncpg.Connection, metric_name: str, skip: int = 0, limit: int = 100) -> List[SystemStatsResponse]:
@@ -50,7 +71,7 @@ class SystemStatsCRUD:
             OFFSET $2 LIMIT $3
         """
         rows = await db.fetch(query, metric_name, skip, limit)
-        return [SystemStatsResponse(**dict(row)) for row in rows]
+        return from_rows(SystemStatsResponse, rows)
     
     @staticmethod
     async def get_latest_by_metric_name(db: asyncpg.Connection, metric_name: str) -> Optional[SystemStatsResponse]:
@@ -62,7 +83,7 @@ class SystemStatsCRUD:
             LIMIT 1
         """
         row = await db.fetchrow(query, metric_name)
-        return SystemStatsResponse(**dict(row)) if row else None
+        return from_row(SystemStatsResponse, row) if row else None
     
     @staticmethod
     async def update(db: asyncpg.Connection, stats_id: int, system_stats_update: SystemStatsUpdate) -> Optional[SystemStatsResponse]:
@@ -87,7 +108,7 @@ class SystemStatsCRUD:
         values.append(stats_id)
         
         row = await db.fetchrow(query, *values)
-        return SystemStatsResponse(**dict(row)) if row else None
+        return from_row(SystemStatsResponse, row) if row else None
     
     @staticmethod
     async def delete(db: asyncpg.Connection, stats_id: int) -> bool:
@@ -96,13 +117,28 @@ class SystemStatsCRUD:
         return result == "DELETE 1"
     
     @staticmethod
-    async def delete_old_stats(db: asyncpg.Connection, days_to_keep: int = 30) -> int:
+    async def delete_old_stats(
+        db: asyncpg.Connection, days_to_keep: int = 30, batch_size: int = 5000, pause_seconds: float = 0.0
+    ) -> int:
+        # Bounded batches, each its own transaction, instead of one huge DELETE;
+        # the pause between them lets replication and autovacuum keep up
         query = """
-            DELETE FROM system_stats 
-            WHERE recorded_at < NOW() - INTERVAL '%s days'
-        """ % days_to_keep
-        result = await db.execute(query)
-        return int(result.split()[-1]) if result.startswith("DELETE") else 0
+            DELETE FROM system_stats
+            WHERE id IN (
+                SELECT id FROM system_stats
+                WHERE recorded_at < NOW() - make_interval(days => $1)
+                ORDER BY id
+                LIMIT $2
+            )
+        """
+        total = 0
+        while True:
+            result = await db.execute(query, days_to_keep, batch_size)
+            deleted = int(result.split()[-1]) if result.startswith("DELETE") else 0
+            total += deleted
+            if deleted < batch_size:
+                return total
+            await asyncio.sleep(pause_seconds)
     
     @staticmethod
     async def get_active_triggers_count(db: asyncpg.Connection) -> int:
@@ -124,9 +160,20 @@ class SystemStatsCRUD:
     
     @staticmethod
     async def get_daily_calls_count(db: asyncpg.Connection) -> int:
-        query = """
-            SELECT COUNT(*) FROM call_logs 
-            WHERE DATE(created_at) = CURRENT_DATE
-        """
+        query = f"SELECT {_daily_calls_expression()}"
         result = await db.fetchval(query)
-        return result
\ No newline at end of file
+        return result
+    
+    @staticmethod
+    async def get_summary(db: asyncpg.Connection) -> DashboardSummary:
+        """All dashboard counters in a single round trip"""
+        query = f"""
+            SELECT
+                (SELECT COUNT(*) FROM triggers WHERE is_active = true) AS total_active_triggers,
+                (SELECT COUNT(*) FROM contacts) AS total_contacts,
+                (SELECT COUNT(*) FROM contact_groups) AS total_contact_groups,
+                {_daily_calls_expression()} AS total_daily_calls,
+                CURRENT_TIMESTAMP AS computed_at
+        """
+        row = await db.fetchrow(query)
+        return from_row(DashboardSummary, row)
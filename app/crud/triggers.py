@@ -1,6 +1,7 @@
 import asyncpg
 from typing import List, Optional
 from app.schemas.triggers import TriggerCreate, TriggerUpdate, TriggerResponse
+from app.crud.rows import from_row, from_rows
 
 
 class TriggerCRUD:
@@ -23,7 +24,7 @@ class TriggerCRUD:
             trigger.priority,
             trigger.custom_message
         )
-        return TriggerResponse(**dict(row))
+        return from_row(TriggerResponse, row)
     
     @staticmethod
     async def get_by_id(db: asyncpg.Connection, trigger_id: str) -> Optional[TriggerResponse]:
@@ -33,18 +34,22 @@ class TriggerCRUD:
             WHERE id = $1
         """
         row = await db.fetchrow(query, trigger_id)
-        return TriggerResponse(**dict(row)) if row else None
+        return from_row(TriggerResponse, row) if row else None
     
     @staticmethod
     async def get_all(db: asyncpg.Connection, skip: int = 0, limit: int = 100) -> List[TriggerResponse]:
+        rows = await TriggerCRUD.get_all_records(db, skip, limit)
+        return from_rows(TriggerResponse, rows)
+    
+    @staticmethod
+    async def get_all_records(db: asyncpg.Connection, skip: int = 0, limit: int = 100) -> List[asyncpg.Record]:
         query = """
             SELECT id, name, trigger_string, description, group_id, is_active, priority, custom_message, created_at, updated_at
             FROM triggers
             ORDER BY priority ASC, created_at DESC
             OFFSET $1 LIMIT $2
         """
-        rows = await db.fetch(query, skip, limit)
-        return [TriggerResponse(**dict(row)) for row in rows]
+        return await db.fetch(query, skip, limit)
     
     @staticmethod
     async def get_total_count(db: asyncpg.Connection) -> int:
@@ -136,7 +141,7 @@ class TriggerCRUD:
         params.extend([skip, limit])
         
         rows = await db.fetch(base_query, *params)
-        return [TriggerResponse(**dict(row)) for row in rows]
+        return from_rows(TriggerResponse, rows)
     
     @staticmethod
     async def get_search_count(
@@ -224,7 +229,7 @@ class TriggerCRUD:
             WHERE trigger_string = $1 AND is_active = true
         """
         row = await db.fetchrow(query, trigger_string)
-        return TriggerResponse(**dict(row)) if row else None
+        return from_row(TriggerResponse, row) if row else None
     
     @staticmethod
     async def update(db: asyncpg.Connection, trigger_id: str, trigger_update: TriggerUpdate) -> Optional[TriggerResponse]:
@@ -249,7 +254,7 @@ class TriggerCRUD:
         values.append(trigger_id)
         
         row = await db.fetchrow(query, *values)
-        return TriggerResponse(**dict(row)) if row else None
+        return from_row(TriggerResponse, row) if row else None
     
     @staticmethod
     async def delete(db: asyncpg.Connection, trigger_id: str) -> bool:
@@ -0,0 +1,44 @@
+import asyncpg
+import uuid
+from typing import Optional
+from app.schemas.auth import UserCreate, UserResponse
+from app.crud.rows import from_row
+
+
+class UserCRUD:
+
+    @staticmethod
+    async def create(db: asyncpg.Connection, user: UserCreate, hashed_password: str) -> UserResponse:
+        query = """
+            INSERT INTO users (id, username, email, hashed_password)
+            VALUES ($1, $2, $3, $4)
+            RETURNING id, username, email, is_active, created_at, updated_at
+        """
+        row = await db.fetchrow(
+            query,
+            str(uuid.uuid4()),
+            user.username,
+            user.email,
+            hashed_password
+        )
+        return from_row(UserResponse, row)
+
+    @staticmethod
+    async def get_by_username(db: asyncpg.Connection, username: str) -> Optional[UserResponse]:
+        query = """
+            SELECT id, username, email, is_active, created_at, updated_at
+            FROM users
+            WHERE username = $1
+        """
+        row = await db.fetchrow(query, username)
+        return from_row(UserResponse, row) if row else None
+
+    @staticmethod
+    async def get_credentials(db: asyncpg.Connection, username: str) -> Optional[asyncpg.Record]:
+        """Return the user's id, hashed password and active flag for login checks"""
+        query = """
+            SELECT id, username, hashed_password, is_active
+            FROM users
+            WHERE username = $1
+        """
+        return await db.fetchrow(query, username)
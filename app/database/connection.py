@@ -1,14 +1,46 @@
+import asyncio
 import asyncpg
-from typing import Optional
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
 from app.core.config import settings
+from app.core.prometheus import Gauge, registry
+from app.core.slow_queries import slow_query_log
+from app.core.timing import log_query, record_acquire, record_query
 
 _pool: Optional[asyncpg.Pool] = None
 
 
+async def _init_connection(connection: asyncpg.Connection):
+    # Decode json/jsonb columns (e.g. system_stats.metric_value) into Python
+    # objects so rows can be turned into response models without validation
+    for typename in ("json", "jsonb"):
+        await connection.set_type_codec(
+            typename, encoder=json.dumps, decoder=json.loads, schema="pg_catalog"
+        )
+    if settings.request_timing_enabled:
+        connection.add_query_logger(log_query)
+    if settings.slow_query_threshold_ms > 0:
+        connection.add_query_logger(slow_query_log.observe)
+
+
+def _server_settings() -> dict:
+    # Channel the notify triggers (migration 0014) publish on for writes made
+    # through this pool; '' turns the NOTIFY off
+    return {"mailtocall.realtime_channel": settings.realtime_channel if settings.realtime_enabled else ""}
+
+
 async def init_db_pool():
     global _pool
-    _pool = await asyncpg.create_pool(settings.database_url)
-    
+    _pool = await asyncpg.create_pool(
+        settings.database_url,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        init=_init_connection,
+        server_settings=_server_settings(),
+    )
+
 
 async def get_db_pool() -> asyncpg.Pool:
     if _pool is None:
@@ -17,13 +49,105 @@ async def get_db_pool() -> asyncpg.Pool:
 
 
 async def close_db_pool():
+    """Drain the pool, waiting for in-flight queries before terminating connections"""
     global _pool
     if _pool:
-        await _pool.close()
+        try:
+            await asyncio.wait_for(_pool.close(), timeout=settings.db_pool_close_timeout)
+        except asyncio.TimeoutError:
+            _pool.terminate()
         _pool = None
 
 
+def _pool_connections():
+    if _pool is None:
+        return []
+    size, idle = _pool.get_size(), _pool.get_idle_size()
+    return [(("in_use",), size - idle), (("idle",), idle), (("max",), _pool.get_max_size())]
+
+
+registry.register(Gauge("mailtocall_db_pool_connections", "Connections in this worker's pool", ("state",), _pool_connections))
+
+
+class LazyConnection:
+    """Pool connection proxy that only acquires a connection on the first query.
+
+    Requests rejected before they query the database (bad tokens, validation
+    errors, 404s served from cache) never take a connection from the pool.
+    """
+
+    def __init__(self, pool: asyncpg.Pool):
+        self._pool = pool
+        self._connection: Optional[asyncpg.Connection] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def acquired(self) -> bool:
+        return self._connection is not None
+
+    async def acquire(self) -> asyncpg.Connection:
+        if self._connection is None:
+            async with self._lock:
+                if self._connection is None:
+                    started = time.perf_counter()
+                    self._connection = await self._pool.acquire()
+                    record_acquire(time.perf_counter() - started)
+        return self._connection
+
+    async def release(self):
+        """Return the connection to the pool; later queries acquire a new one."""
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            await self._pool.release(connection)
+
+    async def _run(self, method: str, query: str, *args, **kwargs):
+        connection = await self.acquire()
+        started = time.perf_counter()
+        try:
+            return await getattr(connection, method)(query, *args, **kwargs)
+        finally:
+            record_query(time.perf_counter() - started)
+
+    async def fetch(self, query: str, *args, **kwargs):
+        return await self._run("fetch", query, *args, **kwargs)
+
+    async def fetchrow(self, query: str, *args, **kwargs):
+        return await self._run("fetchrow", query, *args, **kwargs)
+
+    async def fetchval(self, query: str, *args, **kwargs):
+        return await self._run("fetchval", query, *args, **kwargs)
+
+    async def execute(self, query: str, *args, **kwargs):
+        return await self._run("execute", query, *args, **kwargs)
+
+    async def executemany(self, query: str, args, **kwargs):
+        return await self._run("executemany", query, args, **kwargs)
+
+    @asynccontextmanager
+    async def transaction(self, **kwargs):
+        connection = await self.acquire()
+        async with connection.transaction(**kwargs):
+            yield connection
+
+
 async def get_db_connection():
+    connection = LazyConnection(await get_db_pool())
+    try:
+        yield connection
+    finally:
+        await connection.release()
+
+
+async def stream_rows(
+    open_cursor: Callable[[asyncpg.Connection], AsyncIterator[asyncpg.Record]]
+) -> AsyncIterator[asyncpg.Record]:
+    """Iterate a server-side cursor on a dedicated connection.
+
+    The connection is held for the lifetime of the iteration (e.g. a streaming
+    response) and returned to the pool when it finishes or is cancelled.
+    """
     pool = await get_db_pool()
     async with pool.acquire() as connection:
-        yield connection
\ No newline at end of file
+        async with connection.transaction(readonly=True):
+            async for row in open_cursor(connection):
+                yield row
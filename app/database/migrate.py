@@ -0,0 +1,253 @@
+"""Apply the SQL migrations in ``app/database/migrations`` and check index usage.
+
+    python -m app.database.migrate            # apply pending migrations
+    python -m app.database.migrate --status   # list applied and pending migrations
+    python -m app.database.migrate --check    # EXPLAIN the hot queries
+"""
+import argparse
+import asyncio
+import logging
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Set
+import asyncpg
+from app.core.config import settings
+from app.crud.call_logs import CallLogCRUD
+from app.crud.email_events import EmailEventCRUD
+from app.database.connection import _init_connection
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).with_name("migrations")
+# First line of a migration that must run outside a transaction (CREATE INDEX CONCURRENTLY)
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+LOCK_NAME = "mailtocall_migrations"
+LOCK_POLL_SECONDS = 1.0
+CONCURRENT_INDEX_RE = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)\s+ON\s+(?:ONLY\s+)?(\w+)",
+    re.IGNORECASE
+)
+
+
+class Migration:
+    def __init__(self, path: Path):
+        self.path = path
+        self.version, _, self.name = path.stem.partition("_")
+
+    @property
+    def sql(self) -> str:
+        return self.path.read_text()
+
+    @property
+    def transactional(self) -> bool:
+        return not self.sql.startswith(NO_TRANSACTION_MARKER)
+
+    def statements(self) -> List[str]:
+        """Statements of a no-transaction migration, which must be sent one at a time"""
+        lines = [line for line in self.sql.splitlines() if not line.lstrip().startswith("--")]
+        return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+def discover_migrations() -> List[Migration]:
+    return sorted((Migration(path) for path in MIGRATIONS_DIR.glob("*.sql")), key=lambda m: m.version)
+
+
+async def applied_versions(connection: asyncpg.Connection) -> Set[str]:
+    await connection.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    rows = await connection.fetch("SELECT version FROM schema_migrations")
+    return {row["version"] for row in rows}
+
+
+async def _acquire_lock(connection: asyncpg.Connection):
+    """Take the session lock, polling instead of blocking in pg_advisory_lock.
+
+    A backend waiting inside pg_advisory_lock holds a snapshot, and CREATE
+    INDEX CONCURRENTLY in the worker holding the lock waits for every such
+    snapshot to end: the two would wait on each other forever. Between polls
+    this connection has no query running and holds no snapshot.
+    """
+    waiting = False
+    while not await connection.fetchval("SELECT pg_try_advisory_lock(hashtext($1))", LOCK_NAME):
+        if not waiting:
+            logger.info("Waiting for another process to finish the migrations")
+            waiting = True
+        await asyncio.sleep(LOCK_POLL_SECONDS)
+
+
+async def _drop_invalid_index(connection: asyncpg.Connection, statement: str):
+    """Drop what an aborted CREATE INDEX CONCURRENTLY left behind.
+
+    The failed build leaves an INVALID index that the planner never uses but
+    that IF NOT EXISTS would skip on every later run.
+    """
+    match = CONCURRENT_INDEX_RE.search(statement)
+    if match is None:
+        return
+    invalid = await connection.fetchval(
+        """
+        SELECT NOT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indexrelid = to_regclass($1) AND c.relkind = 'i'
+        """,
+        match.group(1)
+    )
+    if invalid:
+        logger.warning("Rebuilding invalid index %s", match.group(1))
+        await connection.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {match.group(1)}")
+
+
+async def _partition_aware(connection: asyncpg.Connection, statement: str) -> str:
+    """Build indexes on partitioned tables without CONCURRENTLY, which they don't support.
+
+    A plain CREATE INDEX on the parent creates the index on every partition.
+    """
+    match = CONCURRENT_INDEX_RE.search(statement)
+    if match is None:
+        return statement
+    relkind = await connection.fetchval("SELECT relkind FROM pg_class WHERE oid = to_regclass($1)", match.group(2))
+    if relkind != "p":
+        return statement
+    return re.sub(r"\s+CONCURRENTLY\b", "", statement, count=1, flags=re.IGNORECASE)
+
+
+async def migrate(connection: asyncpg.Connection) -> List[str]:
+    """Apply pending migrations in order; returns the versions applied"""
+    # Session lock: no-transaction migrations can't rely on a transaction-scoped one
+    await _acquire_lock(connection)
+    try:
+        applied = await applied_versions(connection)
+        newly_applied = []
+        for migration in discover_migrations():
+            if migration.version in applied:
+                continue
+            logger.info("Applying migration %s_%s", migration.version, migration.name)
+            record = "INSERT INTO schema_migrations (version, name) VALUES ($1, $2)"
+            if migration.transactional:
+                async with connection.transaction():
+                    await connection.execute(migration.sql)
+                    await connection.execute(record, migration.version, migration.name)
+            else:
+                for statement in migration.statements():
+                    await _drop_invalid_index(connection, statement)
+                    await connection.execute(await _partition_aware(connection, statement))
+                await connection.execute(record, migration.version, migration.name)
+            newly_applied.append(migration.version)
+        return newly_applied
+    finally:
+        await connection.execute("SELECT pg_advisory_unlock(hashtext($1))", LOCK_NAME)
+
+
+def _hot_queries() -> List[tuple]:
+    """(description, query, arguments, index expected to serve it)"""
+    by_status, status_args = EmailEventCRUD._newest_first_query("status", "pending")
+    by_trigger, trigger_args = EmailEventCRUD._newest_first_query("trigger_matched", "ALERT")
+    by_event, event_args = CallLogCRUD._by_email_event_query("event")
+    by_contact, contact_args = CallLogCRUD._by_contact_query("contact")
+    return [
+        ("email events by status", f"{by_status} LIMIT 500", status_args, "email_events_status_received_idx"),
+        ("email events by trigger", f"{by_trigger} LIMIT 500", trigger_args, "email_events_trigger_received_idx"),
+        ("email events newest first", "SELECT id FROM email_events ORDER BY received_at DESC OFFSET 0 LIMIT 100",
+         [], "email_events_received_at_idx"),
+        ("call logs by email event", f"{by_event} LIMIT 500", event_args, "call_logs_email_event_attempt_idx"),
+        ("call logs by contact", f"{by_contact} LIMIT 500", contact_args, "call_logs_contact_created_idx"),
+        ("call logs newest first", "SELECT id FROM call_logs ORDER BY created_at DESC OFFSET 0 LIMIT 100",
+         [], "call_logs_created_at_idx"),
+        ("calls today",
+         "SELECT COUNT(*) FROM call_logs WHERE created_at >= CURRENT_DATE AND created_at < CURRENT_DATE + 1",
+         [], "call_logs_created_at_idx"),
+        ("latest metric",
+         "SELECT id FROM system_stats WHERE metric_name = $1 ORDER BY recorded_at DESC LIMIT 1",
+         ["pool_utilization"], "system_stats_metric_recorded_idx"),
+        ("active trigger by string",
+         "SELECT id FROM triggers WHERE trigger_string = $1 AND is_active = true",
+         ["ALERT"], "triggers_active_string_idx"),
+        ("active contacts of a group",
+         "SELECT id FROM contacts WHERE group_ids @> ARRAY[$1] AND is_active = true ORDER BY priority ASC",
+         ["group"], "contacts_group_ids_idx"),
+        ("call stats timeseries",
+         "SELECT bucket_start FROM call_stats_rollups WHERE bucket_size = $1 AND bucket_start >= $2::timestamp",
+         ["hour", "2024-01-01"], "call_stats_rollups_pkey"),
+    ]
+
+
+def _index_names(plan: Any) -> Set[str]:
+    if isinstance(plan, list):
+        return set().union(*(_index_names(node) for node in plan)) if plan else set()
+    if not isinstance(plan, dict):
+        return set()
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for key in ("Plan", "Plans"):
+        if key in plan:
+            names |= _index_names(plan[key])
+    return names
+
+
+async def _with_parent_indexes(connection: asyncpg.Connection, names: Set[str]) -> Set[str]:
+    """Add the partitioned index each partition's index belongs to"""
+    parents = await connection.fetch(
+        """
+        SELECT parent.relname
+        FROM pg_class child
+        JOIN pg_inherits i ON i.inhrelid = child.oid
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        WHERE child.relname = ANY($1::text[]) AND child.relkind = 'i'
+        """,
+        list(names)
+    )
+    return names | {row["relname"] for row in parents}
+
+
+async def explain_hot_queries(connection: asyncpg.Connection) -> List[Dict[str, Any]]:
+    """Check that each hot query can be served by its index.
+
+    Sequential scans are disabled for the check, so small or empty tables
+    still show which index the planner would pick once they grow.
+    """
+    results = []
+    async with connection.transaction():
+        await connection.execute("SET LOCAL enable_seqscan = off")
+        for description, query, args, index in _hot_queries():
+            plan = await connection.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *args)
+            used = await _with_parent_indexes(connection, _index_names(plan))
+            results.append({"query": description, "index": index, "ok": index in used, "used": sorted(used)})
+    return results
+
+
+async def _main(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    parser.add_argument("--check", action="store_true", help="verify the hot queries use their indexes")
+    args = parser.parse_args(argv)
+
+    connection = await asyncpg.connect(settings.database_url)
+    await _init_connection(connection)
+    try:
+        if args.status:
+            applied = await applied_versions(connection)
+            for migration in discover_migrations():
+                state = "applied" if migration.version in applied else "pending"
+                print(f"{migration.version}_{migration.name}: {state}")
+            return 0
+        if args.check:
+            failures = 0
+            for result in await explain_hot_queries(connection):
+                failures += not result["ok"]
+                mark = "ok" if result["ok"] else "MISSING"
+                print(f"{mark:8} {result['query']}: expected {result['index']}, plan uses {result['used'] or 'no index'}")
+            return 1 if failures else 0
+        applied = await migrate(connection)
+        print(f"Applied {len(applied)} migration(s){': ' + ', '.join(applied) if applied else ''}")
+        return 0
+    finally:
+        await connection.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(sys.argv[1:])))
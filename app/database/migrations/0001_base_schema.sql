@@ -0,0 +1,80 @@
+-- Tables used by the API. IF NOT EXISTS keeps this a no-op on databases
+-- created before migrations were shipped.
+
+CREATE TABLE IF NOT EXISTS contact_groups (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    is_active BOOLEAN NOT NULL DEFAULT true,
+    emergency_level TEXT DEFAULT 'medium',
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS triggers (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    trigger_string TEXT NOT NULL,
+    description TEXT,
+    group_id TEXT,
+    is_active BOOLEAN NOT NULL DEFAULT true,
+    priority INTEGER DEFAULT 1,
+    custom_message TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS contacts (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    phone_number TEXT NOT NULL,
+    priority INTEGER DEFAULT 1,
+    is_active BOOLEAN NOT NULL DEFAULT true,
+    role TEXT,
+    department TEXT,
+    group_ids TEXT[] NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS email_events (
+    id TEXT PRIMARY KEY,
+    from_email TEXT NOT NULL,
+    subject TEXT,
+    body TEXT,
+    trigger_matched TEXT,
+    received_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    processed_at TIMESTAMP,
+    status TEXT DEFAULT 'pending'
+);
+
+CREATE TABLE IF NOT EXISTS call_logs (
+    id BIGSERIAL PRIMARY KEY,
+    email_event_id TEXT NOT NULL,
+    contact_id TEXT NOT NULL,
+    phone_number TEXT NOT NULL,
+    call_sid TEXT,
+    status TEXT NOT NULL,
+    duration INTEGER,
+    attempt_number INTEGER DEFAULT 1,
+    error_message TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS system_stats (
+    id BIGSERIAL PRIMARY KEY,
+    metric_name TEXT NOT NULL,
+    metric_value JSONB NOT NULL,
+    recorded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    email TEXT NOT NULL,
+    hashed_password TEXT NOT NULL,
+    is_active BOOLEAN NOT NULL DEFAULT true,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
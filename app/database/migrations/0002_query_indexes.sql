@@ -0,0 +1,54 @@
+-- migrate: no-transaction
+-- One index per CRUD access path; built concurrently so existing tables stay writable.
+
+-- CallLogCRUD.get_all, get_all_for_export, the daily count and retention cutoffs
+CREATE INDEX CONCURRENTLY IF NOT EXISTS call_logs_created_at_idx
+    ON call_logs (created_at DESC, id DESC);
+
+-- CallLogCRUD.get_by_email_event: attempts in order, and the retention reference check
+CREATE INDEX CONCURRENTLY IF NOT EXISTS call_logs_email_event_attempt_idx
+    ON call_logs (email_event_id, (COALESCE(attempt_number, 1)), created_at, id);
+
+-- CallLogCRUD.get_by_contact; updated_at lets get_contact_version stay index-only
+CREATE INDEX CONCURRENTLY IF NOT EXISTS call_logs_contact_created_idx
+    ON call_logs (contact_id, created_at DESC, id DESC) INCLUDE (updated_at);
+
+-- EmailEventCRUD.get_all
+CREATE INDEX CONCURRENTLY IF NOT EXISTS email_events_received_at_idx
+    ON email_events (received_at DESC, id DESC);
+
+-- EmailEventCRUD.get_by_status and get_status_version
+CREATE INDEX CONCURRENTLY IF NOT EXISTS email_events_status_received_idx
+    ON email_events (status, received_at DESC, id DESC) INCLUDE (processed_at);
+
+-- EmailEventCRUD.get_by_trigger
+CREATE INDEX CONCURRENTLY IF NOT EXISTS email_events_trigger_received_idx
+    ON email_events (trigger_matched, received_at DESC, id DESC);
+
+-- SystemStatsCRUD.get_by_metric_name and get_latest_by_metric_name
+CREATE INDEX CONCURRENTLY IF NOT EXISTS system_stats_metric_recorded_idx
+    ON system_stats (metric_name, recorded_at DESC);
+
+-- SystemStatsCRUD.get_all and delete_old_stats
+CREATE INDEX CONCURRENTLY IF NOT EXISTS system_stats_recorded_at_idx
+    ON system_stats (recorded_at DESC);
+
+-- TriggerCRUD.get_by_trigger_string only looks at active triggers
+CREATE INDEX CONCURRENTLY IF NOT EXISTS triggers_active_string_idx
+    ON triggers (trigger_string) WHERE is_active;
+
+-- TriggerCRUD.get_all
+CREATE INDEX CONCURRENTLY IF NOT EXISTS triggers_priority_created_idx
+    ON triggers (priority, created_at DESC);
+
+-- ContactCRUD.get_by_group_id and get_group_version (group_ids @> ARRAY[...])
+CREATE INDEX CONCURRENTLY IF NOT EXISTS contacts_group_ids_idx
+    ON contacts USING GIN (group_ids);
+
+-- ContactCRUD.get_all
+CREATE INDEX CONCURRENTLY IF NOT EXISTS contacts_priority_created_idx
+    ON contacts (priority, created_at DESC);
+
+-- ContactGroupCRUD.get_all
+CREATE INDEX CONCURRENTLY IF NOT EXISTS contact_groups_created_at_idx
+    ON contact_groups (created_at DESC);
@@ -0,0 +1,86 @@
+-- Per minute/hour/day call aggregates keyed by group, trigger and status.
+-- Maintained by a row trigger on call_logs: an insert adds the row to its
+-- buckets, an update moves it (subtract OLD, add NEW). Deletes are not
+-- subtracted, so purging old call logs keeps their history.
+CREATE TABLE IF NOT EXISTS call_stats_rollups (
+    bucket_size TEXT NOT NULL,
+    bucket_start TIMESTAMP NOT NULL,
+    group_id TEXT NOT NULL DEFAULT '',
+    trigger_matched TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    calls BIGINT NOT NULL DEFAULT 0,
+    attempts BIGINT NOT NULL DEFAULT 0,
+    total_duration BIGINT NOT NULL DEFAULT 0,
+    duration_samples BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_size, bucket_start, group_id, trigger_matched, status)
+);
+
+CREATE OR REPLACE FUNCTION mailtocall_rollup_call_log(cl call_logs, sign INTEGER) RETURNS void AS $$
+DECLARE
+    v_group TEXT;
+    v_trigger TEXT;
+    v_size TEXT;
+BEGIN
+    SELECT e.trigger_matched INTO v_trigger FROM email_events e WHERE e.id = cl.email_event_id;
+    -- The group is the one the matched trigger pages (contacts can belong to several)
+    SELECT t.group_id INTO v_group FROM triggers t
+    WHERE t.trigger_string = v_trigger
+    ORDER BY t.is_active DESC
+    LIMIT 1;
+    FOREACH v_size IN ARRAY ARRAY['minute', 'hour', 'day'] LOOP
+        INSERT INTO call_stats_rollups AS r
+            (bucket_size, bucket_start, group_id, trigger_matched, status,
+             calls, attempts, total_duration, duration_samples)
+        VALUES (
+            v_size, date_trunc(v_size, cl.created_at), COALESCE(v_group, ''), COALESCE(v_trigger, ''),
+            COALESCE(cl.status, ''), sign, sign * COALESCE(cl.attempt_number, 1),
+            sign * COALESCE(cl.duration, 0), CASE WHEN cl.duration IS NULL THEN 0 ELSE sign END
+        )
+        ON CONFLICT (bucket_size, bucket_start, group_id, trigger_matched, status) DO UPDATE SET
+            calls = r.calls + EXCLUDED.calls,
+            attempts = r.attempts + EXCLUDED.attempts,
+            total_duration = r.total_duration + EXCLUDED.total_duration,
+            duration_samples = r.duration_samples + EXCLUDED.duration_samples;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION mailtocall_rollup_call_logs() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF OLD.status IS NOT DISTINCT FROM NEW.status
+            AND OLD.duration IS NOT DISTINCT FROM NEW.duration
+            AND OLD.attempt_number IS NOT DISTINCT FROM NEW.attempt_number
+            AND OLD.created_at IS NOT DISTINCT FROM NEW.created_at
+            AND OLD.email_event_id IS NOT DISTINCT FROM NEW.email_event_id THEN
+            RETURN NULL;
+        END IF;
+        PERFORM mailtocall_rollup_call_log(OLD, -1);
+    END IF;
+    PERFORM mailtocall_rollup_call_log(NEW, 1);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS call_logs_rollup ON call_logs;
+CREATE TRIGGER call_logs_rollup AFTER INSERT OR UPDATE ON call_logs
+    FOR EACH ROW EXECUTE FUNCTION mailtocall_rollup_call_logs();
+
+INSERT INTO call_stats_rollups
+    (bucket_size, bucket_start, group_id, trigger_matched, status,
+     calls, attempts, total_duration, duration_samples)
+SELECT s.size, date_trunc(s.size, cl.created_at), COALESCE(t.group_id, ''), COALESCE(e.trigger_matched, ''),
+       COALESCE(cl.status, ''), COUNT(*), SUM(COALESCE(cl.attempt_number, 1)),
+       COALESCE(SUM(cl.duration), 0), COUNT(cl.duration)
+FROM call_logs cl
+CROSS JOIN (VALUES ('minute'), ('hour'), ('day')) AS s(size)
+LEFT JOIN email_events e ON e.id = cl.email_event_id
+LEFT JOIN LATERAL (
+    SELECT group_id FROM triggers
+    WHERE trigger_string = e.trigger_matched
+    ORDER BY is_active DESC
+    LIMIT 1
+) t ON true
+-- Backfill once; databases that already maintain the rollups keep them
+WHERE NOT EXISTS (SELECT 1 FROM call_stats_rollups)
+GROUP BY 1, 2, 3, 4, 5;
@@ -0,0 +1,11 @@
+-- Idempotency keys for email event ingestion: the sender's Message-ID or a
+-- hash of the sender, subject and body. A key seen again within the dedup
+-- window maps to the event it created; after the window it is claimed again.
+CREATE TABLE IF NOT EXISTS email_event_keys (
+    key TEXT PRIMARY KEY,
+    email_event_id TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Retention of expired keys
+CREATE INDEX IF NOT EXISTS email_event_keys_created_at_idx ON email_event_keys (created_at);
@@ -0,0 +1,4 @@
+-- Alert storm coalescing: an event stands for every identical alert folded
+-- into it during the coalescing window.
+ALTER TABLE email_events ADD COLUMN IF NOT EXISTS occurrence_count INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE email_events ADD COLUMN IF NOT EXISTS last_occurrence_at TIMESTAMP;
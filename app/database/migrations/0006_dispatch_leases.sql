@@ -0,0 +1,14 @@
+-- One row per call in progress, shared by every worker so the concurrent
+-- call cap holds across the deployment. Leases expire on their own if the
+-- dialer never releases them.
+CREATE TABLE IF NOT EXISTS dispatch_leases (
+    id BIGSERIAL PRIMARY KEY,
+    contact_id TEXT NOT NULL,
+    group_id TEXT,
+    email_event_id TEXT,
+    emergency_level TEXT NOT NULL,
+    acquired_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS dispatch_leases_expires_at_idx ON dispatch_leases (expires_at);
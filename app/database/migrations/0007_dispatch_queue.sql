@@ -0,0 +1,9 @@
+-- migrate: no-transaction
+-- Priority dispatch queue over email_events: claimed events move to
+-- 'processing' and can be reclaimed if their dispatcher never finishes.
+ALTER TABLE email_events ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP;
+
+-- DispatchCRUD.claim_next: only the events still waiting to be dispatched
+CREATE INDEX CONCURRENTLY IF NOT EXISTS email_events_dispatch_queue_idx
+    ON email_events (received_at)
+    WHERE status IN ('pending', 'processing');
@@ -0,0 +1,107 @@
+-- Remember on each call log the group and trigger whose rollup buckets it
+-- was counted in. 0003 derived them again from triggers when subtracting
+-- OLD on update, so editing a trigger (or its group) in between moved the
+-- subtraction to another bucket and the counts drifted.
+ALTER TABLE call_logs
+    ADD COLUMN IF NOT EXISTS rollup_group_id TEXT,
+    ADD COLUMN IF NOT EXISTS rollup_trigger TEXT;
+
+-- Existing rows get the current mapping, the one 0003 would have used for
+-- them now; call_stats_rollups can be rebuilt (app.core.rollups) to match.
+-- Runs before the trigger below exists. The row triggers already on the
+-- table (the rollups, which would subtract and add back the same counts, and
+-- the realtime NOTIFY) are disabled for the backfill so they don't fire once
+-- per existing row; other sessions never see them disabled, since this all
+-- runs in the migration's transaction.
+ALTER TABLE call_logs DISABLE TRIGGER USER;
+
+UPDATE call_logs cl
+SET rollup_trigger = COALESCE(e.trigger_matched, ''),
+    rollup_group_id = COALESCE((
+        SELECT t.group_id FROM triggers t
+        WHERE t.trigger_string = e.trigger_matched
+        ORDER BY t.is_active DESC
+        LIMIT 1
+    ), '')
+FROM email_events e
+WHERE e.id = cl.email_event_id AND cl.rollup_trigger IS NULL;
+
+UPDATE call_logs SET rollup_trigger = '', rollup_group_id = '' WHERE rollup_trigger IS NULL;
+
+ALTER TABLE call_logs ENABLE TRIGGER USER;
+
+CREATE OR REPLACE FUNCTION mailtocall_call_log_rollup_keys() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.email_event_id IS NOT DISTINCT FROM NEW.email_event_id THEN
+        NEW.rollup_trigger := OLD.rollup_trigger;
+        NEW.rollup_group_id := OLD.rollup_group_id;
+        RETURN NEW;
+    END IF;
+    SELECT e.trigger_matched INTO NEW.rollup_trigger FROM email_events e WHERE e.id = NEW.email_event_id;
+    -- The group is the one the matched trigger pages (contacts can belong to several)
+    SELECT t.group_id INTO NEW.rollup_group_id FROM triggers t
+    WHERE t.trigger_string = NEW.rollup_trigger
+    ORDER BY t.is_active DESC
+    LIMIT 1;
+    NEW.rollup_trigger := COALESCE(NEW.rollup_trigger, '');
+    NEW.rollup_group_id := COALESCE(NEW.rollup_group_id, '');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS call_logs_rollup_keys ON call_logs;
+CREATE TRIGGER call_logs_rollup_keys BEFORE INSERT OR UPDATE ON call_logs
+    FOR EACH ROW EXECUTE FUNCTION mailtocall_call_log_rollup_keys();
+
+-- Scalar arguments instead of the call_logs row type, so the function does
+-- not depend on the table's row type
+DROP FUNCTION IF EXISTS mailtocall_rollup_call_log(call_logs, INTEGER);
+
+CREATE OR REPLACE FUNCTION mailtocall_rollup_call_log(
+    p_created_at TIMESTAMP, p_group_id TEXT, p_trigger TEXT, p_status TEXT,
+    p_attempt_number INTEGER, p_duration INTEGER, sign INTEGER
+) RETURNS void AS $$
+DECLARE
+    v_size TEXT;
+BEGIN
+    FOREACH v_size IN ARRAY ARRAY['minute', 'hour', 'day'] LOOP
+        INSERT INTO call_stats_rollups AS r
+            (bucket_size, bucket_start, group_id, trigger_matched, status,
+             calls, attempts, total_duration, duration_samples)
+        VALUES (
+            v_size, date_trunc(v_size, p_created_at), COALESCE(p_group_id, ''), COALESCE(p_trigger, ''),
+            COALESCE(p_status, ''), sign, sign * COALESCE(p_attempt_number, 1),
+            sign * COALESCE(p_duration, 0), CASE WHEN p_duration IS NULL THEN 0 ELSE sign END
+        )
+        ON CONFLICT (bucket_size, bucket_start, group_id, trigger_matched, status) DO UPDATE SET
+            calls = r.calls + EXCLUDED.calls,
+            attempts = r.attempts + EXCLUDED.attempts,
+            total_duration = r.total_duration + EXCLUDED.total_duration,
+            duration_samples = r.duration_samples + EXCLUDED.duration_samples;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION mailtocall_rollup_call_logs() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF OLD.status IS NOT DISTINCT FROM NEW.status
+            AND OLD.duration IS NOT DISTINCT FROM NEW.duration
+            AND OLD.attempt_number IS NOT DISTINCT FROM NEW.attempt_number
+            AND OLD.created_at IS NOT DISTINCT FROM NEW.created_at
+            AND OLD.rollup_group_id IS NOT DISTINCT FROM NEW.rollup_group_id
+            AND OLD.rollup_trigger IS NOT DISTINCT FROM NEW.rollup_trigger THEN
+            RETURN NULL;
+        END IF;
+        PERFORM mailtocall_rollup_call_log(
+            OLD.created_at, OLD.rollup_group_id, OLD.rollup_trigger, OLD.status,
+            OLD.attempt_number, OLD.duration, -1
+        );
+    END IF;
+    PERFORM mailtocall_rollup_call_log(
+        NEW.created_at, NEW.rollup_group_id, NEW.rollup_trigger, NEW.status,
+        NEW.attempt_number, NEW.duration, 1
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
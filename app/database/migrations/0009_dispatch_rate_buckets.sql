@@ -0,0 +1,12 @@
+-- Per-contact and per-group call rate token buckets, shared by every worker
+-- and updated under the same advisory lock as dispatch_leases, so the rate
+-- holds across the deployment and concurrent requests cannot both spend the
+-- last token. A bucket untouched for a minute is full again; retention
+-- removes idle ones.
+CREATE TABLE IF NOT EXISTS dispatch_rate_buckets (
+    key TEXT PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS dispatch_rate_buckets_updated_at_idx ON dispatch_rate_buckets (updated_at);
@@ -0,0 +1,99 @@
+-- Monthly range partitions for call_logs (by created_at) and email_events
+-- (by received_at), so retention can drop whole months instead of deleting
+-- rows. Later months are created by app.database.partitions.
+--
+-- Converting a table copies every row while holding an ACCESS EXCLUSIVE lock
+-- on it, so this migration only converts tables that are still empty (new
+-- installations). Existing tables are converted by an explicit offline step,
+-- python -m app.database.partitions --convert, which calls the function below.
+--
+-- The primary key has to include the partition key; ids stay unique through
+-- the id tables of 0015_partitioned_id_lookup. There is no DEFAULT partition:
+-- it would rule out DETACH PARTITION ... CONCURRENTLY at retention time.
+CREATE OR REPLACE FUNCTION mailtocall_partition_by_month(p_table TEXT, p_column TEXT) RETURNS void AS $$
+DECLARE
+    v_old TEXT := p_table || '_unpartitioned';
+    v_pkey TEXT;
+    v_sequence TEXT;
+    v_indexes TEXT[];
+    v_triggers TEXT[];
+    v_statement TEXT;
+    v_month DATE;
+    v_last DATE;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass(p_table)) = 'p' THEN
+        RETURN;
+    END IF;
+
+    -- Indexes other than the primary key, and triggers, to define again on
+    -- the partitioned table; their definitions name the table as p_table
+    SELECT COALESCE(array_agg(pg_get_indexdef(i.indexrelid)), '{}') INTO v_indexes
+    FROM pg_index i
+    WHERE i.indrelid = to_regclass(p_table)
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid);
+    SELECT COALESCE(array_agg(pg_get_triggerdef(t.oid)), '{}') INTO v_triggers
+    FROM pg_trigger t
+    WHERE t.tgrelid = to_regclass(p_table) AND NOT t.tgisinternal;
+
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', p_table, v_old);
+    -- Free the names of the primary key and the indexes for the new table
+    SELECT conname INTO v_pkey FROM pg_constraint WHERE conrelid = to_regclass(v_old) AND contype = 'p';
+    IF v_pkey IS NOT NULL THEN
+        EXECUTE format('ALTER TABLE %I RENAME CONSTRAINT %I TO %I', v_old, v_pkey, v_old || '_pkey');
+    END IF;
+    FOR v_statement IN
+        SELECT format('DROP INDEX %s', i.indexrelid::regclass)
+        FROM pg_index i
+        WHERE i.indrelid = to_regclass(v_old)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+    LOOP
+        EXECUTE v_statement;
+    END LOOP;
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS, PRIMARY KEY (id, %I)) '
+        'PARTITION BY RANGE (%I)',
+        p_table, v_old, p_column, p_column
+    );
+    -- call_logs.id keeps its sequence, which would otherwise go with the old table
+    v_sequence := pg_get_serial_sequence(v_old, 'id');
+    IF v_sequence IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.id', v_sequence, p_table);
+    END IF;
+
+    -- One partition per month holding rows, and up to three months ahead
+    -- (PARTITION_MONTHS_AHEAD's default)
+    EXECUTE format(
+        'SELECT date_trunc(''month'', min(%I))::date, date_trunc(''month'', max(%I))::date FROM %I',
+        p_column, p_column, v_old
+    ) INTO v_month, v_last;
+    v_month := LEAST(v_month, date_trunc('month', LOCALTIMESTAMP)::date);
+    v_last := GREATEST(v_last, (date_trunc('month', LOCALTIMESTAMP) + INTERVAL '3 months')::date);
+    WHILE v_month <= v_last LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            p_table || '_p' || to_char(v_month, 'YYYYMM'), p_table, v_month, (v_month + INTERVAL '1 month')::date
+        );
+        v_month := (v_month + INTERVAL '1 month')::date;
+    END LOOP;
+
+    -- Copied before the indexes are built and before the triggers exist, so
+    -- the copy neither maintains the indexes row by row nor fires them
+    EXECUTE format('INSERT INTO %I SELECT * FROM %I', p_table, v_old);
+    EXECUTE format('DROP TABLE %I', v_old);
+    FOREACH v_statement IN ARRAY v_indexes || v_triggers LOOP
+        EXECUTE v_statement;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM call_logs) THEN
+        PERFORM mailtocall_partition_by_month('call_logs', 'created_at');
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM email_events) THEN
+        PERFORM mailtocall_partition_by_month('email_events', 'received_at');
+    END IF;
+END;
+$$;
@@ -0,0 +1,5 @@
+-- Last change to an email event. Every UPDATE the API issues bumps it, so
+-- the by-status ETag (EmailEventCRUD.get_status_version) sees edits to any
+-- column, not only the status and timestamps. Existing rows start at the
+-- time of the migration.
+ALTER TABLE email_events ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
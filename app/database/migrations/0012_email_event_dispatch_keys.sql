@@ -0,0 +1,50 @@
+-- Dispatch inputs of an email event, resolved once when it is stored: the
+-- matched trigger's group, that group's emergency level ('' without one)
+-- and the trigger priority. DispatchCRUD.claim_next orders by them instead
+-- of joining triggers and groups for every waiting event on every claim.
+-- An edit to trigger_matched resolves them again; later changes to the
+-- trigger or group do not move events already waiting.
+ALTER TABLE email_events
+    ADD COLUMN IF NOT EXISTS dispatch_group_id TEXT,
+    ADD COLUMN IF NOT EXISTS dispatch_level TEXT NOT NULL DEFAULT '',
+    ADD COLUMN IF NOT EXISTS dispatch_trigger_priority INTEGER;
+
+-- Only events still waiting are read by claim_next
+UPDATE email_events ee
+SET dispatch_group_id = t.group_id,
+    dispatch_level = COALESCE(t.emergency_level, ''),
+    dispatch_trigger_priority = t.priority
+FROM (
+    SELECT e.id, tr.group_id, tr.priority, g.emergency_level
+    FROM email_events e
+    JOIN LATERAL (
+        SELECT group_id, priority FROM triggers
+        WHERE trigger_string = e.trigger_matched AND is_active = true
+        ORDER BY priority ASC
+        LIMIT 1
+    ) tr ON true
+    LEFT JOIN contact_groups g ON g.id = tr.group_id
+    WHERE e.status IN ('pending', 'processing')
+) t
+WHERE ee.id = t.id;
+
+CREATE OR REPLACE FUNCTION mailtocall_email_event_dispatch_keys() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.trigger_matched IS NOT DISTINCT FROM NEW.trigger_matched THEN
+        RETURN NEW;
+    END IF;
+    SELECT t.group_id, t.priority, g.emergency_level
+    INTO NEW.dispatch_group_id, NEW.dispatch_trigger_priority, NEW.dispatch_level
+    FROM triggers t
+    LEFT JOIN contact_groups g ON g.id = t.group_id
+    WHERE t.trigger_string = NEW.trigger_matched AND t.is_active = true
+    ORDER BY t.priority ASC
+    LIMIT 1;
+    NEW.dispatch_level := COALESCE(NEW.dispatch_level, '');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS email_events_dispatch_keys ON email_events;
+CREATE TRIGGER email_events_dispatch_keys BEFORE INSERT OR UPDATE OF trigger_matched ON email_events
+    FOR EACH ROW EXECUTE FUNCTION mailtocall_email_event_dispatch_keys();
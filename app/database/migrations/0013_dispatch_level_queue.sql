@@ -0,0 +1,6 @@
+-- migrate: no-transaction
+-- DispatchCRUD.claim_next: the distinct levels of the waiting events (a
+-- skip scan) and the oldest waiting events of each level
+CREATE INDEX CONCURRENTLY IF NOT EXISTS email_events_dispatch_level_queue_idx
+    ON email_events (dispatch_level, received_at)
+    WHERE status IN ('pending', 'processing');
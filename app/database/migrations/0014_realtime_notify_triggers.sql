@@ -0,0 +1,63 @@
+-- Row-level triggers publishing inserts/updates of email_events and call_logs
+-- for the realtime feed (app.core.events). They used to be dropped and
+-- created by every worker at boot, taking an ACCESS EXCLUSIVE lock on both
+-- tables each time.
+--
+-- The channel is the session's mailtocall.realtime_channel, which the app's
+-- pool sets from REALTIME_CHANNEL ('' when REALTIME_ENABLED is off, which
+-- skips the NOTIFY); sessions that do not set it publish on the default
+-- channel. Payloads stay small (no email body) to fit NOTIFY's 8000 byte
+-- limit. The table is spelled out rather than TG_TABLE_NAME: on partitioned
+-- tables the trigger fires on the partition the row lands in.
+CREATE OR REPLACE FUNCTION mailtocall_realtime_channel() RETURNS TEXT AS $$
+    SELECT COALESCE(current_setting('mailtocall.realtime_channel', true), 'mailtocall_changes');
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION mailtocall_notify_email_event() RETURNS trigger AS $$
+DECLARE
+    v_channel TEXT := mailtocall_realtime_channel();
+BEGIN
+    IF v_channel = '' THEN
+        RETURN NEW;
+    END IF;
+    PERFORM pg_notify(v_channel, json_build_object(
+        'table', 'email_events',
+        'op', TG_OP,
+        'id', NEW.id,
+        'status', NEW.status,
+        'trigger_matched', NEW.trigger_matched,
+        'from_email', NEW.from_email,
+        'subject', left(NEW.subject, 200),
+        'received_at', NEW.received_at
+    )::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION mailtocall_notify_call_log() RETURNS trigger AS $$
+DECLARE
+    v_channel TEXT := mailtocall_realtime_channel();
+BEGIN
+    IF v_channel = '' THEN
+        RETURN NEW;
+    END IF;
+    PERFORM pg_notify(v_channel, json_build_object(
+        'table', 'call_logs',
+        'op', TG_OP,
+        'id', NEW.id,
+        'status', NEW.status,
+        'email_event_id', NEW.email_event_id,
+        'contact_id', NEW.contact_id,
+        'attempt_number', NEW.attempt_number,
+        'duration', NEW.duration,
+        'updated_at', NEW.updated_at
+    )::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER email_events_notify AFTER INSERT OR UPDATE ON email_events
+    FOR EACH ROW EXECUTE FUNCTION mailtocall_notify_email_event();
+
+CREATE OR REPLACE TRIGGER call_logs_notify AFTER INSERT OR UPDATE ON call_logs
+    FOR EACH ROW EXECUTE FUNCTION mailtocall_notify_call_log();
@@ -0,0 +1,54 @@
+-- Partition key of every email event and call log by id. Partitioned, a
+-- lookup by id alone probes the primary key of every monthly partition; the
+-- CRUDs read the row's month here first, so only its partition is scanned
+-- (run-time pruning), partitioned or not.
+--
+-- email_event_ids' primary key also keeps email event ids unique, which the
+-- partitioned table's (id, received_at) key no longer does. Rows are kept in
+-- step by the triggers below; partitions dropped or detached by retention
+-- leave theirs behind for the retention policies of app.core.retention.
+-- 0016 fills both tables for the rows written before this migration.
+CREATE TABLE IF NOT EXISTS email_event_ids (
+    id TEXT PRIMARY KEY,
+    received_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS email_event_ids_received_at_idx ON email_event_ids (received_at);
+
+CREATE TABLE IF NOT EXISTS call_log_ids (
+    id BIGINT PRIMARY KEY,
+    created_at TIMESTAMP NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION mailtocall_track_email_event_id() RETURNS trigger AS $$
+BEGIN
+    -- An update moving a row to another partition fires DELETE and INSERT
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        DELETE FROM email_event_ids WHERE id = OLD.id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO email_event_ids (id, received_at) VALUES (NEW.id, NEW.received_at);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION mailtocall_track_call_log_id() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        DELETE FROM call_log_ids WHERE id = OLD.id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO call_log_ids (id, created_at) VALUES (NEW.id, NEW.created_at);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER email_events_track_id
+    AFTER INSERT OR DELETE OR UPDATE OF id, received_at ON email_events
+    FOR EACH ROW EXECUTE FUNCTION mailtocall_track_email_event_id();
+
+CREATE OR REPLACE TRIGGER call_logs_track_id
+    AFTER INSERT OR DELETE OR UPDATE OF id, created_at ON call_logs
+    FOR EACH ROW EXECUTE FUNCTION mailtocall_track_call_log_id();
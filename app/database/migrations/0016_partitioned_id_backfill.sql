@@ -0,0 +1,10 @@
+-- migrate: no-transaction
+-- Fill the id tables of 0015 with the rows written before it. Outside a
+-- transaction each statement only holds ACCESS SHARE on its source table;
+-- rows written meanwhile were already added by the triggers of 0015.
+INSERT INTO email_event_ids (id, received_at)
+    SELECT id, received_at FROM email_events
+    ON CONFLICT (id) DO NOTHING;
+INSERT INTO call_log_ids (id, created_at)
+    SELECT id, created_at FROM call_logs
+    ON CONFLICT (id) DO NOTHING;
@@ -0,0 +1,227 @@
+"""Monthly partitions of call_logs and email_events.
+
+    python -m app.database.partitions --status    # partitioned or not, and the partitions
+    python -m app.database.partitions --convert   # partition the tables that are not yet (offline)
+"""
+import argparse
+import asyncio
+import logging
+import re
+import sys
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncpg
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.database.connection import _init_connection, get_db_pool
+
+logger = logging.getLogger(__name__)
+
+# Tables kept as monthly range partitions, with their partition key
+PARTITIONED_TABLES: Dict[str, str] = {
+    "call_logs": "created_at",
+    "email_events": "received_at",
+}
+
+_PARTITION_NAME = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}{month.month:02d}"
+
+
+def _bounds(month: date) -> str:
+    return f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+
+
+async def is_partitioned(connection: asyncpg.Connection, table: str) -> bool:
+    relkind = await connection.fetchval("SELECT relkind FROM pg_class WHERE oid = to_regclass($1)", table)
+    return relkind == "p"
+
+
+async def list_partitions(connection: asyncpg.Connection, table: str) -> List[Tuple[str, date]]:
+    """Monthly partitions managed here, as (name, first day of month), oldest first"""
+    rows = await connection.fetch(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass($1)
+        """,
+        table
+    )
+    partitions = []
+    for row in rows:
+        match = _PARTITION_NAME.search(row["relname"])
+        if match and row["relname"].startswith(f"{table}_p"):
+            partitions.append((row["relname"], date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+async def create_future_partitions(
+    connection: asyncpg.Connection,
+    table: str,
+    months_ahead: int,
+    today: Optional[date] = None
+) -> List[str]:
+    """Make sure the current month and the next ``months_ahead`` months have a partition.
+
+    Created on their own and attached afterwards: ATTACH PARTITION only takes
+    a SHARE UPDATE EXCLUSIVE lock on the parent, where CREATE TABLE ...
+    PARTITION OF would block every reader and writer of the table.
+    """
+    first = _month_start(today or date.today())
+    existing = {name for name, _ in await list_partitions(connection, table)}
+    created = []
+    for offset in range(months_ahead + 1):
+        month = _add_months(first, offset)
+        name = partition_name(table, month)
+        if name in existing:
+            continue
+        await connection.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        await connection.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} {_bounds(month)}")
+        created.append(name)
+    return created
+
+
+async def _rows_blocked(connection: asyncpg.Connection, name: str, table: str, condition: str) -> bool:
+    """Whether a row of partition ``name`` fails the retention ``condition``"""
+    # Alias the partition as the table so the condition's references resolve
+    return await connection.fetchval(f"SELECT EXISTS (SELECT 1 FROM {name} AS {table} WHERE NOT ({condition}))")
+
+
+async def _finalize_pending_detaches(connection: asyncpg.Connection, table: str):
+    """Complete a DETACH ... CONCURRENTLY that was interrupted, which leaves the partition half detached"""
+    rows = await connection.fetch(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass($1) AND i.inhdetachpending
+        """,
+        table
+    )
+    for row in rows:
+        logger.info("Finishing the detach of partition %s", row["relname"])
+        await connection.execute(f"ALTER TABLE {table} DETACH PARTITION {row['relname']} FINALIZE")
+
+
+async def drop_expired_partitions(
+    connection: asyncpg.Connection,
+    table: str,
+    cutoff: datetime,
+    detach_only: bool = False,
+    condition: Optional[str] = None
+) -> List[str]:
+    """Detach (and unless ``detach_only``, drop) partitions whose whole month is older than ``cutoff``.
+
+    Partitions are detached with DETACH PARTITION ... CONCURRENTLY, which
+    never blocks queries on the table but can't run inside a transaction:
+    ``connection`` must not be in one.
+
+    With a retention ``condition`` (an SQL expression over ``table``'s
+    columns), a partition that still holds a row failing it is kept; its
+    other expired rows are left to the batch purge. The condition is checked
+    again once the partition is detached, and the partition attached back if
+    a row written in between fails it.
+    """
+    await _finalize_pending_detaches(connection, table)
+    removed = []
+    for name, month in await list_partitions(connection, table):
+        if datetime.combine(_add_months(month, 1), datetime.min.time()) > cutoff:
+            break
+        if condition is not None and await _rows_blocked(connection, name, table, condition):
+            logger.info("Keeping partition %s: some rows are still referenced", name)
+            continue
+        await connection.execute(f"ALTER TABLE {table} DETACH PARTITION {name} CONCURRENTLY")
+        if condition is not None and await _rows_blocked(connection, name, table, condition):
+            logger.info("Keeping partition %s: a row was referenced while it was detached", name)
+            await connection.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} {_bounds(month)}")
+            continue
+        if not detach_only:
+            await connection.execute(f"DROP TABLE {name}")
+        removed.append(name)
+    return removed
+
+
+async def maintain_partitions(connection: asyncpg.Connection) -> Dict[str, List[str]]:
+    """Create upcoming partitions for every partitioned table; plain tables are left alone"""
+    created = {}
+    async with connection.transaction():
+        # Workers starting together must not race on creating the same partitions
+        await connection.execute("SELECT pg_advisory_xact_lock(hashtext('mailtocall_partitions'))")
+        for table in PARTITIONED_TABLES:
+            if await is_partitioned(connection, table):
+                created[table] = await create_future_partitions(connection, table, settings.partition_months_ahead)
+    for table, names in created.items():
+        if names:
+            logger.info("Created partitions for %s: %s", table, ", ".join(names))
+    return created
+
+
+async def run_partition_maintenance():
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        await maintain_partitions(connection)
+
+
+partition_task = PeriodicTask(
+    "partitions", settings.partition_maintenance_interval_seconds, run_partition_maintenance
+)
+
+
+async def convert_to_partitions(connection: asyncpg.Connection) -> List[str]:
+    """Partition the tables that are not partitioned yet; returns the ones converted.
+
+    Each table is rewritten in one transaction holding an ACCESS EXCLUSIVE
+    lock on it for the whole copy, so this is an offline step: stop the app
+    first. Uses the function of migration 0010.
+    """
+    converted = []
+    for table, column in PARTITIONED_TABLES.items():
+        if await is_partitioned(connection, table):
+            continue
+        logger.info("Partitioning %s by %s", table, column)
+        async with connection.transaction():
+            await connection.execute("SELECT mailtocall_partition_by_month($1, $2)", table, column)
+        converted.append(table)
+    return converted
+
+
+async def _main(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(description="Manage the monthly partitions")
+    parser.add_argument("--status", action="store_true", help="list the partitions of each table")
+    parser.add_argument("--convert", action="store_true", help="partition the tables that are not yet (offline)")
+    args = parser.parse_args(argv)
+
+    connection = await asyncpg.connect(settings.database_url)
+    await _init_connection(connection)
+    try:
+        if args.convert:
+            converted = await convert_to_partitions(connection)
+            print(f"Partitioned {len(converted)} table(s){': ' + ', '.join(converted) if converted else ''}")
+            await maintain_partitions(connection)
+            return 0
+        for table in PARTITIONED_TABLES:
+            if not await is_partitioned(connection, table):
+                print(f"{table}: not partitioned")
+                continue
+            names = [name for name, _ in await list_partitions(connection, table)]
+            print(f"{table}: {len(names)} partition(s){': ' + ', '.join(names) if names else ''}")
+        return 0
+    finally:
+        await connection.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(sys.argv[1:])))
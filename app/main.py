@@ -1,7 +1,20 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import api_router
-from app.database.connection import init_db_pool, close_db_pool
+from app.database.connection import init_db_pool, close_db_pool, get_db_pool
+from app.core.auth import ensure_bootstrap_admin, get_token_decoder
+from app.core.compression import CompressionMiddleware
+from app.core.events import broadcaster
+from app.api.system_stats import refresh_summary, summary_refresher
+from app.core.coalescing import storm_flush_task
+from app.core.health import readiness
+from app.core.metrics import metrics_sampler
+from app.core.prometheus import metrics_snapshot_task, registry, worker_snapshots
+from app.core.timing import TimingMiddleware
+from app.core.retention import retention_task
+from app.database.partitions import partition_task
+from app.database.migrate import migrate
 from app.core.config import settings
 
 app = FastAPI(
@@ -19,17 +32,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (brotli when available, otherwise gzip)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
+# Per-route and per-phase timings for Server-Timing, /metrics and the metrics sampler
+if settings.request_timing_enabled or settings.metrics_sample_interval_seconds > 0:
+    app.add_middleware(TimingMiddleware, server_timing_header=settings.server_timing_header)
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
 
 @app.on_event("startup")
 async def startup_event():
+    # Fail at boot, not on the first request, if JWT_BACKEND is unknown or not installed
+    get_token_decoder(settings.jwt_backend)
     await init_db_pool()
+    pool = await get_db_pool()
+    if settings.migrate_on_startup:
+        async with pool.acquire() as connection:
+            await migrate(connection)
+    if settings.bootstrap_admin_password:
+        async with pool.acquire() as connection:
+            await ensure_bootstrap_admin(connection)
+    readiness.start(pool, refresh_summary)
+    summary_refresher.start()
+    storm_flush_task.start()
+    metrics_sampler.start()
+    partition_task.start()
+    retention_task.start()
+    metrics_snapshot_task.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await readiness.stop()
+    await metrics_snapshot_task.stop()
+    if worker_snapshots is not None:
+        # Keep this worker's final counts in the instance totals
+        worker_snapshots.write()
+    await retention_task.stop()
+    await partition_task.stop()
+    await metrics_sampler.stop()
+    await summary_refresher.stop()
+    await storm_flush_task.stop()
+    # Write the counters still pending; a failure is logged, not raised
+    await storm_flush_task.run_once()
+    await broadcaster.stop()
     await close_db_pool()
 
 
@@ -40,4 +95,31 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/health/live")
+async def liveness_check():
+    """The process is up and serving; never touches the database"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """503 until warmed up, and whenever the database is unreachable or the pool has no headroom"""
+    ready, checks = await readiness.check()
+    return JSONResponse(
+        {"status": "ready" if ready else "not ready", "checks": checks},
+        status_code=200 if ready else 503,
+    )
+
+
+if settings.request_timing_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        """Prometheus exposition of the request, phase and statement histograms.
+
+        This worker's, or with METRICS_MULTIPROCESS_DIR every worker's of the instance
+        """
+        body = worker_snapshots.render() if worker_snapshots is not None else registry.render()
+        return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from app.schemas.email_events import EmailEventResponse
+
+
+class DispatchRequest(BaseModel):
+    contact_id: str
+    group_id: Optional[str] = None
+    email_event_id: Optional[str] = None
+
+
+class DispatchLease(BaseModel):
+    id: int
+    contact_id: str
+    group_id: Optional[str] = None
+    email_event_id: Optional[str] = None
+    emergency_level: str
+    acquired_at: datetime
+    expires_at: datetime
+
+
+class DispatchClaim(BaseModel):
+    email_event: EmailEventResponse
+    group_id: Optional[str] = None
+    emergency_level: Optional[str] = None
+    trigger_priority: Optional[int] = None
+    score: float
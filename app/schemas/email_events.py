@@ -13,6 +13,8 @@ class EmailEventBase(BaseModel):
 
 class EmailEventCreate(EmailEventBase):
     id: str
+    # Message-ID header; without it duplicates are detected by content
+    message_id: Optional[str] = None
 
 
 class EmailEventUpdate(BaseModel):
@@ -27,6 +29,9 @@ class EmailEventResponse(EmailEventBase):
     id: str
     received_at: datetime
     processed_at: Optional[datetime] = None
+    # Alerts folded into this one by storm coalescing, itself included
+    occurrence_count: int = 1
+    last_occurrence_at: Optional[datetime] = None
 
 
 T = TypeVar('T')
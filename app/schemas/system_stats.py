@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 from datetime import datetime
+from enum import Enum
 
 
 class SystemStatsBase(BaseModel):
@@ -19,4 +20,33 @@ class SystemStatsUpdate(BaseModel):
 
 class SystemStatsResponse(SystemStatsBase):
     id: int
-    recorded_at: datetime
\ No newline at end of file
+    recorded_at: datetime
+
+class BucketSize(str, Enum):
+    minute = "minute"
+    hour = "hour"
+    day = "day"
+
+
+class CallStatsBucket(BaseModel):
+    bucket_start: datetime
+    calls: int
+    attempts: int
+    avg_duration: Optional[float] = None
+    by_status: Dict[str, int]
+
+
+class CallStatsBreakdown(BaseModel):
+    key: str
+    calls: int
+    attempts: int
+    avg_duration: Optional[float] = None
+    by_status: Dict[str, int]
+
+
+class DashboardSummary(BaseModel):
+    total_active_triggers: int
+    total_contacts: int
+    total_contact_groups: int
+    total_daily_calls: int
+    computed_at: datetime
@@ -0,0 +1,8 @@
+from uvicorn.workers import UvicornWorker
+from app.core.config import settings
+
+
+class ConfiguredUvicornWorker(UvicornWorker):
+    """Gunicorn worker that takes its event loop and HTTP parser from Settings"""
+
+    CONFIG_KWARGS = {"loop": settings.server_loop, "http": settings.server_http}
@@ -0,0 +1,78 @@
+"""Flood the API with rejected requests and watch the connection pool.
+
+Every request carries an invalid bearer token, so none of them should ever
+take a connection from the pool. Requires a reachable DATABASE_URL.
+
+    python -m benchmarks.auth_flood --requests 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+import httpx
+
+from app.database.connection import close_db_pool, get_db_pool, init_db_pool
+from app.main import app
+
+ENDPOINTS = [
+    "/api/v1/call-logs/",
+    "/api/v1/email-events/",
+    "/api/v1/contacts/",
+    "/api/v1/triggers/",
+    "/api/v1/system-stats/counts/daily-calls",
+]
+
+
+async def run(total_requests: int, concurrency: int) -> int:
+    await init_db_pool()
+    pool = await get_db_pool()
+    peak_in_use = 0
+    done = asyncio.Event()
+
+    async def watch_pool():
+        nonlocal peak_in_use
+        while not done.is_set():
+            peak_in_use = max(peak_in_use, pool.get_size() - pool.get_idle_size())
+            await asyncio.sleep(0.001)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses = {}
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def hit(i: int):
+            async with semaphore:
+                response = await client.get(
+                    ENDPOINTS[i % len(ENDPOINTS)],
+                    headers={"Authorization": f"Bearer invalid.token.{i}"},
+                )
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        watcher = asyncio.create_task(watch_pool())
+        started = time.perf_counter()
+        await asyncio.gather(*(hit(i) for i in range(total_requests)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await watcher
+
+    await close_db_pool()
+
+    print(f"requests:          {total_requests}")
+    print(f"elapsed:           {elapsed:.2f}s ({total_requests / elapsed:.0f} req/s)")
+    print(f"status codes:      {statuses}")
+    print(f"pool max size:     {pool.get_max_size()}")
+    print(f"peak in use:       {peak_in_use}")
+    return 0 if peak_in_use == 0 else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.requests, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
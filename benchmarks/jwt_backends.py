@@ -0,0 +1,45 @@
+"""Compare JWT verification cost across backends and the verified-token cache.
+
+    python -m benchmarks.jwt_backends --iterations 20000
+"""
+import argparse
+import timeit
+from datetime import timedelta
+
+from app.core.auth import (
+    JWT_BACKENDS,
+    create_access_token,
+    decode_access_token,
+    get_token_decoder,
+    token_cache,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": "bench"}, expires_delta=timedelta(minutes=30))
+
+    results = {}
+    for backend in JWT_BACKENDS:
+        try:
+            decode = get_token_decoder(backend)
+        except RuntimeError as e:
+            print(f"{backend:>8}: skipped ({e})")
+            continue
+        results[backend] = timeit.timeit(lambda: decode(token), number=args.iterations)
+
+    token_cache.clear()
+    decode_access_token(token)
+    results["cached"] = timeit.timeit(lambda: decode_access_token(token), number=args.iterations)
+
+    for name, elapsed in results.items():
+        per_call = elapsed / args.iterations * 1e6
+        print(f"{name:>8}: {per_call:8.2f} us/verify ({args.iterations / elapsed:10.0f}/s)")
+    print(f"cache stats: {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""End-to-end load test of the hot endpoints against a seeded Postgres.
+
+Starts a throwaway local Postgres (or uses --database-url), applies the
+migrations, seeds realistic volumes and drives the app in-process through
+ingest, trigger match, group roster, list, search and export. Latency
+percentiles, throughput and the peak RSS sampled during each scenario (Linux)
+go to a JSON report that later runs can be compared against.
+
+    python -m benchmarks.load_suite --output benchmarks/baseline.json
+    python -m benchmarks.load_suite --scale 0.1 --compare benchmarks/baseline.json --tolerance 0.25
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import asyncpg
+import httpx
+
+from benchmarks.pg_fixture import PostgresFixture
+
+# Full-scale volumes; --scale multiplies all of them
+VOLUMES = {
+    "contact_groups": 500,
+    "contacts": 100_000,
+    "triggers": 5_000,
+    "email_events": 200_000,
+    "call_logs": 1_000_000,
+}
+
+# Background work is switched off so only request handling is measured
+BENCH_ENV = {
+    "MIGRATE_ON_STARTUP": "false",
+    "REALTIME_ENABLED": "false",
+    "SUMMARY_REFRESH_SECONDS": "0",
+    "METRICS_SAMPLE_INTERVAL_SECONDS": "0",
+    "RETENTION_INTERVAL_SECONDS": "0",
+    "PARTITION_MAINTENANCE_INTERVAL_SECONDS": "0",
+}
+
+SEED_SQL = [
+    ("contact_groups", """
+        INSERT INTO contact_groups (id, name, description, emergency_level)
+        SELECT 'group-' || g, 'Group ' || g, 'Seeded group ' || g,
+               (ARRAY['low', 'medium', 'high', 'critical'])[1 + g % 4]
+        FROM generate_series(1, $1) g
+    """),
+    ("contacts", """
+        INSERT INTO contacts (id, name, phone_number, priority, role, department, group_ids)
+        SELECT 'contact-' || c, 'Contact ' || c, '+1555' || lpad(c::text, 7, '0'), 1 + c % 5,
+               (ARRAY['oncall', 'manager', 'engineer'])[1 + c % 3], 'Dept ' || (c % 50),
+               ARRAY['group-' || (1 + c % $2), 'group-' || (1 + (c * 7) % $2)]
+        FROM generate_series(1, $1) c
+    """),
+    ("triggers", """
+        INSERT INTO triggers (id, name, trigger_string, group_id, priority, custom_message)
+        SELECT 'trigger-' || t, 'Trigger ' || t, 'ALERT-' || t, 'group-' || (1 + t % $2), 1 + t % 5,
+               'Alert ' || t || ' fired'
+        FROM generate_series(1, $1) t
+    """),
+    ("email_events", """
+        INSERT INTO email_events (id, from_email, subject, body, trigger_matched, status, received_at)
+        SELECT 'event-' || e, 'monitor' || (e % 100) || '@example.com', 'ALERT-' || (1 + e % $2) || ' fired',
+               repeat('log line ', 40), 'ALERT-' || (1 + e % $2),
+               (ARRAY['pending', 'processed', 'failed'])[1 + e % 3],
+               LOCALTIMESTAMP - make_interval(secs => e * 30)
+        FROM generate_series(1, $1) e
+    """),
+    ("call_logs", """
+        INSERT INTO call_logs (email_event_id, contact_id, phone_number, call_sid, status, duration,
+                               attempt_number, created_at, updated_at)
+        SELECT 'event-' || (1 + l % $2), 'contact-' || (1 + l % $3), '+1555' || lpad((1 + l % $3)::text, 7, '0'),
+               'CA' || md5(l::text),
+               (ARRAY['completed', 'completed', 'completed', 'no-answer', 'busy', 'failed'])[1 + l % 6],
+               CASE WHEN l % 6 < 3 THEN 10 + l % 120 END, 1 + l % 3,
+               LOCALTIMESTAMP - make_interval(secs => l * 6), LOCALTIMESTAMP - make_interval(secs => l * 6)
+        FROM generate_series(1, $1) l
+    """),
+]
+
+
+async def seed(dsn: str, scale: float) -> Dict[str, int]:
+    from app.core.config import settings
+    from app.core.rollups import rebuild_rollups
+    from app.database.connection import _init_connection
+    from app.database.migrate import migrate
+    from app.database.partitions import PARTITIONED_TABLES, create_future_partitions, is_partitioned
+
+    counts = {table: max(1, int(volume * scale)) for table, volume in VOLUMES.items()}
+    args = {
+        "contact_groups": (counts["contact_groups"],),
+        "contacts": (counts["contacts"], counts["contact_groups"]),
+        "triggers": (counts["triggers"], counts["contact_groups"]),
+        "email_events": (counts["email_events"], counts["triggers"]),
+        "call_logs": (counts["call_logs"], counts["email_events"], counts["contacts"]),
+    }
+    connection = await asyncpg.connect(dsn)
+    await _init_connection(connection)
+    try:
+        await migrate(connection)
+        # Seeded rows go back further than the months the migrations partition
+        today = date.today()
+        oldest = today - timedelta(seconds=max(counts["email_events"] * 30, counts["call_logs"] * 6))
+        months = (today.year - oldest.year) * 12 + today.month - oldest.month + settings.partition_months_ahead
+        for table in PARTITIONED_TABLES:
+            if await is_partitioned(connection, table):
+                await create_future_partitions(connection, table, months, today=oldest)
+        # Bulk load without the per-row rollup trigger, then rebuild the rollups once
+        await connection.execute("ALTER TABLE call_logs DISABLE TRIGGER call_logs_rollup")
+        for table, sql in SEED_SQL:
+            started = time.perf_counter()
+            await connection.execute(sql, *args[table])
+            print(f"seeded {counts[table]:>9,} {table} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        await connection.execute("ALTER TABLE call_logs ENABLE TRIGGER call_logs_rollup")
+        # The scenarios authenticate as this user, which must exist and be active
+        await connection.execute(
+            "INSERT INTO users (id, username, email, hashed_password) VALUES ('bench', 'bench', 'bench@example.com', '!') "
+            "ON CONFLICT DO NOTHING"
+        )
+        await rebuild_rollups(connection)
+        await connection.execute("ANALYZE")
+    finally:
+        await connection.close()
+    return counts
+
+
+class Scenario:
+    def __init__(self, name: str, requests: int, concurrency: int, build: Callable[[int], Tuple[str, str, dict]]):
+        self.name = name
+        self.requests = requests
+        self.concurrency = concurrency
+        self.build = build
+
+
+def build_scenarios(counts: Dict[str, int], requests: int, concurrency: int) -> List[Scenario]:
+    rng = random.Random(42)
+    today = date.today()
+
+    def ingest(i: int):
+        trigger = f"ALERT-{rng.randint(1, counts['triggers'])}"
+        body = {"id": f"bench-{uuid.uuid4()}", "from_email": "monitor@example.com",
+                "subject": f"{trigger} fired", "body": "load test", "trigger_matched": trigger}
+        return "POST", "/api/v1/email-events/", {"json": body}
+
+    def export(i: int):
+        day = (today - timedelta(days=rng.randint(1, 30))).isoformat()
+        return "GET", "/api/v1/call-logs/export/csv", {"params": {"start_date": day, "end_date": day}}
+
+    return [
+        Scenario("ingest", requests, concurrency, ingest),
+        Scenario("match", requests, concurrency, lambda i: (
+            "GET", f"/api/v1/triggers/by-string/ALERT-{rng.randint(1, counts['triggers'])}", {})),
+        Scenario("roster", requests, concurrency, lambda i: (
+            "GET", f"/api/v1/contacts/by-group/group-{rng.randint(1, counts['contact_groups'])}", {})),
+        Scenario("list", requests, concurrency, lambda i: (
+            "GET", "/api/v1/call-logs/", {"params": {"page": rng.randint(1, 50), "per_page": 100}})),
+        Scenario("by_contact", requests, concurrency, lambda i: (
+            "GET", f"/api/v1/call-logs/by-contact/contact-{rng.randint(1, counts['contacts'])}", {"params": {"limit": 100}})),
+        Scenario("search", requests, concurrency, lambda i: (
+            "GET", "/api/v1/contacts/search", {"params": {"name": f"Contact {rng.randint(1, 999)}", "per_page": 20}})),
+        Scenario("export", max(5, requests // 50), max(1, concurrency // 16), export),
+    ]
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _current_rss_mb() -> Optional[float]:
+    """Resident set size right now (Linux only; None elsewhere)"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class RSSSampler:
+    """Peak of the current RSS while a scenario runs.
+
+    ru_maxrss is the process's lifetime peak, so after the first heavy
+    scenario every later one would report the same number.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.start_mb = _current_rss_mb()
+        self.peak_mb = self.start_mb
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            self._sample()
+            await asyncio.sleep(self.interval)
+
+    def _sample(self):
+        rss = _current_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+
+    def __enter__(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc_info):
+        self._task.cancel()
+        self._sample()
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(scenario.concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        method, url, kwargs = scenario.build(i)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            await response.aread()
+            latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400 and response.status_code != 404:
+            errors += 1
+
+    with RSSSampler() as rss:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(scenario.requests)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": scenario.requests,
+        "concurrency": scenario.concurrency,
+        "errors": errors,
+        "p50_ms": round(_percentile(latencies, 0.50), 3),
+        "p99_ms": round(_percentile(latencies, 0.99), 3),
+        "throughput_rps": round(scenario.requests / elapsed, 1),
+        "peak_rss_mb": None if rss.peak_mb is None else round(rss.peak_mb, 1),
+        "rss_growth_mb": None if rss.peak_mb is None else round(rss.peak_mb - rss.start_mb, 1),
+    }
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Metrics that got worse than the baseline by more than ``tolerance``"""
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        current = report["scenarios"].get(name)
+        if current is None:
+            continue
+        for metric in ("p50_ms", "p99_ms", "peak_rss_mb"):
+            if current.get(metric) is None or base.get(metric) is None:
+                continue
+            if current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name}.{metric}: {base[metric]} -> {current[metric]}")
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}.throughput_rps: {base['throughput_rps']} -> {current['throughput_rps']}")
+        if current["errors"] > base["errors"]:
+            regressions.append(f"{name}.errors: {base['errors']} -> {current['errors']}")
+    return regressions
+
+
+async def run(args) -> Dict:
+    fixture: Optional[PostgresFixture] = None
+    dsn = args.database_url
+    if not dsn:
+        fixture = PostgresFixture(keep=args.keep)
+        dsn = fixture.start()
+    try:
+        # Settings are read when app modules are first imported
+        os.environ.update(BENCH_ENV, DATABASE_URL=dsn)
+        counts = await seed(dsn, args.scale) if not args.no_seed else {
+            table: max(1, int(volume * args.scale)) for table, volume in VOLUMES.items()
+        }
+
+        from app.core.auth import create_access_token
+        from app.database.connection import close_db_pool, init_db_pool
+        from app.main import app
+
+        await init_db_pool()
+        token = create_access_token({"sub": "bench"}, timedelta(hours=2))
+        results = {}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench",
+            headers={"Authorization": f"Bearer {token}"}, timeout=None
+        ) as client:
+            for scenario in build_scenarios(counts, args.requests, args.concurrency):
+                if args.only and scenario.name not in args.only:
+                    continue
+                # Warm up caches and prepared statements before measuring
+                await run_scenario(client, Scenario(scenario.name, scenario.concurrency, scenario.concurrency, scenario.build))
+                results[scenario.name] = await run_scenario(client, scenario)
+                print(f"{scenario.name:>10}: {results[scenario.name]}", file=sys.stderr)
+        await close_db_pool()
+    finally:
+        if fixture is not None:
+            fixture.stop()
+
+    return {
+        "meta": {
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "volumes": counts,
+        },
+        "scenarios": results,
+    }
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="use an existing empty database instead of a throwaway cluster")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for the seeded volumes")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--only", nargs="*", help="run only these scenarios")
+    parser.add_argument("--no-seed", action="store_true", help="database at --database-url is already seeded")
+    parser.add_argument("--keep", action="store_true", help="keep the throwaway cluster's directory")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to compare against; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,83 @@
+"""Throwaway local Postgres cluster for benchmarks.
+
+Uses ``initdb``/``pg_ctl`` from PATH (or from ``pg_config --bindir``), listens
+only on a Unix socket in a temporary directory and is deleted on exit.
+"""
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+
+def _bindir() -> Path:
+    initdb = shutil.which("initdb")
+    if initdb:
+        return Path(initdb).parent
+    pg_config = shutil.which("pg_config")
+    if pg_config:
+        bindir = Path(subprocess.check_output([pg_config, "--bindir"], text=True).strip())
+        if (bindir / "initdb").exists():
+            return bindir
+    raise RuntimeError("initdb not found; install PostgreSQL server binaries or pass --database-url")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class PostgresFixture:
+    """Context manager returning the DSN of a freshly initialized database"""
+
+    def __init__(self, database: str = "mailtocall_bench", keep: bool = False):
+        self.database = database
+        self.keep = keep
+        self.bindir = _bindir()
+        self.port = _free_port()
+        self.root: Optional[Path] = None
+
+    @property
+    def data_dir(self) -> Path:
+        return self.root / "data"
+
+    def _run(self, *args: str):
+        subprocess.run([str(self.bindir / args[0]), *args[1:]], check=True, capture_output=True)
+
+    def start(self) -> str:
+        self.root = Path(tempfile.mkdtemp(prefix="mailtocall-pg-"))
+        user = os.environ.get("USER", "postgres")
+        self._run("initdb", "-D", str(self.data_dir), "-U", user, "--auth=trust", "--no-sync", "-E", "UTF8")
+        # Benchmark settings: durability off, enough memory for the seeded volumes
+        options = " ".join([
+            f"-p {self.port}",
+            "-c listen_addresses=''",
+            f"-c unix_socket_directories={self.root}",
+            "-c fsync=off",
+            "-c synchronous_commit=off",
+            "-c full_page_writes=off",
+            "-c shared_buffers=256MB",
+            "-c max_connections=200",
+        ])
+        self._run("pg_ctl", "-D", str(self.data_dir), "-o", options, "-l", str(self.root / "postgres.log"), "-w", "start")
+        self._run("createdb", "-h", str(self.root), "-p", str(self.port), "-U", user, self.database)
+        return f"postgresql://{user}@/{self.database}?host={self.root}&port={self.port}"
+
+    def stop(self):
+        if self.root is None:
+            return
+        try:
+            self._run("pg_ctl", "-D", str(self.data_dir), "-m", "immediate", "-w", "stop")
+        finally:
+            if not self.keep:
+                shutil.rmtree(self.root, ignore_errors=True)
+            self.root = None
+
+    def __enter__(self) -> str:
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,113 @@
+"""Check that inserts into the partitioned tables reach a realtime subscriber.
+
+Starts a throwaway Postgres (or uses ``--database-url``), applies the
+migrations (which install the notify triggers) and subscribes to both feed tables
+through the app's broadcaster. Then inserts rows landing in this month's and
+next month's partition of each table and waits for every one of them.
+
+    python -m benchmarks.realtime_feed
+"""
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+from typing import List, Optional
+
+import asyncpg
+import orjson
+
+from benchmarks.pg_fixture import PostgresFixture
+
+# Two partitions of each table, both created by the migrations
+RECEIVED_AT = ("LOCALTIMESTAMP", "LOCALTIMESTAMP + INTERVAL '1 month'")
+
+
+async def check(dsn: str, timeout: float) -> List[str]:
+    """Returns the inserts no subscriber saw"""
+    from app.core.config import settings
+    from app.core.events import FEED_TABLES, EventBroadcaster
+    from app.database.connection import _init_connection, _server_settings
+    from app.database.migrate import migrate
+    from app.database.partitions import PARTITIONED_TABLES, is_partitioned
+
+    connection = await asyncpg.connect(dsn, server_settings=_server_settings())
+    await _init_connection(connection)
+    broadcaster = EventBroadcaster(settings.realtime_channel, queue_size=100)
+    try:
+        await migrate(connection)
+        for table in PARTITIONED_TABLES:
+            if not await is_partitioned(connection, table):
+                return [f"{table} is not partitioned"]
+
+        subscription = await broadcaster.subscribe(set(FEED_TABLES))
+        # The listener connects in the background; wait until it is LISTENing
+        while not await connection.fetchval(
+            "SELECT EXISTS (SELECT 1 FROM pg_stat_activity WHERE query LIKE $1)", f"LISTEN%{broadcaster.channel}%"
+        ):
+            await asyncio.sleep(0.05)
+
+        expected = set()
+        for received_at in RECEIVED_AT:
+            event_id = uuid.uuid4().hex
+            await connection.execute(
+                f"""
+                INSERT INTO email_events (id, from_email, subject, status, received_at)
+                VALUES ($1, 'check@example.com', 'realtime check', 'pending', {received_at})
+                """,
+                event_id
+            )
+            call_id = await connection.fetchval(
+                f"""
+                INSERT INTO call_logs (email_event_id, contact_id, phone_number, status, created_at)
+                VALUES ($1, 'check', '+10000000000', 'initiated', {received_at})
+                RETURNING id
+                """,
+                event_id
+            )
+            expected |= {("email_events", event_id), ("call_logs", call_id)}
+
+        async def drain():
+            while expected:
+                payload = orjson.loads(await subscription.get())
+                expected.discard((payload.get("table"), payload.get("id")))
+
+        try:
+            await asyncio.wait_for(drain(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return [f"{table} id={row_id}" for table, row_id in sorted(expected, key=str)]
+    finally:
+        await broadcaster.stop()
+        await connection.close()
+
+
+async def run(args) -> int:
+    fixture: Optional[PostgresFixture] = None
+    dsn = args.database_url
+    if not dsn:
+        fixture = PostgresFixture(keep=args.keep)
+        dsn = fixture.start()
+    try:
+        # Settings are read when app modules are first imported
+        os.environ["DATABASE_URL"] = dsn
+        missing = await check(dsn, args.timeout)
+    finally:
+        if fixture is not None:
+            fixture.stop()
+    for insert in missing:
+        print(f"MISSING  {insert}")
+    print("ok" if not missing else f"{len(missing)} insert(s) never reached the subscriber")
+    return 1 if missing else 0
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="use an existing empty database instead of a throwaway cluster")
+    parser.add_argument("--timeout", type=float, default=5.0, help="seconds to wait for the notifications")
+    parser.add_argument("--keep", action="store_true", help="keep the throwaway cluster's directory")
+    return asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
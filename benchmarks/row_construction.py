@@ -0,0 +1,65 @@
+"""Cost of turning 10k fetched rows into response models.
+
+Rows are simulated with dicts shaped like ``call_logs`` records, so no
+database is needed; asyncpg records expose the same mapping interface.
+
+    python -m benchmarks.row_construction --rows 10000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.crud.rows import from_rows
+from app.schemas.call_logs import CallLogResponse
+
+
+def make_rows(count: int):
+    now = datetime.now()
+    return [
+        {
+            "id": i,
+            "email_event_id": f"evt-{i // 3:06d}",
+            "contact_id": f"contact-{i % 40:04d}",
+            "phone_number": f"+1555{i:07d}",
+            "call_sid": f"CA{i:032x}",
+            "status": "completed",
+            "duration": 30 + i % 90,
+            "attempt_number": 1 + i % 3,
+            "error_message": None,
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(minutes=i),
+        }
+        for i in range(count)
+    ]
+
+
+def measure(label, build, repeat):
+    build()
+    best = min(_timed(build) for _ in range(repeat))
+    print(f"{label:>16}: {best * 1000:8.2f} ms")
+    return best
+
+
+def _timed(build):
+    started = time.perf_counter()
+    build()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    rows = make_rows(args.rows)
+
+    validated = measure("validated", lambda: [CallLogResponse(**dict(row)) for row in rows], args.repeat)
+    measure("model_construct", lambda: [CallLogResponse.model_construct(**row) for row in rows], args.repeat)
+    settings.validate_db_rows = False
+    trusted = measure("from_rows", lambda: from_rows(CallLogResponse, rows), args.repeat)
+    print(f"from_rows vs validated: {(1 - trusted / validated) * 100:.1f}% less time")
+
+
+if __name__ == "__main__":
+    main()
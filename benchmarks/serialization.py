@@ -0,0 +1,83 @@
+"""CPU cost of serializing a 100-item page of call logs.
+
+Compares the default path (build models, FastAPI re-validates against
+``response_model`` and encodes with the stdlib json module) against the
+``FAST_JSON_RESPONSES`` path that dumps rows straight to bytes with orjson.
+
+    python -m benchmarks.serialization --iterations 500
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.responses import paginated_records_response
+from app.schemas.call_logs import CallLogResponse, PaginatedResponse
+
+PAGE_SIZE = 100
+
+
+def make_rows(count: int):
+    now = datetime.now()
+    return [
+        {
+            "id": i,
+            "email_event_id": f"evt-{i // 3:06d}",
+            "contact_id": f"contact-{i % 40:04d}",
+            "phone_number": f"+1555{i:07d}",
+            "call_sid": f"CA{i:032x}",
+            "status": "completed" if i % 5 else "no-answer",
+            "duration": 30 + i % 90,
+            "attempt_number": 1 + i % 3,
+            "error_message": None if i % 5 else "Callee did not answer",
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(minutes=i) + timedelta(seconds=45),
+        }
+        for i in range(count)
+    ]
+
+
+async def default_path(field, rows):
+    items = [CallLogResponse(**dict(row)) for row in rows]
+    page = PaginatedResponse[CallLogResponse](
+        items=items, total=10_000, page=1, per_page=PAGE_SIZE, total_pages=100
+    )
+    content = await serialize_response(field=field, response_content=page)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+async def fast_path(rows):
+    return paginated_records_response(rows, 10_000, 1, PAGE_SIZE).body
+
+
+async def measure(label, make_body, iterations):
+    await make_body()
+    started = time.process_time()
+    for _ in range(iterations):
+        await make_body()
+    per_request = (time.process_time() - started) / iterations * 1000
+    print(f"{label:>8}: {per_request:7.3f} ms CPU/request")
+    return per_request
+
+
+async def run(iterations: int):
+    rows = make_rows(PAGE_SIZE)
+    field = create_response_field(name="Response", type_=PaginatedResponse[CallLogResponse])
+    baseline = await measure("default", lambda: default_path(field, rows), iterations)
+    fast = await measure("orjson", lambda: fast_path(rows), iterations)
+    print(f"reduction: {(1 - fast / baseline) * 100:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
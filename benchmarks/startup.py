@@ -0,0 +1,73 @@
+"""Measure worker cold start: time to import the app and the resulting RSS.
+
+Each run is a fresh interpreter, like a worker after a rolling restart. The
+``eager`` variant imports pandas/openpyxl up front, as the app did before
+exports were made lazy; ``export`` adds one in-memory export to show what
+the first export request pays.
+
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{preload}
+import app.main
+imported = time.perf_counter() - started
+{after}
+rss_kb = 0
+with open("/proc/self/status") as status:
+    for line in status:
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+print(json.dumps({{
+    "import_s": imported,
+    "total_s": time.perf_counter() - started,
+    "rss_mb": rss_kb / 1024,
+    "pandas_loaded": "pandas" in sys.modules,
+}}))
+"""
+
+EXPORT = """
+from datetime import datetime
+from app.core.export import call_logs_excel
+call_logs_excel([{"id": 1, "status": "completed", "created_at": datetime.now(), "updated_at": datetime.now()}])
+"""
+
+VARIANTS = {
+    "lazy": ("", ""),
+    "eager": ("import pandas, openpyxl", ""),
+    "export": ("", EXPORT),
+}
+
+
+def run_probe(preload: str, after: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(preload=preload, after=after)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, (preload, after) in VARIANTS.items():
+        results = [run_probe(preload, after) for _ in range(args.runs)]
+        print(
+            f"{name:>7}: import {statistics.median(r['import_s'] for r in results) * 1000:8.1f} ms"
+            f"  total {statistics.median(r['total_s'] for r in results) * 1000:8.1f} ms"
+            f"  rss {statistics.median(r['rss_mb'] for r in results):7.1f} MB"
+            f"  pandas loaded: {results[0]['pandas_loaded']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,52 @@
+import multiprocessing
 import uvicorn
+from app.core.config import settings
+
+
+def get_worker_count() -> int:
+    if settings.server_reload:
+        return 1
+    return settings.server_workers or multiprocessing.cpu_count()
+
+
+def run_uvicorn():
+    uvicorn.run(
+        "app.main:app",
+        host=settings.server_host,
+        port=settings.server_port,
+        reload=settings.server_reload,
+        workers=get_worker_count(),
+        loop=settings.server_loop,
+        http=settings.server_http,
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+    )
+
+
+def run_gunicorn_preload():
+    """Import the app once in the master and fork workers from it (copy-on-write)"""
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{settings.server_host}:{settings.server_port}")
+            self.cfg.set("workers", get_worker_count())
+            self.cfg.set("worker_class", "app.workers.ConfiguredUvicornWorker")
+            self.cfg.set("preload_app", True)
+            self.cfg.set("graceful_timeout", settings.server_graceful_timeout)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    Application().run()
+
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    if settings.metrics_multiprocess_dir:
+        # Snapshots of a previous run would add to this run's counters
+        from app.core.prometheus import worker_snapshots
+        worker_snapshots.clear()
+    if settings.server_preload and not settings.server_reload:
+        run_gunicorn_preload()
+    else:
+        run_uvicorn()